@@ -1,25 +1,47 @@
 import argparse
+import collections
+import functools
+import itertools
 import sys
 import os
 import getpass
 from pathlib import Path
-from textwrap import indent
+from typing import Optional
 import traceback
 from autodoc_ai.transformers import CodeTransformer
-from autodoc_ai.formatters import FormatterFactory
+from autodoc_ai.concurrency import LLMExecutor
+from autodoc_ai.discovery import iter_source_files
+from autodoc_ai.dedup import DedupGenerator
+from autodoc_ai.docstring_quality import DocstringScorer
+from autodoc_ai.enrichment import EnrichingGenerator
+from autodoc_ai.file_filter import FileClassifier
+from autodoc_ai.function_store import STORE_NAMESPACE, MemoizingGenerator
 from autodoc_ai.generators import GeneratorFactory, IDocstringGenerator
+from autodoc_ai.llm_cache import ResponseCache
+from autodoc_ai.llm_services import close_shared_adapters, iter_service_layers
+from autodoc_ai.manifest import RunManifest, make_run_key
+from autodoc_ai.parallel import FilePool, shared_semaphore
+from autodoc_ai.pipeline import run_pipeline
+from autodoc_ai.project_index import ProjectIndex
+from autodoc_ai.rate_limit import split_limits
+from autodoc_ai.resilience import failures_on_this_thread, record_failure
 from autodoc_ai.processors import (
     DeadCodeProcessor,
     DocstringProcessor,
     TypeHintProcessor,
-    MagicNumberProcessor
+    MagicNumberProcessor,
+    FileIndex,
+    SourceBuffer
 )
-from .utils import get_source_files, get_git_changed_files
+from .utils import get_git_changed_files, get_git_changed_lines, language_for
 from .config import load_config
-from .parser import get_language_parser, get_language_queries, LANGUAGES
-from .transformers import CodeTransformer
-import textwrap
-from .formatters import FormatterFactory
+from .parser import get_language_parser, parse_source, ParseTimeout
+
+# Skipped files listed with their reason in the run summary
+SKIP_REPORT_LIMIT = 10
+# [tool.zenco] settings that change what a run writes into a file, besides the features and options
+OUTPUT_SETTINGS = ('docstring_quality', 'diff_scope', 'project_index', 'combine_llm_requests',
+                   'dedupe_functions', 'dedupe_similarity')
 
 # Fix Windows Unicode encoding issues
 if sys.platform.startswith("win"):
@@ -30,32 +52,35 @@ if sys.platform.startswith("win"):
     except Exception:
         pass
 
-try:
-    from rich.console import Console
-    from rich.panel import Panel
-    from rich.text import Text
-    from rich.progress import Progress, SpinnerColumn, TextColumn
-    from rich import print as rprint
-    RICH_AVAILABLE = True
-except ImportError:
-    RICH_AVAILABLE = False
-    rprint = print
-
-try:
-    import colorama
-    colorama.init()
-    COLORAMA_AVAILABLE = True
-except ImportError:
-    COLORAMA_AVAILABLE = False
+@functools.lru_cache(maxsize=None)
+def _console_backend() -> Optional[str]:
+    """
+    'rich' or 'colorama', whichever is installed, for colored output (None if neither).
+    Imported on first colored print, so commands that never print in color skip both.
+    """
+    try:
+        import rich  # noqa: F401
+        return 'rich'
+    except ImportError:
+        pass
+    try:
+        import colorama
+        colorama.init()
+        return 'colorama'
+    except ImportError:
+        return None
 
 def cprint(text, color=None, style=None):
     """Colorful print with fallback to regular print"""
-    if RICH_AVAILABLE:
+    backend = _console_backend()
+    if backend == 'rich':
+        from rich import print as rprint
         if color or style:
             rprint(f"[{color or ''} {style or ''}]{text}[/]")
         else:
             rprint(text)
-    elif COLORAMA_AVAILABLE and color:
+    elif backend == 'colorama' and color:
+        import colorama
         colors = {
             'red': colorama.Fore.RED,
             'green': colorama.Fore.GREEN,
@@ -187,34 +212,60 @@ def init_config():
     print(f"\n{'='*70}\n")
 
 
-def process_file_with_treesitter(filepath: str, generator: IDocstringGenerator, in_place: bool, overwrite_existing: bool, add_type_hints: bool = False, fix_magic_numbers: bool = False, docstrings_enabled: bool = False, dead_code: bool = False, dead_code_strict: bool = False):
+def process_file_with_treesitter(filepath: str, generator: IDocstringGenerator, in_place: bool, overwrite_existing: bool, add_type_hints: bool = False, fix_magic_numbers: bool = False, docstrings_enabled: bool = False, dead_code: bool = False, dead_code_strict: bool = False, executor: Optional[LLMExecutor] = None, docstring_batch_size: int = 1, docstring_batch_tokens: int = 6000, magic_context_tokens: int = 1000, quality_scorer: Optional[DocstringScorer] = None, parse_timeout: Optional[float] = None, changed_lines: Optional[list] = None, external_uses: Optional[set] = None):
     """
     Processes a single file using the Tree-sitter engine to find and
     report undocumented functions, add type hints, and fix magic numbers.
+    LLM calls within the file are run through `executor` when one is given.
+    Returns (original source, transformed source), or None if the file could not be processed or saved.
     """
+    result = transform_file(
+        filepath, generator, in_place, overwrite_existing,
+        add_type_hints=add_type_hints, fix_magic_numbers=fix_magic_numbers,
+        docstrings_enabled=docstrings_enabled, dead_code=dead_code, dead_code_strict=dead_code_strict,
+        executor=executor, docstring_batch_size=docstring_batch_size,
+        docstring_batch_tokens=docstring_batch_tokens, magic_context_tokens=magic_context_tokens,
+        quality_scorer=quality_scorer, parse_timeout=parse_timeout, changed_lines=changed_lines,
+        external_uses=external_uses,
+    )
+    if result is not None and not write_file_result(filepath, *result, in_place=in_place):
+        return None
+    return result
 
-    lang = None
-    if filepath.endswith('.py'): lang = 'python'
-    elif filepath.endswith('.js'): lang = 'javascript'
-    elif filepath.endswith('.java'): lang = 'java'
-    elif filepath.endswith('.go'): lang = 'go'
-    elif filepath.endswith('.cpp') or filepath.endswith('.hpp') or filepath.endswith('.h'): lang = 'cpp'
 
-    parser = get_language_parser(lang)
-    if not parser: return
-    
-    # Get the language object for Query constructor
-    language = LANGUAGES.get(lang)
-    if not language: return
+def transform_file(filepath: str, generator: IDocstringGenerator, in_place: bool, overwrite_existing: bool, add_type_hints: bool = False, fix_magic_numbers: bool = False, docstrings_enabled: bool = False, dead_code: bool = False, dead_code_strict: bool = False, executor: Optional[LLMExecutor] = None, docstring_batch_size: int = 1, docstring_batch_tokens: int = 6000, magic_context_tokens: int = 1000, quality_scorer: Optional[DocstringScorer] = None, parse_timeout: Optional[float] = None, changed_lines: Optional[list] = None, external_uses: Optional[set] = None):
+    """
+    Runs the enabled processors over a file without writing anything. With `changed_lines`
+    (1-based inclusive ranges), docstring, type-hint and magic-number work is limited to
+    functions overlapping them. `external_uses` names the file's functions other modules
+    use, which dead-code detection must not report as never called.
+    Returns (original source, transformed source), or None if the file cannot be processed.
+    """
+
+    lang = language_for(filepath)
+
+    if not get_language_parser(lang): return None
 
     try:
         with open(filepath, 'rb') as f:
             source_bytes = f.read()
     except IOError as e:
-        print(f"Error reading file: {e}"); return
+        print(f"Error reading file: {e}"); return None
 
-    tree = parser.parse(source_bytes)
+    try:
+        tree = parse_source(lang, source_bytes, timeout=parse_timeout)
+    except ParseTimeout as e:
+        print(f"  [WARN] Skipping file: {e}")
+        record_failure()
+        return None
     transformer = CodeTransformer(source_bytes)
+    # One walk of the tree and one decoded copy of the source, shared by every processor below
+    index = FileIndex(lang, tree, changed_lines)
+    if changed_lines is not None:
+        touched = len(index.definitions())
+        total = sum(1 for record in index.functions if record.primary)
+        print(f"  [DIFF] Limiting to {touched} of {total} function(s) overlapping changed lines")
+    source = SourceBuffer(source_bytes)
     
     # ============================================================================
     # MODULAR PROCESSOR ARCHITECTURE - EXECUTION PRIORITY
@@ -231,59 +282,72 @@ def process_file_with_treesitter(filepath: str, generator: IDocstringGenerator,
     # Step 1: Detect dead code FIRST (execution priority optimization)
     if dead_code:
         try:
-            dead_processor = DeadCodeProcessor(lang, tree, source_bytes, transformer)
-            dead_function_names = dead_processor.process(in_place=in_place, strict=dead_code_strict)
+            dead_processor = DeadCodeProcessor(lang, tree, source_bytes, transformer, index, source)
+            dead_function_names = dead_processor.process(in_place=in_place, strict=dead_code_strict,
+                                                         external_uses=external_uses)
             if dead_function_names:
                 print(f"  [PRIORITY] Found {len(dead_function_names)} dead functions to skip in other processors")
         except Exception as e:
             print(f"  [WARN] Dead code detection failed: {e}")
+            record_failure()
             import traceback
             traceback.print_exc()
     
     # Step 2: Generate docstrings (skipping dead code)
     if docstrings_enabled:
         try:
-            docstring_processor = DocstringProcessor(lang, tree, source_bytes, transformer)
+            docstring_processor = DocstringProcessor(lang, tree, source_bytes, transformer, index, source)
             docstring_processor.process(
                 generator=generator,
                 overwrite_existing=overwrite_existing,
-                dead_functions=dead_function_names
+                dead_functions=dead_function_names,
+                executor=executor,
+                batch_size=docstring_batch_size,
+                batch_token_budget=docstring_batch_tokens,
+                quality_scorer=quality_scorer
             )
         except Exception as e:
             print(f"  [ERROR] Docstring processing failed: {e}")
+            record_failure()
             import traceback
             traceback.print_exc()
     
     # Step 3: Add type hints (skipping dead code)
     if add_type_hints:
         try:
-            type_hint_processor = TypeHintProcessor(lang, tree, source_bytes, transformer)
+            type_hint_processor = TypeHintProcessor(lang, tree, source_bytes, transformer, index, source)
             type_hint_processor.process(
                 generator=generator,
-                dead_functions=dead_function_names
+                dead_functions=dead_function_names,
+                executor=executor
             )
         except Exception as e:
             print(f"  [ERROR] Type hint processing failed: {e}")
+            record_failure()
             import traceback
             traceback.print_exc()
     
     # Step 4: Replace magic numbers (skipping dead code)
     if fix_magic_numbers:
         try:
-            magic_number_processor = MagicNumberProcessor(lang, tree, source_bytes, transformer)
+            magic_number_processor = MagicNumberProcessor(lang, tree, source_bytes, transformer, index, source)
             magic_number_processor.process(
                 generator=generator,
-                dead_functions=dead_function_names
+                dead_functions=dead_function_names,
+                executor=executor,
+                context_token_budget=magic_context_tokens
             )
         except Exception as e:
             print(f"  [ERROR] Magic number processing failed: {e}")
+            record_failure()
             import traceback
             traceback.print_exc()
     
-    # ============================================================================
-    # Apply all transformations and save/preview
-    # ============================================================================
-    new_code = transformer.apply_changes()
+    return source_bytes, transformer.apply_changes()
+
+
+def write_file_result(filepath: str, source_bytes: bytes, new_code: bytes, in_place: bool) -> bool:
+    """Saves the transformed source (in place) or prints it as a preview (dry run). Returns False if saving failed."""
     if in_place:
         if new_code != source_bytes:
             print("\n  [SAVE] Saving changes to file...")
@@ -293,6 +357,7 @@ def process_file_with_treesitter(filepath: str, generator: IDocstringGenerator,
                 print("  [OK] File updated successfully!")
             except IOError as e:
                 print(f"  [ERROR] Error writing to file: {e}")
+                return False
         else:
             print("\n  [INFO] No changes needed for this file.")
     else:
@@ -300,11 +365,222 @@ def process_file_with_treesitter(filepath: str, generator: IDocstringGenerator,
         print("\n  [PREVIEW] Preview of Changes (Dry Run):")
         print(f"  {'-'*66}\n")
         print(new_code.decode('utf8'))
+    return True
+
+
+def collect_llm_stats(generator: IDocstringGenerator) -> dict:
+    """Gathers the counters of the generator wrappers and LLM service layers (cache, retries, ...)."""
+    stats = {}
+    layer = generator
+    while layer is not None:
+        if hasattr(layer, 'stats'):
+            stats.update(layer.stats())
+        layer = layer.__dict__.get('inner')
+    llm_service = getattr(generator, 'llm_service', None)
+    if llm_service is not None:
+        for service_layer in iter_service_layers(llm_service):
+            if hasattr(service_layer, 'stats'):
+                stats.update(service_layer.stats())
+    return stats
+
+
+def print_llm_stats(stats: dict):
+    """Prints the counters gathered by collect_llm_stats in the run summary."""
+    if stats.get('enrich_functions'):
+        print(f"  * Combined enrichment: {stats['enrich_requests']} request(s) for {stats['enrich_functions']} function(s)")
+    if stats.get('dedup_exact') or stats.get('dedup_near'):
+        print(f"  * Duplicate functions: reused {stats['dedup_exact']} exact and {stats['dedup_near']} near-duplicate result(s)")
+    if stats.get('queued_duplicates'):
+        print(f"  * LLM work queue: {stats['queued_requests']} request(s), {stats['queued_duplicates']} repeated request(s) merged")
+    if stats.get('function_store_hits') or stats.get('function_store_misses'):
+        print(f"  * Function store: {stats['function_store_hits']} hit(s), {stats['function_store_misses']} miss(es)")
+    if 'cache_hits' in stats:
+        print(f"  * LLM cache: {stats['cache_hits']} hit(s), {stats['cache_misses']} miss(es)")
+    if 'llm_retries' in stats:
+        print(f"  * LLM retries: {stats['llm_retries']}, failed requests: {stats['llm_failures']}")
+    if stats.get('circuit_breaker_trips') or stats.get('circuit_breaker_rejections'):
+        print(f"  * Circuit breaker: tripped {stats['circuit_breaker_trips']} time(s), "
+              f"rejected {stats['circuit_breaker_rejections']} request(s)")
+    if stats.get('rate_limit_waits'):
+        print(f"  * Rate limiting: waited {stats['rate_limit_waits']} time(s), {stats['rate_limit_wait_seconds']}s total")
+
+
+def build_response_cache(args, config: dict) -> Optional[ResponseCache]:
+    """Returns the on-disk LLM response cache for this run, or None if caching is disabled."""
+    if not config.get('cache', True) or getattr(args, 'no_cache', False):
+        return None
+    return ResponseCache(
+        cache_dir=getattr(args, 'cache_dir', None) or config.get('cache_dir', '.zenco-cache'),
+        max_size_mb=config.get('cache_max_size_mb', 100),
+        max_age_days=config.get('cache_max_age_days', 30),
+    )
+
+
+def build_function_store(args, config: dict) -> Optional[ResponseCache]:
+    """Returns the per-function artifact store for this run, or None if it is disabled."""
+    if not config.get('function_store', True) or build_response_cache(args, config) is None:
+        return None
+    return ResponseCache(
+        cache_dir=getattr(args, 'cache_dir', None) or config.get('cache_dir', '.zenco-cache'),
+        max_size_mb=config.get('cache_max_size_mb', 100),
+        max_age_days=config.get('cache_max_age_days', 30),
+        namespace=STORE_NAMESPACE,
+    )
+
+
+def build_project_index(args, config: dict, root: str, changed: Optional[list] = None) -> Optional[ProjectIndex]:
+    """
+    Indexes the Python modules under `root` for cross-file dead-code detection,
+    reusing the persisted entries of unchanged files. With `changed` (--diff and
+    --since runs) only those files and the modules around them are looked at,
+    unless there is no persisted index yet. None if it is disabled.
+    """
+    if not config.get('project_index', True):
+        return None
+    cache_dir = getattr(args, 'cache_dir', None) or config.get('cache_dir', '.zenco-cache')
+    project_index = ProjectIndex(cache_dir)
+    if changed is None or not project_index.update_changed(changed, root):
+        project_index.update((path for path in iter_source_files(root) if path.endswith('.py')), root)
+    print(f"[INDEX] Cross-file index: {project_index.indexed} Python module(s), "
+          f"{project_index.reindexed} re-indexed")
+    # Independent of the response cache: without it, --no-cache runs would re-index everything every time.
+    project_index.save()
+    return project_index
+
+
+def build_run_generator(args, config: dict, settings: dict, response_cache: Optional[ResponseCache],
+                        features: dict, quality_scorer: Optional[DocstringScorer]) -> IDocstringGenerator:
+    """Creates the generator for a run, wrapped for duplicate sharing and combined requests as configured."""
+    generator = GeneratorFactory.create_generator(
+        args.strategy,
+        args.style,
+        getattr(args, 'provider', None),
+        getattr(args, 'model', None),
+        cache=response_cache,
+        settings=settings,
+    )
+
+    # Copies of the same function across the repository share one generated result.
+    if config.get('dedupe_functions', True):
+        generator = DedupGenerator(generator, threshold=config.get('dedupe_similarity', 0.9))
+
+    # Functions whose text is unchanged since an earlier run reuse their stored artifacts.
+    llm_service = getattr(generator, 'llm_service', None)
+    function_store = build_function_store(args, config) if llm_service is not None else None
+    if function_store is not None:
+        generator = MemoizingGenerator(generator, function_store, provider=llm_service.provider,
+                                       model=llm_service.model, style=args.style)
+
+    # With more than one per-function feature on, ask for all of a function's results in one request.
+    evaluation = features['docstrings_enabled'] and args.overwrite_existing
+    per_function_features = [features['docstrings_enabled'], features['add_type_hints'], evaluation]
+    if config.get('combine_llm_requests', True) and sum(per_function_features) > 1:
+        generator = EnrichingGenerator(
+            generator,
+            docstrings=features['docstrings_enabled'],
+            type_hints=features['add_type_hints'],
+            evaluation=evaluation,
+            quality_scorer=quality_scorer,
+        )
+    return generator
+
+
+def _setup_file_worker(args, config: dict, settings: dict, features: dict,
+                       quality_scorer: Optional[DocstringScorer], options: dict,
+                       changed_lines: Optional[dict] = None, project_uses: Optional[dict] = None) -> dict:
+    """Builds a --jobs worker's generator and LLM thread pool (runs once per worker process)."""
+    generator = build_run_generator(args, config, settings, build_response_cache(args, config),
+                                    features, quality_scorer)
+    executor = LLMExecutor(max_workers=settings['llm_concurrency'])
+    return {'generator': generator, 'executor': executor, 'args': args, 'features': features,
+            'quality_scorer': quality_scorer, 'options': options, 'changed_lines': changed_lines,
+            'project_uses': project_uses}
+
+
+def _process_file_job(context: dict, filepath: str) -> dict:
+    """
+    Processes one file in a --jobs worker. Returns the LLM counters this file
+    added and whether the file was processed and changed.
+    """
+    generator = context['generator']
+    before = collect_llm_stats(generator)
+    failures = failures_on_this_thread()
+    result = process_file_with_treesitter(
+        filepath=filepath,
+        generator=generator,
+        in_place=context['args'].in_place,
+        overwrite_existing=context['args'].overwrite_existing,
+        executor=context['executor'],
+        quality_scorer=context['quality_scorer'],
+        changed_lines=(context['changed_lines'] or {}).get(filepath),
+        external_uses=(context['project_uses'] or {}).get(os.path.abspath(filepath)),
+        **context['features'],
+        **context['options'],
+    )
+    after = collect_llm_stats(generator)
+    stats = {key: value - before.get(key, 0) for key, value in after.items()}
+    # This process works on one file at a time, so the LLM failures counted meanwhile are this file's.
+    llm_failures = stats.get('llm_failures', 0) + stats.get('circuit_breaker_rejections', 0)
+    return {
+        'stats': stats,
+        'processed': result is not None,
+        'changed': result is not None and result[0] != result[1],
+        'failed': bool(llm_failures) or failures_on_this_thread() > failures,
+    }
+
+
+def _record_if_complete(manifest: Optional[RunManifest], filepath: str, failed: bool, processed: bool,
+                        changed: bool, in_place: bool) -> None:
+    """
+    Marks a file as done in the incremental-run manifest, unless some of its
+    work failed (an LLM call that produced nothing, a processor error) or was
+    only previewed (a dry run that would change the file). Outcomes such as
+    "no meaningful name" are answers, not failures: the next run would get them again.
+    """
+    if manifest is None:
+        return
+    if processed and not failed and (in_place or not changed):
+        manifest.record(filepath)
+    else:
+        manifest.forget(filepath)
+
+
+def _skip_unchanged(files, manifest: RunManifest, skipped: list, affected: frozenset = frozenset()):
+    """
+    Yields the files the manifest does not record as current, or whose functions' users
+    elsewhere changed (`affected`, absolute paths), and appends the others to `skipped`.
+    """
+    for filepath in files:
+        if manifest.is_current(filepath) and os.path.abspath(filepath) not in affected:
+            skipped.append(filepath)
+        else:
+            yield filepath
+
+
+def _skip_unprocessable(files, classifier: FileClassifier, skipped: list):
+    """Yields the files worth parsing; appends the others to `skipped` as (filepath, kind, detail)."""
+    for filepath in files:
+        verdict = classifier.classify(filepath)
+        if verdict is None:
+            yield filepath
+            continue
+        kind, detail = verdict
+        skipped.append((filepath, kind, detail))
+        print(f"[SKIP] {filepath}: {kind} ({detail})")
+
+
+def _peek(files, count: int):
+    """Reads up to `count` files ahead of a stream. Returns the full stream and the files read."""
+    files = iter(files)
+    head = list(itertools.islice(files, count))
+    return itertools.chain(head, files), head
 
 
 def run_autodoc(args):
     """The main entry point for running the analysis."""
-    if RICH_AVAILABLE:
+    if _console_backend() == 'rich':
+        from rich.console import Console
+        from rich.panel import Panel
         console = Console()
         console.print(Panel.fit("Zenco AI - Code Analysis & Enhancement", 
                                border_style="blue", padding=(1, 2)))
@@ -377,24 +653,33 @@ def run_autodoc(args):
     print(f"[FEATURES] Active Features: {', '.join(features)}")
     print(f"[STYLE] Docstring Style: {args.style}")
     
-    if args.diff:
-        print(f"[MODE] Git-changed files only\n")
+    since = getattr(args, 'since', None)
+    if args.diff or since:
+        print(f"[MODE] Git-changed files only" + (f" (since {since})" if since else "") + "\n")
         print("Scanning for modified files...")
-        source_files = get_git_changed_files()
+        source_files = get_git_changed_files(since=since)
         if source_files is None: 
             print("[ERROR] Error: Not a git repository or no changes found.")
             sys.exit(1)
+        changed_files = source_files
     else:
         print(f"[TARGET] Target: {args.path}\n")
         print("Scanning for source files...")
-        source_files = get_source_files(args.path)
-    
-    if not source_files:
+        # Streamed: files are processed while discovery is still walking the tree.
+        source_files = iter_source_files(args.path)
+        changed_files = None
+
+    total = len(source_files) if isinstance(source_files, list) else None
+    source_files, head = _peek(source_files, 1)
+    if not head:
         print("\n[WARN]  No source files found to process.")
         print("[TIP] Tip: Make sure you're in the right directory or specify a path.")
         return
 
-    print(f"[OK] Found {len(source_files)} file(s) to process.\n")
+    if total is not None:
+        print(f"[OK] Found {total} file(s) to process.\n")
+    else:
+        print("[OK] Found source files; processing them as discovery continues.\n")
     
     # Show provider info
     provider = getattr(args, 'provider', None) or os.getenv('ZENCO_PROVIDER', 'groq')
@@ -407,47 +692,201 @@ def run_autodoc(args):
             print(f"  Mode: In-place (files will be modified)")
         print()
     
+    config = load_config()
+    response_cache = build_response_cache(args, config)
+
+    # Size the HTTP connection pool to the number of concurrent LLM requests unless configured.
+    llm_concurrency = getattr(args, 'llm_concurrency', None) or config.get('llm_concurrency', 4)
+    settings = {**config, 'llm_concurrency': llm_concurrency,
+                'http': {'pool_size': llm_concurrency, **config.get('http', {})}}
+    jobs = getattr(args, 'jobs', None) or config.get('jobs', 1)
+
+    # Clear-cut existing docstrings are judged locally instead of by an LLM evaluation.
+    quality_settings = {**config.get('docstring_quality', {})}
+    quality_scorer = DocstringScorer(
+        min_words=quality_settings.get('min_words', 8),
+        accept_threshold=quality_settings.get('accept_threshold', 0.9),
+        reject_threshold=quality_settings.get('reject_threshold', 0.4),
+    ) if quality_settings.get('enabled', True) else None
+
+    features = {
+        'docstrings_enabled': docstrings_enabled,
+        'add_type_hints': hints_enabled,
+        'fix_magic_numbers': magic_enabled,
+        'dead_code': dead_code_enabled,
+        'dead_code_strict': dead_code_strict_enabled,
+    }
+    options = {
+        'docstring_batch_size': getattr(args, 'docstring_batch_size', None) or config.get('docstring_batch_size', 1),
+        'docstring_batch_tokens': config.get('docstring_batch_tokens', 6000),
+        'magic_context_tokens': config.get('magic_context_tokens', 1000),
+        'parse_timeout': config.get('parse_timeout', 30.0) or None,
+    }
+
+    # Hunk-aware --diff: work only on functions overlapping the changed lines. Files
+    # without hunks (untracked ones) are processed whole.
+    changed_lines = None
+    if (args.diff or since) and config.get('diff_scope', 'functions') == 'functions':
+        changed_lines = get_git_changed_lines(since=since)
+    # Cross-file dead-code detection: a function another module uses is not dead.
+    project_index = None
+    project_uses = None
+    if dead_code_enabled:
+        if args.diff or since:
+            project_root = os.getcwd()
+        else:
+            project_root = args.path if os.path.isdir(args.path) else os.path.dirname(os.path.abspath(args.path))
+        project_index = build_project_index(args, config, project_root, changed_files)
+        if project_index is not None:
+            project_uses = project_index.uses_by_file()
+
+    # A file worked on only in part is not done, so the manifest must not record it.
+    def manifest_for(filepath):
+        return None if changed_lines and filepath in changed_lines else manifest
+
     try:
-        generator = GeneratorFactory.create_generator(
-            args.strategy,
-            args.style,
-            getattr(args, 'provider', None),
-            getattr(args, 'model', None),
-        )
+        generator = build_run_generator(args, config, settings, response_cache, features, quality_scorer)
     except ValueError as e:
         print(f"[ERROR] Error: {e}")
         print(f"[TIP] Tip: Run 'zenco init' to configure your provider.")
         sys.exit(1)
 
+    # Generated, minified, oversized and binary files are recognized from their first KiBs and never parsed.
+    filter_settings = {**config.get('skip_files', {})}
+    unprocessable = []
+    if filter_settings.get('enabled', True):
+        classifier = FileClassifier(
+            max_size_kb=filter_settings.get('max_size_kb', 1024),
+            max_average_line_length=filter_settings.get('max_average_line_length', 200),
+            skip_generated=filter_settings.get('generated', True),
+        )
+        source_files = _skip_unprocessable(source_files, classifier, unprocessable)
+
+    # Incremental runs: skip files unchanged since they were last processed with the same settings.
+    manifest = None
+    skipped_files = []
+    if config.get('incremental', True) and not getattr(args, 'force', False):
+        llm_service = getattr(generator, 'llm_service', None)
+        manifest = RunManifest(
+            getattr(args, 'cache_dir', None) or config.get('cache_dir', '.zenco-cache'),
+            make_run_key(
+                features=features,
+                overwrite_existing=args.overwrite_existing,
+                style=args.style,
+                provider=getattr(llm_service, 'provider', 'mock'),
+                model=getattr(llm_service, 'model', None),
+                options=options,
+                settings={key: config.get(key) for key in OUTPUT_SETTINGS},
+                diff=bool(args.diff or since),
+            ),
+        )
+        source_files = _skip_unchanged(source_files, manifest, skipped_files,
+                                       frozenset(project_index.affected) if project_index else frozenset())
+    if total is not None:
+        source_files = list(source_files)
+        total = len(source_files)
+        if skipped_files:
+            print(f"[INCREMENTAL] Skipping {len(skipped_files)} file(s) unchanged since the last run (use --force to reprocess)")
+    # No more workers than files: look ahead that far before starting the pool.
+    source_files, head = _peek(source_files, jobs)
+    jobs = min(jobs, len(head))
+    def progress(i):
+        return f"[{i}/{total}]" if total is not None else f"[{i}]"
+    files_processed = 0
+
     print(f"{'-'*70}\n")
     
-    for i, filepath in enumerate(source_files, 1):
-        print(f"[{i}/{len(source_files)}] Processing: {filepath}")
-        process_file_with_treesitter(
-            filepath=filepath,
-            generator=generator,
-            in_place=args.in_place,
-            overwrite_existing=args.overwrite_existing,
-            add_type_hints=hints_enabled,
-            fix_magic_numbers=magic_enabled,
-            docstrings_enabled=docstrings_enabled,
-            dead_code=dead_code_enabled,
-            dead_code_strict=dead_code_strict_enabled,
-        )
-        print(f"{'-'*70}\n")
+    if jobs > 1:
+        # Workers share one LLM concurrency budget and split the rate limits between them.
+        print(f"[JOBS] Processing files in {jobs} worker processes\n")
+        worker_settings = {**settings, 'llm_slots': shared_semaphore(llm_concurrency),
+                           'rate_limits': split_limits(config.get('rate_limits'), jobs)}
+        stats = {}
+        with FilePool(jobs, _setup_file_worker,
+                      (args, config, worker_settings, features, quality_scorer, options, changed_lines,
+                       project_uses)) as pool:
+            results = pool.map(_process_file_job, source_files)
+            for files_processed, (filepath, output, job) in enumerate(results, 1):
+                print(f"{progress(files_processed)} Processing: {filepath}")
+                print(output, end='')
+                print(f"{'-'*70}\n", flush=True)
+                job = job or {'stats': {}, 'processed': False, 'changed': False, 'failed': True}
+                _record_if_complete(manifest_for(filepath), filepath, job['failed'], job['processed'], job['changed'],
+                                    args.in_place)
+                for key, value in job['stats'].items():
+                    stats[key] = stats.get(key, 0) + value
+    else:
+        # Analysis passes run on this thread while one repo-wide queue serves the LLM requests
+        # they emit; each file is written once a pass needs no new answers.
+        def analyse(filepath, planner):
+            return transform_file(
+                filepath, planner, args.in_place, args.overwrite_existing,
+                quality_scorer=quality_scorer,
+                docstring_batch_tokens=options['docstring_batch_tokens'],
+                magic_context_tokens=options['magic_context_tokens'],
+                parse_timeout=options['parse_timeout'],
+                changed_lines=(changed_lines or {}).get(filepath),
+                external_uses=(project_uses or {}).get(os.path.abspath(filepath)),
+                **features,
+            )
+
+        queue_stats = {}
+        results = run_pipeline(source_files, analyse, generator, max_workers=llm_concurrency,
+                               batch_size=options['docstring_batch_size'], stats=queue_stats)
+        for files_processed, (filepath, log, result, failed) in enumerate(results, 1):
+            print(f"{progress(files_processed)} Processing: {filepath}")
+            print(log, end='')
+            processed = result is not None and write_file_result(filepath, *result, in_place=args.in_place)
+            print(f"{'-'*70}\n", flush=True)
+            _record_if_complete(manifest_for(filepath), filepath, failed, processed,
+                                processed and result[0] != result[1], args.in_place)
+        stats = {**collect_llm_stats(generator), **queue_stats}
     
     # Summary
     print(f"{'='*70}")
     print(f"  [OK] Processing Complete!")
     print(f"{'='*70}")
     print(f"\nSummary:")
-    print(f"  * Files processed: {len(source_files)}")
+    print(f"  * Files processed: {files_processed}")
+    if skipped_files:
+        print(f"  * Files skipped (unchanged since last run): {len(skipped_files)} (use --force to reprocess)")
+    if unprocessable:
+        kinds = collections.Counter(kind for _, kind, _ in unprocessable)
+        breakdown = ', '.join(f"{kind}: {count}" for kind, count in sorted(kinds.items()))
+        print(f"  * Files skipped before parsing: {len(unprocessable)} ({breakdown})")
+        # The reasons, so a hand-written file skipped by mistake is easy to spot
+        for filepath, kind, detail in unprocessable[:SKIP_REPORT_LIMIT]:
+            print(f"      - {filepath}: {kind} ({detail})")
+        if len(unprocessable) > SKIP_REPORT_LIMIT:
+            print(f"      ... and {len(unprocessable) - SKIP_REPORT_LIMIT} more (see [SKIP] lines above)")
     print(f"  * Mode: {'Modified files' if args.in_place else 'Preview only'}")
+    print_llm_stats(stats)
+    close_shared_adapters()
+    if manifest is not None:
+        manifest.save()
+    if response_cache is not None:
+        response_cache.prune()
+        function_store = build_function_store(args, config)
+        if function_store is not None:
+            function_store.prune()
     if not args.in_place:
         print(f"\nTo apply changes, add the --in-place flag")
     print(f"\n{'='*70}\n")
 
 
+def clear_cache(args):
+    """Implements `zenco cache clear`."""
+    config = load_config()
+    cache_dir = args.cache_dir or config.get('cache_dir', '.zenco-cache')
+    had_manifest = RunManifest.clear(cache_dir)
+    print(f"[CACHE] {'Cleared' if had_manifest else 'No'} incremental-run manifest in {cache_dir}")
+    if not args.manifest_only:
+        removed = ResponseCache(cache_dir=cache_dir).clear()
+        print(f"[CACHE] Removed {removed} cached LLM response(s)")
+        removed = ResponseCache(cache_dir=cache_dir, namespace=STORE_NAMESPACE).clear()
+        print(f"[CACHE] Removed {removed} stored function artifact(s)")
+
+
 def main():
     """Main CLI entry point with subcommand routing."""
     parser = argparse.ArgumentParser(
@@ -539,6 +978,12 @@ Examples:
         help="Only process files changed in Git (useful for pre-commit hooks)"
     )
     
+    parser_run.add_argument(
+        "--since",
+        metavar="REF",
+        help="Only process files changed since REF's merge base, plus uncommitted changes (implies --diff; e.g. --since origin/main in CI)"
+    )
+    
     parser_run.add_argument(
         "--strategy",
         choices=["mock", "llm"],
@@ -590,6 +1035,49 @@ Examples:
         help="Override default model (e.g., gpt-4, claude-3-5-sonnet-latest, gemini-1.5-pro)"
     )
     
+    parser_run.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Maximum number of LLM requests in flight at once (default: 4, or llm_concurrency in pyproject.toml)"
+    )
+
+    parser_run.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Process files in N worker processes; the LLM concurrency budget is shared between them (default: 1)"
+    )
+
+    parser_run.add_argument(
+        "--docstring-batch-size",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Document up to N functions of a file per LLM request (default: 1, no batching)"
+    )
+
+    parser_run.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM instead of reusing responses cached from earlier runs"
+    )
+
+    parser_run.add_argument(
+        "--force",
+        action="store_true",
+        help="Process every file, including files unchanged since the last run"
+    )
+
+    parser_run.add_argument(
+        "--cache-dir",
+        default=None,
+        metavar="DIR",
+        help="Directory for the LLM response cache (default: .zenco-cache, or cache_dir in pyproject.toml)"
+    )
+
     parser_run.add_argument(
         "--docstrings",
         action="store_true",
@@ -622,6 +1110,30 @@ Examples:
 
     parser_run.set_defaults(func=run_autodoc)
 
+    # Cache command
+    parser_cache = subparsers.add_parser(
+        "cache",
+        help="Manage the incremental-run manifest and LLM response cache",
+        description="Inspect or invalidate what Zenco stores in its cache directory.",
+    )
+    cache_subparsers = parser_cache.add_subparsers(dest="cache_command", required=True)
+    parser_cache_clear = cache_subparsers.add_parser(
+        "clear",
+        help="Forget which files were processed and delete cached LLM responses and function artifacts"
+    )
+    parser_cache_clear.add_argument(
+        "--cache-dir",
+        default=None,
+        metavar="DIR",
+        help="Cache directory to clear (default: .zenco-cache, or cache_dir in pyproject.toml)"
+    )
+    parser_cache_clear.add_argument(
+        "--manifest-only",
+        action="store_true",
+        help="Only forget processed files; keep cached LLM responses and function artifacts"
+    )
+    parser_cache_clear.set_defaults(func=clear_cache)
+
     args = parser.parse_args()
     args.func(args)
 
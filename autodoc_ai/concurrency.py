@@ -0,0 +1,93 @@
+"""
+Bounded-concurrency execution of LLM requests.
+
+Processors collect the requests for a file, hand them to an LLMExecutor and then
+apply the results in source order, so the output does not depend on which request
+finished first.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+from .llm_services import ILLMService, LLMServiceWrapper
+
+DEFAULT_LLM_CONCURRENCY = 4
+
+
+class LLMExecutor:
+    """
+    Runs generator calls on a thread pool of at most `max_workers` threads.
+
+    LLM calls spend nearly all their time waiting on the network, so threads are
+    enough to overlap them. With `max_workers <= 1` calls run inline, exactly as
+    they would without an executor.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_LLM_CONCURRENCY):
+        self.max_workers = max(1, int(max_workers))
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """
+        Applies `fn` to every item and returns the results in the order of `items`.
+        The first exception raised by `fn` is re-raised, as a plain loop would.
+        """
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="zenco-llm")
+        return list(self._pool.map(fn, items))
+
+    def shutdown(self) -> None:
+        """Waits for pending calls and releases the worker threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "LLMExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+SERIAL_EXECUTOR = LLMExecutor(max_workers=1)
+
+
+class SlotLimitedLLMService(LLMServiceWrapper):
+    """
+    Holds one slot of a shared semaphore for the duration of each request. With
+    --jobs the semaphore is shared by all worker processes, so the run as a
+    whole never has more than `llm_concurrency` requests in flight.
+    """
+
+    def __init__(self, inner: ILLMService, slots: Any):
+        super().__init__(inner)
+        self.slots = slots
+
+    def create_completion(self, prompt: str) -> str:
+        with self.slots:
+            return self.inner.create_completion(prompt)
+
+
+def chunk_by_budget(items: Sequence[Any], max_items: int, max_tokens: int,
+                    cost: Callable[[Any], int]) -> List[List[Any]]:
+    """
+    Splits `items` into consecutive batches of at most `max_items` items whose
+    total `cost` stays within `max_tokens`. An item that alone exceeds the
+    budget gets a batch of its own.
+    """
+    batches: List[List[Any]] = []
+    current: List[Any] = []
+    current_cost = 0
+    for item in items:
+        item_cost = cost(item)
+        if current and (len(current) >= max_items or current_cost + item_cost > max_tokens):
+            batches.append(current)
+            current, current_cost = [], 0
+        current.append(item)
+        current_cost += item_cost
+    if current:
+        batches.append(current)
+    return batches
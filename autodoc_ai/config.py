@@ -33,7 +33,30 @@ def load_config() -> Dict[str, Any]:
         "strategy": "mock",
         "style": "google",
         "overwrite_existing": False,
-        "refactor": False
+        "refactor": False,
+        "cache": True,
+        "cache_dir": ".zenco-cache",
+        "cache_max_size_mb": 100,
+        "cache_max_age_days": 30,
+        "incremental": True,
+        "function_store": True,
+        "llm_concurrency": 4,
+        "jobs": 1,
+        "docstring_batch_size": 1,
+        "docstring_batch_tokens": 6000,
+        "magic_context_tokens": 1000,
+        "parse_timeout": 30.0,
+        "diff_scope": "functions",
+        "project_index": True,
+        "skip_files": {"enabled": True, "max_size_kb": 1024, "max_average_line_length": 200, "generated": True},
+        "combine_llm_requests": True,
+        "dedupe_functions": True,
+        "dedupe_similarity": 0.9,
+        "docstring_quality": {"enabled": True, "min_words": 8, "accept_threshold": 0.9, "reject_threshold": 0.4},
+        "http": {"timeout": 60.0},
+        "rate_limits": {},
+        "retry": {"max_attempts": 4, "base_delay": 1.0, "max_delay": 30.0},
+        "circuit_breaker": {"failure_threshold": 5, "reset_timeout": 60.0},
     }
 
     toml_path = find_pyproject_toml(os.getcwd())
@@ -0,0 +1,304 @@
+"""
+Exact and near-duplicate function detection across a run.
+
+Many repositories carry copies of the same helper in several files. Each function
+sent to the LLM is fingerprinted from its normalized token stream (comments and
+docstrings dropped, its own name and parameters replaced by placeholders) and
+indexed with MinHash signatures in an LSH table. A later function whose
+fingerprint matches exactly, or whose estimated similarity passes the threshold,
+reuses the earlier result, with the function and parameter names rewritten to
+the local ones.
+"""
+
+import hashlib
+import re
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from tree_sitter import Node
+
+from .generators import ENRICH_DOCSTRING, ENRICH_TYPE_HINTS, ENRICH_VERDICT, GeneratorWrapper, IDocstringGenerator
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 3
+DEFAULT_SIMILARITY_THRESHOLD = 0.9
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME)
+    for i in range(NUM_PERMUTATIONS)
+]
+
+COMMENT_TYPES = {"comment", "line_comment", "block_comment"}
+
+# Parameter node types that wrap the identifier without a `name` field
+PARAM_WRAPPERS = ("typed_parameter", "list_splat_pattern", "dictionary_splat_pattern", "pointer_declarator",
+                  "reference_declarator")
+
+
+def _function_name_node(func_node: Node) -> Optional[Node]:
+    name = func_node.child_by_field_name("name")
+    if name is not None:
+        return name
+    declarator = func_node.child_by_field_name("declarator")  # C++
+    while declarator is not None:
+        if declarator.type in ("identifier", "field_identifier", "qualified_identifier"):
+            return declarator
+        declarator = declarator.child_by_field_name("declarator")
+    return None
+
+
+def _parameters_node(func_node: Node) -> Optional[Node]:
+    params = func_node.child_by_field_name("parameters")
+    declarator = func_node.child_by_field_name("declarator")  # C++
+    while params is None and declarator is not None:
+        params = declarator.child_by_field_name("parameters")
+        declarator = declarator.child_by_field_name("declarator")
+    return params
+
+
+def parameter_names(func_node: Node) -> List[str]:
+    """Names of a function's parameters, in declaration order."""
+    params = _parameters_node(func_node)
+    names = []
+    for param in params.named_children if params is not None else []:
+        node = param
+        while node is not None and node.type != "identifier":
+            node = node.child_by_field_name("name") or node.child_by_field_name("declarator") or next(
+                (child for child in node.named_children if child.type in ("identifier", *PARAM_WRAPPERS)), None)
+        if node is not None:
+            names.append(node.text.decode("utf8"))
+    return names
+
+
+class FunctionShape:
+    """The normalized form of a function: token stream, fingerprint and local names."""
+
+    __slots__ = ("kind", "name", "params", "tokens", "fingerprint")
+
+    def __init__(self, func_node: Node):
+        # The node type stands in for the language: duplicates only match within the same kind of definition.
+        self.kind = func_node.type
+        name_node = _function_name_node(func_node)
+        self.name = name_node.text.decode("utf8") if name_node is not None else ""
+        self.params = parameter_names(func_node)
+        placeholders = {self.name: "$NAME", **{p: f"$P{i}" for i, p in enumerate(self.params)}}
+        docstring = _python_docstring_node(func_node)
+
+        tokens: List[str] = []
+        stack = [func_node]
+        while stack:
+            node = stack.pop()
+            if node.type in COMMENT_TYPES or (docstring is not None and node == docstring):
+                continue
+            if node.child_count == 0 or node.type in ("string", "string_literal", "interpreted_string_literal"):
+                text = node.text.decode("utf8", errors="replace")
+                tokens.append(placeholders.get(text, text))
+                continue
+            stack.extend(reversed(node.children))
+        self.tokens = tokens
+        self.fingerprint = hashlib.sha256("\x00".join([self.kind, *tokens]).encode("utf8")).hexdigest()
+
+    def minhash(self) -> Tuple[int, ...]:
+        """MinHash signature of the token shingles."""
+        shingles = {" ".join(self.tokens[i:i + SHINGLE_SIZE])
+                    for i in range(max(1, len(self.tokens) - SHINGLE_SIZE + 1))}
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf8"), digest_size=8).digest(), "big") for s in shingles]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _python_docstring_node(func_node: Node) -> Optional[Node]:
+    body = func_node.child_by_field_name("body")
+    if func_node.type != "function_definition" or body is None or not body.children:
+        return None
+    first = body.children[0]
+    if first.type == "expression_statement" and first.children and first.children[0].type == "string":
+        return first
+    return None
+
+
+def estimated_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class _Entry:
+    __slots__ = ("shape", "signature", "results")
+
+    def __init__(self, shape: FunctionShape, signature: Tuple[int, ...]):
+        self.shape = shape
+        self.signature = signature
+        self.results: Dict[Any, Future] = {}
+
+
+class DuplicateIndex:
+    """Exact-fingerprint map plus a banded LSH table over MinHash signatures."""
+
+    def __init__(self, threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.exact: Dict[str, _Entry] = {}
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], List[_Entry]] = {}
+        self.rows = NUM_PERMUTATIONS // LSH_BANDS
+
+    def find(self, shape: FunctionShape, signature: Tuple[int, ...]) -> Tuple[Optional[_Entry], bool]:
+        """Returns (entry, is_exact) for the best duplicate of `shape`, or (None, False)."""
+        entry = self.exact.get(shape.fingerprint)
+        if entry is not None:
+            return entry, True
+        best, best_score = None, self.threshold
+        seen: Set[int] = set()
+        for band in range(LSH_BANDS):
+            for candidate in self.buckets.get(self._band_key(signature, band), ()):
+                if id(candidate) in seen or candidate.shape.kind != shape.kind:
+                    continue
+                seen.add(id(candidate))
+                score = estimated_similarity(signature, candidate.signature)
+                if score >= best_score:
+                    best, best_score = candidate, score
+        return best, False
+
+    def add(self, shape: FunctionShape, signature: Tuple[int, ...]) -> _Entry:
+        entry = _Entry(shape, signature)
+        self.exact[shape.fingerprint] = entry
+        for band in range(LSH_BANDS):
+            self.buckets.setdefault(self._band_key(signature, band), []).append(entry)
+        return entry
+
+    def _band_key(self, signature: Tuple[int, ...], band: int) -> Tuple[int, Tuple[int, ...]]:
+        return band, signature[band * self.rows:(band + 1) * self.rows]
+
+
+def _rename(text: str, mapping: Dict[str, str]) -> str:
+    mapping = {old: new for old, new in mapping.items() if old and new and old != new}
+    if not mapping:
+        return text
+    pattern = re.compile(r"\b(" + "|".join(re.escape(old) for old in sorted(mapping, key=len, reverse=True)) + r")\b")
+    return pattern.sub(lambda m: mapping[m.group(1)], text)
+
+
+def _has_type_hints(kind: Any) -> bool:
+    return kind == "type_hints" or (isinstance(kind, tuple) and ENRICH_TYPE_HINTS in kind[1])
+
+
+def adapt_result(kind: Any, result: Any, source: FunctionShape, target: FunctionShape) -> Any:
+    """
+    Rewrites a result generated for `source` so it refers to `target`'s names.
+    Parameters are matched by position, so type hints are only carried over
+    between parameter lists of the same length; otherwise returns None.
+    """
+    if _has_type_hints(kind) and len(source.params) != len(target.params):
+        return None
+    mapping = {source.name: target.name, **dict(zip(source.params, target.params))}
+    if isinstance(result, str):
+        return _rename(result, mapping)
+    if isinstance(result, dict):
+        adapted = dict(result)
+        if isinstance(adapted.get("parameters"), dict):
+            adapted["parameters"] = {mapping.get(k, k): v for k, v in adapted["parameters"].items()}
+        if isinstance(adapted.get(ENRICH_DOCSTRING), str):
+            adapted[ENRICH_DOCSTRING] = _rename(adapted[ENRICH_DOCSTRING], mapping)
+        if isinstance(adapted.get(ENRICH_TYPE_HINTS), dict):
+            adapted[ENRICH_TYPE_HINTS] = adapt_result("type_hints", adapted[ENRICH_TYPE_HINTS], source, target)
+        return adapted
+    return result
+
+
+class DedupGenerator(GeneratorWrapper):
+    """
+    Shares docstrings, type hints and combined enrichment results between exact
+    and near-duplicate functions across the whole run. Concurrent requests for
+    duplicates wait for the first one instead of calling the LLM again.
+    """
+
+    def __init__(self, inner: IDocstringGenerator, threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        super().__init__(inner)
+        self.index = DuplicateIndex(threshold)
+        self.exact_reuses = 0
+        self.near_reuses = 0
+        self._lock = threading.Lock()
+
+    def _claim(self, kind: Any, node: Node):
+        """Finds or registers the index entry answering `kind` for `node`. Returns (shape, entry, future, owner)."""
+        shape = FunctionShape(node)
+        if len(shape.tokens) < SHINGLE_SIZE:
+            return shape, None, None, True
+        signature = shape.minhash()
+        with self._lock:
+            entry, exact = self.index.find(shape, signature)
+            future = entry.results.get(kind) if entry is not None else None
+            if future is not None:
+                if exact:
+                    self.exact_reuses += 1
+                else:
+                    self.near_reuses += 1
+                return shape, entry, future, False
+            if entry is None or not exact:
+                entry = self.index.add(shape, signature)
+            future = entry.results[kind] = Future()
+            return shape, entry, future, True
+
+    def _settle(self, kind: Any, entry, future: Optional[Future], compute: Callable[[], Any]) -> Any:
+        """Runs `compute` for a claimed entry and publishes the result to waiting duplicates."""
+        try:
+            result = compute()
+        except Exception as e:
+            self._abandon(kind, entry, future, e)
+            raise
+        if future is not None:
+            future.set_result(result)
+        return result
+
+    def _abandon(self, kind: Any, entry, future: Optional[Future], exc: Exception) -> None:
+        """Fails waiting duplicates and forgets the claim so a later copy can try again."""
+        if future is not None:
+            future.set_exception(exc)
+            with self._lock:
+                entry.results.pop(kind, None)
+
+    def _reuse(self, kind: Any, shape: FunctionShape, entry, future: Future, compute: Callable[[], Any]) -> Any:
+        result = future.result()
+        # An empty result (a failed request) is not worth sharing; try again for this copy.
+        adapted = adapt_result(kind, result, entry.shape, shape) if result else None
+        return adapted if adapted is not None else compute()
+
+    def _dedupe(self, kind: Any, node: Node, compute: Callable[[], Any]) -> Any:
+        shape, entry, future, owner = self._claim(kind, node)
+        if owner:
+            return self._settle(kind, entry, future, compute)
+        return self._reuse(kind, shape, entry, future, compute)
+
+    def generate(self, node: Node) -> str:
+        return self._dedupe("docstring", node, lambda: self.inner.generate(node))
+
+    def generate_batch(self, nodes: List[Node]) -> List[str]:
+        claims = [self._claim("docstring", node) for node in nodes]
+        owned = [i for i, claim in enumerate(claims) if claim[3]]
+        results: List[Any] = [None] * len(nodes)
+        try:
+            generated = self.inner.generate_batch([nodes[i] for i in owned]) if owned else []
+        except Exception as e:
+            for i in owned:
+                self._abandon("docstring", claims[i][1], claims[i][2], e)
+            raise
+        for i, docstring in zip(owned, generated):
+            results[i] = self._settle("docstring", claims[i][1], claims[i][2], lambda: docstring)
+        for i, (shape, entry, future, owner) in enumerate(claims):
+            if not owner:
+                results[i] = self._reuse("docstring", shape, entry, future, lambda: self.inner.generate(nodes[i]))
+        return results
+
+    def generate_type_hints(self, node: Node) -> dict:
+        return self._dedupe("type_hints", node, lambda: self.inner.generate_type_hints(node))
+
+    def enrich(self, node: Node, fields: Set[str], existing_docstring: Optional[str] = None) -> Dict[str, Any]:
+        if ENRICH_VERDICT in fields and existing_docstring is not None:
+            # A verdict depends on the existing docstring, not only on the code.
+            return self.inner.enrich(node, fields, existing_docstring)
+        return self._dedupe(("enrich", frozenset(fields)), node,
+                            lambda: self.inner.enrich(node, fields, existing_docstring))
+
+    def stats(self) -> Dict[str, int]:
+        return {"dedup_exact": self.exact_reuses, "dedup_near": self.near_reuses}
@@ -0,0 +1,207 @@
+"""
+Streaming discovery of the source files to process.
+
+Inside a git work tree the file list comes from the git index (`git ls-files`),
+which already applies every .gitignore. Elsewhere the tree is walked with ignored
+directories pruned before they are entered, honoring .gitignore and .zencoignore
+files at every level, while a thread pool scans the upcoming directories ahead of
+the walk. Either way files are yielded as soon as they are found, so processing
+starts long before discovery of a large tree has finished.
+"""
+
+import os
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .utils import SUPPORTED_EXTENSIONS, GitError, run_git
+
+# Ignore files honored in every directory; git itself only applies .gitignore
+IGNORE_FILES = (".gitignore", ".zencoignore")
+ZENCO_IGNORE_FILE = ".zencoignore"
+# Directories never entered, ignore files or not
+ALWAYS_IGNORED = frozenset({".git", "venv", ".venv", "__pycache__", "node_modules", ".zenco-cache"})
+SCAN_WORKERS = 8
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class IgnoreFile:
+    """The patterns of one ignore file, matched against paths relative to its directory."""
+    __slots__ = ("base", "patterns")
+
+    def __init__(self, base: str, lines: List[str]):
+        import pathspec
+        self.base = base  # directory holding the file, relative to the walk root, '/'-terminated ('' at the root)
+        self.patterns = pathspec.GitIgnoreSpec.from_lines(lines).patterns
+
+    def verdict(self, relpath: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no pattern matches."""
+        path = relpath[len(self.base):] + ("/" if is_dir else "")
+        result = None
+        for pattern in self.patterns:
+            if pattern.include is not None and pattern.match_file(path) is not None:
+                result = pattern.include
+        return result
+
+
+IgnoreRules = Tuple[IgnoreFile, ...]
+
+
+def is_ignored(rules: IgnoreRules, relpath: str, is_dir: bool = False) -> bool:
+    """Applies ignore files from the deepest directory up; the first one with an opinion decides."""
+    for ignore_file in reversed(rules):
+        verdict = ignore_file.verdict(relpath, is_dir)
+        if verdict is not None:
+            return verdict
+    return False
+
+
+def _read_ignore_file(path: str) -> Optional[List[str]]:
+    try:
+        with open(path, "r", encoding="utf8", errors="replace") as f:
+            return f.read().splitlines()
+    except OSError:
+        return None
+
+
+def _scan(directory: str) -> Tuple[List[str], List[str], Dict[str, List[str]]]:
+    """Sorted subdirectory and file names of a directory, plus the ignore files it holds."""
+    dirs, files, ignore_lines = [], [], {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    elif entry.name in IGNORE_FILES:
+                        lines = _read_ignore_file(entry.path)
+                        if lines is not None:
+                            ignore_lines[entry.name] = lines
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        pass  # unreadable directories are skipped, as os.walk does
+    dirs.sort()
+    files.sort()
+    return dirs, files, ignore_lines
+
+
+def walk_source_files(root: str, workers: int = SCAN_WORKERS) -> Iterator[str]:
+    """
+    Yields the supported source files under `root` depth-first (each directory's
+    files before its subdirectories, names sorted). Directories are matched against
+    the ignore rules before they are scanned, so an ignored `build/` or
+    `node_modules/` costs nothing however large it is.
+    """
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zenco-scan")
+    try:
+        stack: List[Tuple[str, str, IgnoreRules, Future]] = [(root, "", (), pool.submit(_scan, root))]
+        while stack:
+            directory, relative, parent_rules, scanned = stack.pop()
+            dirs, files, ignore_lines = scanned.result()
+            rules = parent_rules + tuple(
+                IgnoreFile(relative, ignore_lines[name]) for name in IGNORE_FILES if name in ignore_lines
+            )
+            for name in files:
+                if os.path.splitext(name)[1] in SUPPORTED_EXTENSIONS and not is_ignored(rules, relative + name):
+                    yield os.path.join(directory, name)
+            children = []
+            for name in dirs:
+                if name in ALWAYS_IGNORED or is_ignored(rules, relative + name, is_dir=True):
+                    continue
+                child = os.path.join(directory, name)
+                children.append((child, f"{relative}{name}/", rules, pool.submit(_scan, child)))
+            stack.extend(reversed(children))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _ZencoIgnoreRules:
+    """.zencoignore rules of the directories under a root, read once per directory on demand."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._rules: Dict[str, IgnoreRules] = {}
+
+    def for_directory(self, relative: str) -> IgnoreRules:
+        """Rules that apply inside `relative` ('' or a '/'-terminated path under the root)."""
+        rules = self._rules.get(relative)
+        if rules is None:
+            parent = relative[:relative.rstrip("/").rfind("/") + 1] if relative else None
+            rules = self.for_directory(parent) if parent is not None else ()
+            lines = _read_ignore_file(os.path.join(self.root, relative, ZENCO_IGNORE_FILE))
+            if lines is not None:
+                rules = rules + (IgnoreFile(relative, lines),)
+            self._rules[relative] = rules
+        return rules
+
+
+def git_source_files(root: str) -> Optional[Iterator[str]]:
+    """
+    Streams the supported source files under `root` from the git index: tracked
+    files plus untracked ones not excluded by the repository's ignore rules.
+    .zencoignore files are applied on top. Returns None outside a git work tree.
+    """
+    try:
+        if run_git(["rev-parse", "--is-inside-work-tree"], cwd=root).strip() != "true":
+            return None
+    except GitError:
+        return None
+    return _stream_git_files(root)
+
+
+def _stream_git_files(root: str) -> Iterator[str]:
+    process = subprocess.Popen(
+        ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+        cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    zenco_rules = _ZencoIgnoreRules(root)
+    listed = False
+    previous = None  # unmerged paths are listed once per conflict stage, one after another
+    try:
+        pending = b""
+        for chunk in iter(lambda: process.stdout.read1(READ_CHUNK_SIZE), b""):
+            *entries, pending = (pending + chunk).split(b"\0")
+            listed = listed or bool(entries)
+            for entry in entries:
+                relpath = os.fsdecode(entry)
+                if os.path.splitext(relpath)[1] not in SUPPORTED_EXTENSIONS or relpath == previous:
+                    continue
+                previous = relpath
+                parts = relpath.split("/")
+                if ALWAYS_IGNORED.intersection(parts[:-1]):
+                    continue
+                directory = "".join(part + "/" for part in parts[:-1])
+                if is_ignored(zenco_rules.for_directory(directory), relpath):
+                    continue
+                path = os.path.join(root, *parts)
+                if os.path.isfile(path):  # tracked files may be deleted in the work tree
+                    yield path
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+    if not listed:
+        # Nothing tracked or unignored here (e.g. the target is itself git-ignored): walk it instead.
+        yield from walk_source_files(root)
+
+
+def iter_source_files(path: str) -> Iterator[str]:
+    """
+    Yields the supported source files in `path` (a file or a directory) as they
+    are discovered, respecting .gitignore and .zencoignore files.
+    """
+    if os.path.isfile(path):
+        if os.path.splitext(path)[1] in SUPPORTED_EXTENSIONS:
+            yield os.path.abspath(path)
+        return
+
+    if not os.path.isdir(path):
+        print(f"Error: Path `{path}` is not valid file or directory.")
+        return
+
+    files = git_source_files(path)
+    yield from files if files is not None else walk_source_files(path)
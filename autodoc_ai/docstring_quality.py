@@ -0,0 +1,106 @@
+"""
+Static docstring-quality checks.
+
+With --overwrite-existing every documented function used to cost an LLM round
+trip just to decide whether its docstring was good enough. DocstringScorer
+rates a docstring locally from its length, how many parameters it mentions,
+whether it documents the return value and whether it is a placeholder, and
+only leaves the ambiguous middle band for the LLM to judge.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from tree_sitter import Node
+
+from .dedup import parameter_names
+
+# Matched at the start of the docstring only: "Adds a todo item." is a real description.
+PLACEHOLDER_PATTERNS = (
+    r"^\W*(todo|fixme|tbd|xxx)\b", r"^\W*placeholder\W*$", r"^\W*lorem ipsum",
+    r"^\W*(add|insert) (a )?(docstring|description)\b", r"^\W*$",
+)
+RETURNS_PATTERN = re.compile(r"^\s*(returns?|yields?)\s*:|^\s*(returns?|yields?)\s*\n\s*-{3,}|:returns?:|:rtype:|@returns?\b",
+                             re.IGNORECASE | re.MULTILINE)
+IMPLICIT_PARAMETERS = {"self", "cls"}
+NESTED_SCOPES = {"function_definition", "lambda", "class_definition"}
+
+# Weights of the individual checks in the final score
+LENGTH_WEIGHT = 0.3
+PARAMETER_WEIGHT = 0.4
+RETURNS_WEIGHT = 0.3
+
+
+def docstring_body(literal: str) -> str:
+    """Strips string prefixes and quotes from a docstring literal."""
+    text = literal.strip().lstrip("rRbBuUfF")
+    for quote in ('"""', "'''", '"', "'"):
+        if text.startswith(quote) and text.endswith(quote) and len(text) >= 2 * len(quote):
+            return text[len(quote):-len(quote)].strip()
+    return text
+
+
+def returns_value(func_node: Node) -> bool:
+    """True if the function has a return annotation or a `return <value>`/`yield` of its own."""
+    return_type = func_node.child_by_field_name("return_type")
+    if return_type is not None:
+        return return_type.text.decode("utf8") != "None"
+    body = func_node.child_by_field_name("body")
+    stack = list(body.children) if body is not None else []
+    while stack:
+        node = stack.pop()
+        if node.type in NESTED_SCOPES:
+            continue
+        if node.type == "yield" or (node.type == "return_statement" and node.named_child_count > 0):
+            return True
+        stack.extend(node.children)
+    return False
+
+
+class DocstringScorer:
+    """
+    Scores a Python docstring between 0 and 1. Scores at or above
+    `accept_threshold` are good, scores at or below `reject_threshold` are poor,
+    and anything in between is left to the LLM.
+    """
+
+    def __init__(self, min_words: int = 8, accept_threshold: float = 0.9, reject_threshold: float = 0.4):
+        self.min_words = max(1, int(min_words))
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self._placeholders = re.compile("|".join(PLACEHOLDER_PATTERNS), re.IGNORECASE)
+
+    def score(self, func_node: Node, docstring: str) -> Tuple[float, List[str]]:
+        """Returns the score and the reasons it fell short of 1."""
+        text = docstring_body(docstring)
+        if self._placeholders.search(text):
+            return 0.0, ["placeholder text"]
+
+        reasons = []
+        words = len(text.split())
+        length_score = min(1.0, words / self.min_words)
+        if length_score < 1:
+            reasons.append(f"{words} word(s)")
+
+        params = [p for p in parameter_names(func_node) if p not in IMPLICIT_PARAMETERS]
+        missing = [p for p in params if not re.search(rf"\b{re.escape(p)}\b", text)]
+        parameter_score = 1 - len(missing) / len(params) if params else 1.0
+        if missing:
+            reasons.append(f"undocumented parameter(s): {', '.join(missing)}")
+
+        returns_score = 1.0
+        if returns_value(func_node) and not RETURNS_PATTERN.search(text):
+            returns_score = 0.0
+            reasons.append("no returns section")
+
+        score = LENGTH_WEIGHT * length_score + PARAMETER_WEIGHT * parameter_score + RETURNS_WEIGHT * returns_score
+        return round(score, 3), reasons
+
+    def decide(self, func_node: Node, docstring: str) -> Optional[bool]:
+        """True if clearly good, False if clearly poor, None if the LLM should decide."""
+        score, _ = self.score(func_node, docstring)
+        if score >= self.accept_threshold:
+            return True
+        if score <= self.reject_threshold:
+            return False
+        return None
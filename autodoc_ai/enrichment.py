@@ -0,0 +1,136 @@
+"""
+Combined per-function enrichment.
+
+With several features enabled, a function used to cost one LLM round trip per
+feature: `generate` (docstrings), `generate_type_hints` (type hints) and
+`evaluate` (--overwrite-existing). EnrichingGenerator asks for everything a
+function needs in a single `enrich` request the first time any processor asks
+about it, and serves the other processors from that shared result.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Set
+
+from tree_sitter import Node
+
+from .docstring_quality import DocstringScorer
+from .generators import (
+    ENRICH_DOCSTRING,
+    ENRICH_TYPE_HINTS,
+    ENRICH_VERDICT,
+    GeneratorWrapper,
+    IDocstringGenerator,
+)
+
+
+def existing_python_docstring(func_node: Node) -> Optional[str]:
+    """Returns the docstring literal of a Python function node, or None."""
+    body = func_node.child_by_field_name("body")
+    if body is None or not body.children:
+        return None
+    first = body.children[0]
+    if first.type == "expression_statement" and first.children and first.children[0].type == "string":
+        return first.children[0].text.decode("utf8")
+    return None
+
+
+def is_python_function(node: Node) -> bool:
+    """True for a Python function; C++ function definitions share the node type."""
+    if node.type != "function_definition":
+        return False
+    root = node
+    while root.parent is not None:
+        root = root.parent
+    return root.type == "module"
+
+
+class EnrichingGenerator(GeneratorWrapper):
+    """
+    Serves docstrings, type hints and docstring verdicts from one combined request
+    per function. Results are shared by key (the function's text), so every
+    processor working on the same function reuses them. Fields missing from a
+    combined response fall back to the single-purpose methods of the wrapped generator.
+    """
+
+    def __init__(self, inner: IDocstringGenerator, docstrings: bool = True,
+                 type_hints: bool = False, evaluation: bool = False,
+                 quality_scorer: Optional[DocstringScorer] = None):
+        super().__init__(inner)
+        self.quality_scorer = quality_scorer
+        self.docstrings = docstrings
+        self.type_hints = type_hints
+        self.evaluation = evaluation
+        self.requests = 0
+        self.functions = 0
+        self._results: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _fields_for(self, node: Node, existing_docstring: Optional[str]) -> Set[str]:
+        """The results processors will ask for about this function."""
+        fields = set()
+        if self.docstrings and existing_docstring is None:
+            fields.add(ENRICH_DOCSTRING)
+        elif self.docstrings and self.evaluation:
+            # Skip the verdict (and the replacement, if clearly good) when the static check decides.
+            decision = self.quality_scorer.decide(node, existing_docstring) if self.quality_scorer else None
+            if decision is None:
+                fields.update({ENRICH_DOCSTRING, ENRICH_VERDICT})
+            elif decision is False:
+                fields.add(ENRICH_DOCSTRING)
+        # TypeHintProcessor only handles Python
+        if self.type_hints and is_python_function(node) and node.child_by_field_name("return_type") is None:
+            name = node.child_by_field_name("name")
+            func_name = name.text.decode("utf8") if name is not None else ""
+            # TypeHintProcessor skips dunder methods
+            if not (func_name.startswith("__") and func_name.endswith("__")):
+                fields.add(ENRICH_TYPE_HINTS)
+        return fields
+
+    def _enrichment(self, node: Node, existing_docstring: Optional[str] = None) -> Dict[str, Any]:
+        key = hashlib.sha256(node.text).hexdigest()
+        with self._lock:
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                # Concurrent callers for the same function wait for this request instead of repeating it.
+                future = self._results[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            if existing_docstring is None and is_python_function(node):
+                existing_docstring = existing_python_docstring(node)
+            fields = self._fields_for(node, existing_docstring)
+            result = self.inner.enrich(node, fields, existing_docstring) if fields else {}
+        except Exception as e:
+            with self._lock:
+                del self._results[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.requests += 1 if fields else 0
+            self.functions += 1
+        future.set_result(result)
+        return result
+
+    def generate(self, node: Node) -> str:
+        docstring = self._enrichment(node).get(ENRICH_DOCSTRING)
+        return docstring if docstring else self.inner.generate(node)
+
+    def generate_batch(self, nodes):
+        # Each function is already answered by its own combined request.
+        return [self.generate(node) for node in nodes]
+
+    def generate_type_hints(self, node: Node) -> dict:
+        type_hints = self._enrichment(node).get(ENRICH_TYPE_HINTS)
+        return type_hints if type_hints is not None else self.inner.generate_type_hints(node)
+
+    def evaluate(self, node: Node, docstring: str) -> bool:
+        verdict = self._enrichment(node, docstring).get(ENRICH_VERDICT)
+        return verdict if verdict is not None else self.inner.evaluate(node, docstring)
+
+    def stats(self) -> Dict[str, int]:
+        return {"enrich_requests": self.requests, "enrich_functions": self.functions}
@@ -0,0 +1,101 @@
+"""
+Pre-parse classification of files not worth processing.
+
+Vendored minified bundles and generated sources (protobuf, gRPC, code
+generators) used to be read, parsed and sent to the LLM like hand-written
+code. FileClassifier recognizes them from a stat and the first few KiB of the
+file, before anything is parsed: size, binary or undecodable content,
+"generated" header markers and an average line length no human writes.
+"""
+
+import codecs
+import os
+import re
+from typing import Optional, Tuple
+
+OVERSIZED = "oversized"
+BINARY = "binary"
+GENERATED = "generated"
+MINIFIED = "minified"
+
+# Markers code generators put at the start of a line of the file's header comment
+GENERATED_MARKERS = re.compile(
+    r"^\W*(code generated .*do not edit|@generated|do not edit\W*$|"
+    r"(this file (is|was|has been) )?(automatically|auto-?)generated (file|code|by|from)\b|"
+    r"this file (is|was|has been) generated\b|generated by the protocol buffer compiler|generated by protoc)",
+    re.IGNORECASE,
+)
+# Lines of a header comment (or module docstring); the first other non-blank line ends the header
+HEADER_COMMENT_LINE = re.compile(r"""^\s*(#|//|/\*|\*|"{3}|'{3}|<!--)""")
+BLOCK_DELIMITERS = (("/*", "*/"), ('"""', '"""'), ("'''", "'''"), ("<!--", "-->"))
+# Bytes of the header searched for markers
+HEADER_BYTES = 2048
+# Samples shorter than this say nothing reliable about line length
+MIN_LINE_SAMPLE_BYTES = 1024
+
+
+class FileClassifier:
+    """
+    Decides whether a file should be skipped without parsing it. Only the first
+    `sample_kb` KiB are read; `classify` returns (kind, detail) for a file to
+    skip, where kind is one of oversized, binary, generated or minified, and None
+    for a file to process.
+    """
+
+    def __init__(self, max_size_kb: float = 1024, max_average_line_length: int = 200,
+                 skip_generated: bool = True, sample_kb: float = 32):
+        self.max_bytes = int(max_size_kb * 1024) if max_size_kb else None
+        self.max_average_line_length = max_average_line_length or None
+        self.skip_generated = skip_generated
+        self.sample_bytes = max(HEADER_BYTES, int(sample_kb * 1024))
+
+    def classify(self, filepath: str) -> Optional[Tuple[str, str]]:
+        try:
+            size = os.path.getsize(filepath)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return OVERSIZED, f"{size // 1024} KiB is over the {self.max_bytes // 1024} KiB limit"
+            with open(filepath, "rb") as f:
+                sample = f.read(self.sample_bytes)
+        except OSError:
+            return None  # reported by the processing step, like any other unreadable file
+
+        if b"\0" in sample:
+            return BINARY, "contains NUL bytes"
+        try:
+            # A multi-byte character may be cut off at the end of the sample.
+            text = codecs.getincrementaldecoder("utf8")().decode(sample, final=len(sample) == size)
+        except UnicodeDecodeError:
+            return BINARY, "not valid UTF-8"
+
+        if self.skip_generated:
+            marker = _generated_marker(text[:HEADER_BYTES])
+            if marker:
+                return GENERATED, f"header says '{marker}'"
+
+        if self.max_average_line_length is not None and len(text) >= MIN_LINE_SAMPLE_BYTES:
+            average = len(text) / (text.count("\n") + 1)
+            if average > self.max_average_line_length:
+                return MINIFIED, f"average line length {average:.0f}"
+        return None
+
+
+def _generated_marker(header: str) -> Optional[str]:
+    """The generator marker on a line of the comments at the top of a file, if any."""
+    block_end = None  # closing delimiter of an open block comment or docstring
+    for line in header.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if block_end is None and not HEADER_COMMENT_LINE.match(stripped):
+            return None
+        marker = GENERATED_MARKERS.match(stripped)
+        if marker:
+            return marker.group(1).strip()
+        if block_end is not None:
+            block_end = None if block_end in stripped else block_end
+            continue
+        for opener, closer in BLOCK_DELIMITERS:
+            if stripped.startswith(opener) and closer not in stripped[len(opener):]:
+                block_end = closer
+                break
+    return None
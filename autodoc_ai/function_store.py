@@ -0,0 +1,124 @@
+"""
+Function-level memoization of generated artifacts.
+
+The LLM response cache is keyed by the whole prompt, so a batched or combined
+request misses as soon as any function in it changes, or when the request
+shape changes (batch size, enabled features). MemoizingGenerator stores each
+artifact on its own, keyed by the normalized text of the function it
+describes: docstrings, type hints and verdicts on existing docstrings. Only
+functions whose text actually changed cost an LLM call, whichever request
+would have produced the result.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+from tree_sitter import Node
+
+from .generators import ENRICH_DOCSTRING, ENRICH_TYPE_HINTS, ENRICH_VERDICT, GeneratorWrapper, IDocstringGenerator
+from .llm_cache import ResponseCache, normalize_prompt
+
+STORE_NAMESPACE = "functions"
+
+# Store kind of each combined-enrichment field
+FIELD_KINDS = {ENRICH_DOCSTRING: "docstring", ENRICH_TYPE_HINTS: "type_hints", ENRICH_VERDICT: "verdict"}
+
+
+class MemoizingGenerator(GeneratorWrapper):
+    """
+    Serves docstrings, type hints and docstring verdicts from a persistent
+    per-function store and records new ones. Keys combine the artifact kind,
+    provider, model, docstring style and the normalized function text (plus the
+    existing docstring for verdicts). Empty results are never stored.
+    """
+
+    def __init__(self, inner: IDocstringGenerator, store: ResponseCache, provider: str = "",
+                 model: str = "", style: str = "google"):
+        super().__init__(inner)
+        self.store = store
+        self.scope = [provider, model, style]
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, kind: str, node: Node, extra: str = "") -> str:
+        payload = json.dumps([kind, *self.scope, normalize_prompt(node.text.decode("utf8")), extra])
+        return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        value = self.store.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def _remember(self, key: str, value: Any, kind: str) -> Any:
+        if kind == "type_hints":
+            worth_storing = isinstance(value, dict) and bool(value.get("parameters") or value.get("return_type"))
+        else:
+            worth_storing = bool(value) or isinstance(value, bool)
+        if worth_storing:
+            self.store.put(key, value, kind=kind)
+        return value
+
+    def generate(self, node: Node) -> str:
+        key = self._key("docstring", node)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._remember(key, self.inner.generate(node), "docstring")
+
+    def generate_batch(self, nodes: List[Node]) -> List[str]:
+        keys = [self._key("docstring", node) for node in nodes]
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            generated = self.inner.generate_batch([nodes[i] for i in missing])
+            for i, docstring in zip(missing, generated):
+                results[i] = self._remember(keys[i], docstring, "docstring")
+        return results
+
+    def evaluate(self, node: Node, docstring: str) -> bool:
+        key = self._key("verdict", node, docstring)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        verdict = bool(self.inner.evaluate(node, docstring))
+        # A failed evaluation request also reads as "poor"; only positive verdicts are trustworthy to keep.
+        return self._remember(key, verdict, "verdict") if verdict else verdict
+
+    def generate_type_hints(self, node: Node) -> dict:
+        key = self._key("type_hints", node)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        return self._remember(key, self.inner.generate_type_hints(node), "type_hints")
+
+    def enrich(self, node: Node, fields: Set[str], existing_docstring: Optional[str] = None) -> Dict[str, Any]:
+        keys = {
+            field: self._key(FIELD_KINDS[field], node, (existing_docstring or "") if field == ENRICH_VERDICT else "")
+            for field in fields if field in FIELD_KINDS
+        }
+        result: Dict[str, Any] = {}
+        for field, key in keys.items():
+            cached = self._lookup(key)
+            if cached is not None:
+                result[field] = cached
+        missing = set(fields) - set(result)
+        if missing:
+            # Ask only for what the store could not answer.
+            fresh = self.inner.enrich(node, missing, existing_docstring)
+            for field, value in fresh.items():
+                if field not in missing:
+                    continue
+                if field in keys:
+                    self._remember(keys[field], value, FIELD_KINDS[field])
+                result[field] = value
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {"function_store_hits": self.hits, "function_store_misses": self.misses}
@@ -1,10 +1,50 @@
 import abc
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 from tree_sitter import Node
-from typing import Optional
-from .llm_services import ILLMService, GroqAdapter
+from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
+from .llm_services import ILLMService, GroqAdapter, get_shared_adapter, llm_task
+from .rate_limit import DEFAULT_EXPECTED_OUTPUT_TOKENS, RateLimitedLLMService, get_rate_limiter, resolve_limits
+from .resilience import CircuitBreaker, ResilientLLMService, RetryPolicy
+
+if TYPE_CHECKING:
+    from .llm_cache import ResponseCache
+
+# Fields a combined enrichment request can ask for (see IDocstringGenerator.enrich)
+ENRICH_DOCSTRING = "docstring"
+ENRICH_TYPE_HINTS = "type_hints"
+ENRICH_VERDICT = "docstring_ok"
+
+# Keys of the [tool.zenco.retry] and [tool.zenco.circuit_breaker] tables
+RETRY_OPTIONS = ("max_attempts", "base_delay", "max_delay")
+CIRCUIT_BREAKER_OPTIONS = ("failure_threshold", "reset_timeout")
+
+
+def parse_json_object(response: str) -> Dict[str, Any]:
+    """Extracts a JSON object from an LLM response, unwrapping markdown fences. Returns {} if invalid."""
+    response = response.strip()
+    if "```json" in response:
+        response = response.split("```json")[1].split("```")[0].strip()
+    elif "```" in response:
+        response = response.split("```")[1].split("```")[0].strip()
+    try:
+        data = json.loads(response)
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def known_options(options: Optional[Dict[str, Any]], accepted: tuple, table: str) -> Dict[str, Any]:
+    """The entries of a config table whose keys are `accepted`; unknown keys are reported and dropped."""
+    known: Dict[str, Any] = {}
+    for key, value in (options or {}).items():
+        if key in accepted:
+            known[key] = value
+        else:
+            print(f"  [WARN] Ignoring unknown key '{key}' in [tool.zenco.{table}] "
+                  f"(expected one of: {', '.join(accepted)})")
+    return known
 
 class IDocstringGenerator(abc.ABC):
     """An interface for AI strategies using Tree-sitter."""
@@ -13,6 +53,10 @@ class IDocstringGenerator(abc.ABC):
         """Generates a docstring for a given Tree-sitter node."""
         pass
 
+    def generate_batch(self, nodes: List[Node]) -> List[str]:
+        """Generates docstrings for several nodes. Returns them in the order of `nodes`."""
+        return [self.generate(node) for node in nodes]
+
     @abc.abstractmethod
     def evaluate(self, node: Node, docstring: str) -> bool:
         """Evaluates if a docstring is high quality."""
@@ -33,6 +77,55 @@ class IDocstringGenerator(abc.ABC):
         """Suggests a constant name for a magic number."""
         pass
 
+    def enrich(self, node: Node, fields: Set[str], existing_docstring: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Produces several per-function results at once: a docstring, type hints and/or a
+        verdict on `existing_docstring`, as selected by `fields` (ENRICH_* constants).
+        The default makes one call per field; LLMGenerator answers with a single request.
+        """
+        result: Dict[str, Any] = {}
+        if ENRICH_DOCSTRING in fields:
+            result[ENRICH_DOCSTRING] = self.generate(node)
+        if ENRICH_TYPE_HINTS in fields:
+            result[ENRICH_TYPE_HINTS] = self.generate_type_hints(node)
+        if ENRICH_VERDICT in fields and existing_docstring is not None:
+            result[ENRICH_VERDICT] = self.evaluate(node, existing_docstring)
+        return result
+
+
+class GeneratorWrapper(IDocstringGenerator):
+    """Base class for generators that decorate another generator. Every call is delegated."""
+
+    def __init__(self, inner: IDocstringGenerator):
+        self.inner = inner
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose attributes of the wrapped generator (e.g. `llm_service`, `style`).
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def generate(self, node: Node) -> str:
+        return self.inner.generate(node)
+
+    def generate_batch(self, nodes: List[Node]) -> List[str]:
+        return self.inner.generate_batch(nodes)
+
+    def evaluate(self, node: Node, docstring: str) -> bool:
+        return self.inner.evaluate(node, docstring)
+
+    def suggest_name(self, node: Node, old_name: str) -> Optional[str]:
+        return self.inner.suggest_name(node, old_name)
+
+    def generate_type_hints(self, node: Node) -> dict:
+        return self.inner.generate_type_hints(node)
+
+    def suggest_constant_name(self, code_context: str, magic_number: str) -> Optional[str]:
+        return self.inner.suggest_constant_name(code_context, magic_number)
+
+    def enrich(self, node: Node, fields: Set[str], existing_docstring: Optional[str] = None) -> Dict[str, Any]:
+        return self.inner.enrich(node, fields, existing_docstring)
+
 
 class MockGenerator(IDocstringGenerator):
     """A mock generator for testing."""
@@ -66,9 +159,56 @@ class LLMGenerator(IDocstringGenerator):
         Code:
         {code_snippet}
         """
-        raw_docstring = self.llm_service.create_completion(prompt)
+        with llm_task("generate_docstring"):
+            raw_docstring = self.llm_service.create_completion(prompt)
         return raw_docstring.strip()
 
+    def generate_batch(self, nodes: List[Node]) -> List[str]:
+        """
+        Generates docstrings for several functions with a single request that
+        returns a JSON map from function id to docstring. Items missing from a
+        malformed or partial response are retried on their own.
+        """
+        if len(nodes) <= 1:
+            return [self.generate(node) for node in nodes]
+
+        results = self._request_batch(nodes)
+        missing = [i for i, docstring in enumerate(results) if not docstring]
+        if missing and len(missing) < len(nodes):
+            # Part of the batch came back: retry only the missing items, once, as a smaller batch.
+            retried = self._request_batch([nodes[i] for i in missing])
+            for i, docstring in zip(missing, retried):
+                results[i] = docstring
+            missing = [i for i in missing if not results[i]]
+        for i in missing:
+            results[i] = self.generate(nodes[i])
+        return results
+
+    def _request_batch(self, nodes: List[Node]) -> List[Optional[str]]:
+        """Sends one batched prompt; returns None for every item the response lacks."""
+        sections = "\n".join(
+            f"### f{i}\n{node.text.decode('utf8')}\n" for i, node in enumerate(nodes, 1)
+        )
+        prompt = f"""
+        Generate a professional, {self.style}-style docstring for each of the following functions.
+        Each function is introduced by a line with its id (f1, f2, ...).
+
+        Return ONLY a valid JSON object (no markdown, no extra text) that maps every function id
+        to the raw content of its docstring, without the triple quotes:
+        {{"f1": "docstring content", "f2": "docstring content"}}
+
+        Functions:
+        {sections}
+        """
+        with llm_task("generate_docstring_batch"):
+            docstrings = parse_json_object(self.llm_service.create_completion(prompt))
+
+        results = []
+        for i in range(1, len(nodes) + 1):
+            docstring = docstrings.get(f"f{i}")
+            results.append(docstring.strip() if isinstance(docstring, str) and docstring.strip() else None)
+        return results
+
     def evaluate(self, node: Node, docstring: str) -> bool:
         code_snippet = node.text.decode('utf8')
         return self.llm_service.evaluate_docstring(code_snippet, docstring)
@@ -87,6 +227,57 @@ class LLMGenerator(IDocstringGenerator):
         code_snippet = node.text.decode('utf8')
         return self.llm_service.generate_type_hints(code_snippet)
 
+    def enrich(self, node: Node, fields: Set[str], existing_docstring: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Asks for all requested per-function results in one structured request.
+        Fields the response lacks are left out; callers fall back to the single-purpose methods.
+        """
+        if existing_docstring is None:
+            fields = fields - {ENRICH_VERDICT}
+        if not fields:
+            return {}
+
+        keys = []
+        if ENRICH_DOCSTRING in fields:
+            keys.append(f'"docstring": the raw content of a professional, {self.style}-style docstring '
+                        'for the function, without the triple quotes')
+        if ENRICH_TYPE_HINTS in fields:
+            keys.append('"parameters": an object mapping each parameter name to its inferred Python type hint '
+                        '(str, int, List[str], Optional[int], ...; "Any" if it cannot be inferred confidently)')
+            keys.append('"return_type": the inferred return type hint ("None" if the function returns nothing)')
+        if ENRICH_VERDICT in fields:
+            keys.append('"docstring_ok": true if the existing docstring is high-quality, descriptive and helpful '
+                        '(explains what the code does, its arguments and what it returns), false if it is '
+                        'too generic or irrelevant')
+        key_list = "\n".join(f"- {key}" for key in keys)
+        existing = f"\nExisting docstring:\n```\n{existing_docstring}\n```\n" if ENRICH_VERDICT in fields else ""
+
+        prompt = f"""
+        Analyze the following function.
+
+        Code:
+        ```
+        {node.text.decode('utf8')}
+        ```
+        {existing}
+        Return ONLY a valid JSON object (no markdown, no extra text) with these keys:
+        {key_list}
+        """
+        with llm_task("enrich_function"):
+            data = parse_json_object(self.llm_service.create_completion(prompt))
+
+        result: Dict[str, Any] = {}
+        docstring = data.get("docstring")
+        if ENRICH_DOCSTRING in fields and isinstance(docstring, str) and docstring.strip():
+            result[ENRICH_DOCSTRING] = docstring.strip()
+        parameters = data.get("parameters")
+        if ENRICH_TYPE_HINTS in fields and isinstance(parameters, dict):
+            result[ENRICH_TYPE_HINTS] = {"parameters": parameters, "return_type": data.get("return_type")}
+        verdict = data.get("docstring_ok")
+        if ENRICH_VERDICT in fields and isinstance(verdict, bool):
+            result[ENRICH_VERDICT] = verdict
+        return result
+
     def suggest_constant_name(self, code_context: str, magic_number: str) -> Optional[str]:
         return self.llm_service.suggest_constant_name(code_context, magic_number)
 
@@ -94,8 +285,13 @@ class LLMGenerator(IDocstringGenerator):
 class GeneratorFactory:
     """A factory to create the appropriate docstring generator."""
     @staticmethod
-    def create_generator(strategy: str, style: str = "google", provider: Optional[str] = None, model: Optional[str] = None) -> IDocstringGenerator:
+    def create_generator(strategy: str, style: str = "google", provider: Optional[str] = None, model: Optional[str] = None,
+                         cache: Optional["ResponseCache"] = None,
+                         settings: Optional[Dict[str, Any]] = None) -> IDocstringGenerator:
         # Strategy controls mock vs real; provider controls which LLM vendor.
+        # An optional ResponseCache wraps the adapter so repeated prompts skip the network.
+        # `settings` is the [tool.zenco] table; it supplies the http (pool_size, timeout),
+        # rate_limits, retry and circuit_breaker options of the service chain.
         
         dotenv_path = Path(os.getcwd()) / '.env'
         load_dotenv(dotenv_path=dotenv_path)
@@ -132,40 +328,67 @@ class GeneratorFactory:
             return MockGenerator()
         
         provider = provider.lower()
+        settings = settings or {}
+        # Adapters (and their pooled HTTP clients) are created once per process and shared.
+        client_options = {
+            key: value for key, value in settings.get("http", {}).items() if key in ("pool_size", "timeout")
+        }
 
         if provider == "groq":
             api_key = os.getenv("GROQ_API_KEY")
             if not api_key:
                 raise ValueError("Groq API key not found. Run 'zenco init' to configure your API key, or use '--strategy mock' for testing.")
             model_name = model or os.getenv("GROQ_MODEL_NAME", "llama3-8b-8192")
-            groq_adapter = GroqAdapter(api_key=api_key, model=model_name)
-            return LLMGenerator(llm_service=groq_adapter, style=style)
+            adapter = get_shared_adapter(GroqAdapter, api_key, model_name, **client_options)
 
-        if provider == "openai":
+        elif provider == "openai":
             from .llm_services import OpenAIAdapter  # lazy import
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OpenAI API key not found. Run 'zenco init' to configure your API key, or use '--strategy mock' for testing.")
             model_name = model or os.getenv("OPENAI_MODEL_NAME", "gpt-4o-mini")
-            adapter = OpenAIAdapter(api_key=api_key, model=model_name)
-            return LLMGenerator(llm_service=adapter, style=style)
+            adapter = get_shared_adapter(OpenAIAdapter, api_key, model_name, **client_options)
 
-        if provider == "anthropic":
+        elif provider == "anthropic":
             from .llm_services import AnthropicAdapter  # lazy import
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
                 raise ValueError("Anthropic API key not found. Run 'zenco init' to configure your API key, or use '--strategy mock' for testing.")
             model_name = model or os.getenv("ANTHROPIC_MODEL_NAME", "claude-3-5-sonnet-latest")
-            adapter = AnthropicAdapter(api_key=api_key, model=model_name)
-            return LLMGenerator(llm_service=adapter, style=style)
+            adapter = get_shared_adapter(AnthropicAdapter, api_key, model_name, **client_options)
 
-        if provider == "gemini":
+        elif provider == "gemini":
             from .llm_services import GeminiAdapter  # lazy import
             api_key = os.getenv("GEMINI_API_KEY")
             if not api_key:
                 raise ValueError("Gemini API key not found. Run 'zenco init' to configure your API key, or use '--strategy mock' for testing.")
             model_name = model or os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-pro")
-            adapter = GeminiAdapter(api_key=api_key, model=model_name)
-            return LLMGenerator(llm_service=adapter, style=style)
+            adapter = get_shared_adapter(GeminiAdapter, api_key, model_name, **client_options)
+
+        else:
+            raise ValueError(f"Unknown provider: {provider}")
 
-        raise ValueError(f"Unknown provider: {provider}")
\ No newline at end of file
+        # Service chain, outermost first: cache -> retries/circuit breaker -> rate limiter -> shared slots -> adapter.
+        # Cache hits never touch the network; every retry waits for rate-limit budget again.
+        llm_service: ILLMService = adapter
+        if settings.get("llm_slots") is not None:
+            # A request only takes a shared slot while it is on the wire, not while it backs off.
+            from .concurrency import SlotLimitedLLMService
+            llm_service = SlotLimitedLLMService(llm_service, settings["llm_slots"])
+        limits = resolve_limits(settings.get("rate_limits"), provider, adapter.model)
+        if limits.get("rpm") or limits.get("tpm"):
+            limiter = get_rate_limiter(provider, adapter.model, limits.get("rpm"), limits.get("tpm"))
+            llm_service = RateLimitedLLMService(
+                llm_service, limiter,
+                expected_output_tokens=limits.get("expected_output_tokens", DEFAULT_EXPECTED_OUTPUT_TOKENS),
+            )
+        llm_service = ResilientLLMService(
+            llm_service,
+            policy=RetryPolicy(**known_options(settings.get("retry"), RETRY_OPTIONS, "retry")),
+            breaker=CircuitBreaker(**known_options(settings.get("circuit_breaker"), CIRCUIT_BREAKER_OPTIONS,
+                                                   "circuit_breaker")),
+        )
+        if cache is not None:
+            from .llm_cache import CachedLLMService
+            llm_service = CachedLLMService(llm_service, cache)
+        return LLMGenerator(llm_service=llm_service, style=style)
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Responses are stored on disk, one JSON file per prompt, under a key derived from
+(provider, model, task, normalized prompt). Re-running zenco over an unchanged
+tree then answers every prompt locally instead of paying for a network round trip.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import textwrap
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .llm_services import ILLMService, LLMServiceWrapper, current_task
+
+DEFAULT_CACHE_DIR = ".zenco-cache"
+DEFAULT_MAX_SIZE_MB = 100
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes a prompt before hashing so that incidental whitespace differences
+    (template indentation, trailing spaces) do not cause cache misses.
+    """
+    lines = textwrap.dedent(prompt).strip().splitlines()
+    return "\n".join(line.rstrip() for line in lines)
+
+
+class ResponseCache:
+    """
+    On-disk store of LLM responses with size- and age-based eviction.
+
+    Entries live in `<cache_dir>/<namespace>/<xx>/<sha256>.json`. Writes are atomic
+    (temp file + rename), so several threads or processes can share a cache.
+    Reading an entry refreshes its modification time, which makes size-based
+    eviction least-recently-used.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS, namespace: str = "llm"):
+        self.root = os.path.join(cache_dir, namespace)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+
+    @staticmethod
+    def make_key(provider: str, model: str, task: str, prompt: str) -> str:
+        """Builds the content address of a prompt."""
+        payload = json.dumps([provider, model, task, normalize_prompt(prompt)])
+        return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached response for `key`, or None if missing or expired."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf8") as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry.get("response")
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, response: Any, **metadata) -> None:
+        """Stores a JSON-serializable response atomically. Failures are ignored: the cache is best-effort."""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump({"response": response, "created": time.time(), **metadata}, f)
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except (OSError, TypeError, ValueError):
+            pass  # unwritable directory or a response JSON cannot represent
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def prune(self) -> int:
+        """
+        Evicts expired entries, then the least recently used ones until the cache
+        fits in its size budget. Returns the number of entries removed.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+
+        now = time.time()
+        entries = []
+        removed = 0
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age_seconds:
+                    removed += self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            removed += self._remove(path)
+            total -= size
+        return removed
+
+    def clear(self) -> int:
+        """Removes every cached response. Returns the number of entries removed."""
+        max_bytes, self.max_bytes = self.max_bytes, -1
+        try:
+            return self.prune()
+        finally:
+            self.max_bytes = max_bytes
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+
+class CachedLLMService(LLMServiceWrapper):
+    """An ILLMService wrapper that answers repeated prompts from a ResponseCache."""
+
+    def __init__(self, inner: ILLMService, cache: ResponseCache):
+        super().__init__(inner)
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def create_completion(self, prompt: str) -> str:
+        task = current_task()
+        key = self.cache.make_key(self.provider, self.model, task, prompt)
+        cached = self.cache.get(key)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            return cached
+
+        response = self.inner.create_completion(prompt)
+        # Empty responses are how adapters report failures; never persist them.
+        if response:
+            self.cache.put(key, response, provider=self.provider, model=self.model, task=task)
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        return {"cache_hits": self.hits, "cache_misses": self.misses}
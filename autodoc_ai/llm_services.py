@@ -1,8 +1,33 @@
 import abc
-from cmd import PROMPT
 import os
-from typing import Optional
-from groq import Groq
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Name of the task (ILLMService method) whose prompt is currently being sent.
+# Kept per thread so wrappers can key or account requests by task.
+_task_context = threading.local()
+
+
+def current_task() -> str:
+    """Returns the name of the task currently sending a prompt on this thread."""
+    return getattr(_task_context, "task", None) or "completion"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+@contextmanager
+def llm_task(task: str) -> Iterator[None]:
+    """Marks every completion sent inside the block as belonging to `task`."""
+    previous = getattr(_task_context, "task", None)
+    _task_context.task = task
+    try:
+        yield
+    finally:
+        _task_context.task = previous
 
 # ---- Interface (Contract) ----
 
@@ -59,37 +84,164 @@ class ILLMService(abc.ABC):
         """
         pass
 
+
+class LLMServiceWrapper(ILLMService):
+    """
+    Base class for services that decorate another ILLMService (caching, rate limiting, ...).
+
+    Subclasses only intercept `create_completion`. The prompt-building methods run the
+    wrapped adapter's own implementation with the wrapper as `self`, so every prompt they
+    send passes through the whole chain of wrappers.
+    """
+
+    def __init__(self, inner: ILLMService):
+        self.inner = inner
+
+    @property
+    def adapter(self) -> ILLMService:
+        """The innermost (vendor) adapter of the wrapper chain."""
+        service = self.inner
+        while isinstance(service, LLMServiceWrapper):
+            service = service.inner
+        return service
+
+    @property
+    def provider(self) -> str:
+        return getattr(self.adapter, "provider", type(self.adapter).__name__)
+
+    @property
+    def model(self) -> str:
+        return getattr(self.adapter, "model", "")
+
+    def stats(self) -> Dict[str, int]:
+        """Counters collected by this layer, reported in the run summary."""
+        return {}
+
+    def create_completion(self, prompt: str) -> str:
+        return self.inner.create_completion(prompt)
+
+    def _run_task(self, task: str, *args):
+        with llm_task(task):
+            return getattr(type(self.adapter), task)(self, *args)
+
+    def evaluate_docstring(self, code: str, docstring: str) -> bool:
+        return self._run_task("evaluate_docstring", code, docstring)
+
+    def suggest_name(self, code_context: str, old_name: str) -> Optional[str]:
+        return self._run_task("suggest_name", code_context, old_name)
+
+    def suggest_function_name(self, code_context: str, old_name: str) -> Optional[str]:
+        return self._run_task("suggest_function_name", code_context, old_name)
+
+    def suggest_class_name(self, code_context: str, old_name: str) -> Optional[str]:
+        return self._run_task("suggest_class_name", code_context, old_name)
+
+    def evaluate_name(self, code_context: str, name: str) -> bool:
+        return self._run_task("evaluate_name", code_context, name)
+
+    def generate_type_hints(self, code_context: str) -> dict:
+        return self._run_task("generate_type_hints", code_context)
+
+    def suggest_constant_name(self, code_context: str, magic_number: str) -> Optional[str]:
+        return self._run_task("suggest_constant_name", code_context, magic_number)
+
+
+def iter_service_layers(service: ILLMService) -> Iterator[ILLMService]:
+    """Yields every layer of a wrapper chain, outermost first, ending with the adapter."""
+    while isinstance(service, LLMServiceWrapper):
+        yield service
+        service = service.inner
+    yield service
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+
+def create_http_client(sdk, pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
+    """
+    Builds the pooled, keep-alive HTTP client handed to an OpenAI-style SDK module
+    (groq, openai, anthropic). The client class comes from the SDK itself because
+    SDK releases pin different httpx distributions. httpx clients are thread-safe,
+    so one client serves every worker thread.
+    """
+    import importlib
+
+    client_cls = getattr(sdk, "DefaultHttpxClient", None)
+    if client_cls is None:
+        import httpx  # older SDK releases accept a plain httpx client
+        client_cls = httpx.Client
+    http_module = next(
+        importlib.import_module(cls.__module__.split(".")[0])
+        for cls in client_cls.__mro__ if cls.__name__ == "Client"
+    )
+    limits = http_module.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    return client_cls(limits=limits, timeout=http_module.Timeout(timeout))
+
+
+_shared_adapters: Dict[tuple, ILLMService] = {}
+_shared_adapters_lock = threading.Lock()
+
+
+def get_shared_adapter(adapter_cls: type, api_key: str, model: str, **options) -> ILLMService:
+    """
+    Returns the adapter for (class, key, model, options), creating it on first use.
+    Adapters own long-lived SDK clients, so each is built once per process and
+    reused by every generator and worker thread.
+    """
+    key = (adapter_cls, api_key, model, tuple(sorted(options.items())))
+    with _shared_adapters_lock:
+        if key not in _shared_adapters:
+            _shared_adapters[key] = adapter_cls(api_key=api_key, model=model, **options)
+        return _shared_adapters[key]
+
+
+def close_shared_adapters() -> None:
+    """Closes the connection pools of every shared adapter (end of run)."""
+    with _shared_adapters_lock:
+        adapters = list(_shared_adapters.values())
+        _shared_adapters.clear()
+    for adapter in adapters:
+        close = getattr(adapter, "close", None)
+        if close:
+            close()
+
 # --- Implementation (Adapter) ---
 
 class GroqAdapter(ILLMService):
     """
     An adapter for the Groq API. It "adapts" the `groq` library to fit the simple `ILLMService` interface our applciation uses.
     """
+    provider = "groq"
 
-    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile"):
+    def __init__(self, api_key: str, model: str = "llama-3.3-70b-versatile",
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
         if not api_key:
             raise ValueError("Groq API key is required.")
-        self.client = Groq(api_key=api_key)
+        # Retries are handled by ResilientLLMService, not by the SDK.
+        import groq  # lazy import: only runs that use Groq pay for the SDK
+        self.http_client = create_http_client(groq, pool_size, timeout)
+        self.client = groq.Groq(api_key=api_key, max_retries=0, http_client=self.http_client)
         self.model = model
 
+    def close(self) -> None:
+        """Releases the pooled connections."""
+        self.http_client.close()
+
     def create_completion(self, prompt: str) -> str:
         """
         Handles the specific logic for calling the Groq Chat Completions endpoint.
+        API errors are raised; ResilientLLMService decides whether to retry them.
         """
-        try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    }
-                ],
-                model=self.model
-            )
-            return chat_completion.choices[0].message.content
-        except Exception as e:
-            print(f"Error calling Groq API: {e}")
-            return ""
+        chat_completion = self.client.chat.completions.create(
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            model=self.model
+        )
+        return chat_completion.choices[0].message.content or ""
 
     def evaluate_docstring(self, code: str, docstring: str) -> bool:
         """
@@ -312,27 +464,32 @@ class GroqAdapter(ILLMService):
 
 class OpenAIAdapter(ILLMService):
     """Adapter for OpenAI Chat Completions API (lazy import)."""
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    provider = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini",
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
         if not api_key:
             raise ValueError("OpenAI API key is required.")
         try:
             from openai import OpenAI  # type: ignore
         except Exception:
             raise ImportError("openai package not installed. pip install openai")
+        import openai
         self.OpenAI = OpenAI
-        self.client = OpenAI(api_key=api_key)
+        self.http_client = create_http_client(openai, pool_size, timeout)
+        self.client = OpenAI(api_key=api_key, max_retries=0, http_client=self.http_client)
         self.model = model
 
+    def close(self) -> None:
+        """Releases the pooled connections."""
+        self.http_client.close()
+
     def create_completion(self, prompt: str) -> str:
-        try:
-            resp = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            return resp.choices[0].message.content
-        except Exception as e:
-            print(f"Error calling OpenAI API: {e}")
-            return ""
+        resp = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return resp.choices[0].message.content or ""
 
     def evaluate_docstring(self, code: str, docstring: str) -> bool:
         prompt = f"""
@@ -490,28 +647,32 @@ class OpenAIAdapter(ILLMService):
 
 class AnthropicAdapter(ILLMService):
     """Adapter for Anthropic Messages API (Claude) with lazy import."""
-    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-latest"):
+    provider = "anthropic"
+
+    def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-latest",
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
         if not api_key:
             raise ValueError("Anthropic API key is required.")
         try:
             import anthropic  # lazy import
         except Exception:
             raise ImportError("anthropic package not installed. pip install anthropic")
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.http_client = create_http_client(anthropic, pool_size, timeout)
+        self.client = anthropic.Anthropic(api_key=api_key, max_retries=0, http_client=self.http_client)
         self.model = model
 
+    def close(self) -> None:
+        """Releases the pooled connections."""
+        self.http_client.close()
+
     def create_completion(self, prompt: str) -> str:
-        try:
-            msg = self.client.messages.create(
-                model=self.model,
-                max_tokens=2048,
-                messages=[{"role": "user", "content": prompt}],
-            )
-            # content is a list of blocks; take first text
-            return "".join(block.text for block in msg.content if hasattr(block, "text"))
-        except Exception as e:
-            print(f"Error calling Anthropic API: {e}")
-            return ""
+        msg = self.client.messages.create(
+            model=self.model,
+            max_tokens=2048,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        # content is a list of blocks; take first text
+        return "".join(block.text for block in msg.content if hasattr(block, "text"))
 
     # Delegate to OpenAIAdapter's implementation by creating a helper instance
     def evaluate_docstring(self, code: str, docstring: str) -> bool:
@@ -538,25 +699,28 @@ class AnthropicAdapter(ILLMService):
 
 class GeminiAdapter(ILLMService):
     """Adapter for Google Gemini (google-generativeai) with lazy import."""
-    def __init__(self, api_key: str, model: str = "gemini-1.5-pro"):
+    provider = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-1.5-pro",
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT_SECONDS):
         if not api_key:
             raise ValueError("Gemini API key is required.")
         try:
             import google.generativeai as genai  # lazy import
         except Exception:
             raise ImportError("google-generativeai package not installed. pip install google-generativeai")
+        # The gRPC transport multiplexes all requests over one channel, so `pool_size`
+        # needs no counterpart here; the model object is built once and shared by all threads.
         genai.configure(api_key=api_key)
         self.genai = genai
         self.model_name = model
+        self.model = model
+        self.request_options = {"timeout": timeout}
+        self.generative_model = genai.GenerativeModel(model)
 
     def create_completion(self, prompt: str) -> str:
-        try:
-            model = self.genai.GenerativeModel(self.model_name)
-            resp = model.generate_content(prompt)
-            return resp.text or ""
-        except Exception as e:
-            print(f"Error calling Gemini API: {e}")
-            return ""
+        resp = self.generative_model.generate_content(prompt, request_options=self.request_options)
+        return resp.text or ""
 
     # Delegate to OpenAIAdapter's implementation
     def evaluate_docstring(self, code: str, docstring: str) -> bool:
@@ -0,0 +1,110 @@
+"""
+Incremental runs: a manifest of files already processed with the current settings.
+
+After a file has been processed cleanly, its content hash is recorded in
+`<cache_dir>/manifest.json` under a run key derived from the enabled features,
+docstring style, provider/model, the [tool.zenco] settings that shape the
+output and the zenco version. A later run with the same
+key skips every file whose content still matches, without parsing it.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+MANIFEST_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def tool_version() -> str:
+    """The installed zenco version, part of every run key."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        return version("zenco")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def file_digest(path: str) -> Optional[str]:
+    """sha256 of a file's content, or None if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def make_run_key(**settings: Any) -> str:
+    """Fingerprint of everything that changes what a run would do to a file."""
+    payload = json.dumps({"format": MANIFEST_FORMAT, "version": tool_version(), **settings},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf8")).hexdigest()
+
+
+class RunManifest:
+    """
+    Maps absolute file paths to the content hash and run key they were last
+    processed with. Only the run that owns it writes the manifest, once at the
+    end, atomically.
+    """
+
+    def __init__(self, cache_dir: str, run_key: str):
+        self.path = os.path.join(cache_dir, MANIFEST_NAME)
+        self.run_key = run_key
+        self.files: Dict[str, Dict[str, str]] = {}
+        self.skipped = 0
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf8") as f:
+                data = json.load(f)
+            if data.get("format") == MANIFEST_FORMAT:
+                self.files = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            self.files = {}
+
+    def is_current(self, filepath: str) -> bool:
+        """True if the file is unchanged since it was processed with this run key."""
+        entry = self.files.get(os.path.abspath(filepath))
+        if not entry or entry.get("run_key") != self.run_key:
+            return False
+        return entry.get("sha256") == file_digest(filepath)
+
+    def record(self, filepath: str) -> None:
+        """Marks the file's current content as processed with this run key."""
+        digest = file_digest(filepath)
+        if digest is not None:
+            self.files[os.path.abspath(filepath)] = {"sha256": digest, "run_key": self.run_key}
+            self._dirty = True
+
+    def forget(self, filepath: str) -> None:
+        if self.files.pop(os.path.abspath(filepath), None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Writes the manifest atomically. Failures are ignored: the manifest is best-effort."""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump({"format": MANIFEST_FORMAT, "files": self.files}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+    @staticmethod
+    def clear(cache_dir: str) -> bool:
+        """Deletes the manifest in `cache_dir`. Returns True if there was one."""
+        try:
+            os.remove(os.path.join(cache_dir, MANIFEST_NAME))
+            return True
+        except OSError:
+            return False
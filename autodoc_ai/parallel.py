@@ -0,0 +1,97 @@
+"""
+File-level parallelism across worker processes (--jobs).
+
+Parsing, dead-code analysis and transformation are CPU-bound and hold the GIL,
+so LLM threads alone cannot use more than one core. FilePool runs one file per
+task on a process pool. Each worker builds its own generator once (in `setup`),
+captures everything a file prints and hands it back, so the parent can print
+every file's log as one contiguous block, in the original file order.
+"""
+
+import io
+import multiprocessing
+import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+# Tasks kept in flight per worker, so a worker never idles while its next file is handed over
+SUBMIT_AHEAD = 2
+
+# Per-process state created by the pool initializer
+_worker_context: Dict[str, Any] = {}
+
+
+def _init_worker(setup: Callable[..., Any], setup_args: Tuple[Any, ...]) -> None:
+    # The parent has already reported anything set-up prints (e.g. provider auto-detection).
+    with redirect_stdout(io.StringIO()):
+        _worker_context["context"] = setup(*setup_args)
+
+
+def _run_task(task: Callable[[Any, Any], Any], item: Any) -> Tuple[str, Any]:
+    buffer = io.StringIO()
+    result = None
+    with redirect_stdout(buffer):
+        try:
+            result = task(_worker_context["context"], item)
+        except Exception as e:
+            print(f"  [ERROR] Worker failed on {item}: {e}")
+            traceback.print_exc(file=buffer)
+    return buffer.getvalue(), result
+
+
+# Workers start from a fresh interpreter: nothing created by the parent (HTTP clients,
+# rate limiters, threads) is inherited half-initialized, and it behaves the same on every OS.
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def shared_semaphore(value: int) -> Any:
+    """A semaphore that can be handed to pool workers and is shared by all of them."""
+    return _MP_CONTEXT.BoundedSemaphore(max(1, int(value)))
+
+
+class FilePool:
+    """
+    A process pool whose workers call `setup(*setup_args)` once on start-up and
+    then run `task(context, item)` for each item with stdout captured.
+    """
+
+    def __init__(self, jobs: int, setup: Callable[..., Any], setup_args: Tuple[Any, ...] = ()):
+        self.jobs = max(1, int(jobs))
+        self._pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=self.jobs, mp_context=_MP_CONTEXT, initializer=_init_worker, initargs=(setup, setup_args)
+        )
+
+    def map(self, task: Callable[[Any, Any], Any], items: Iterable[Any]) -> Iterator[Tuple[Any, str, Any]]:
+        """
+        Yields (item, captured output, result) in the order of `items`, as soon as
+        each item and all items before it have finished. `items` is consumed
+        lazily (a few tasks ahead of the results), so it may be a stream that is
+        still being discovered.
+        """
+        window = self.jobs * SUBMIT_AHEAD
+        submitted: Deque[Tuple[Any, Future]] = deque()
+        for item in items:
+            submitted.append((item, self._pool.submit(_run_task, task, item)))
+            if len(submitted) >= window:
+                yield self._collect(submitted)
+        while submitted:
+            yield self._collect(submitted)
+
+    @staticmethod
+    def _collect(submitted: "Deque[Tuple[Any, Future]]") -> Tuple[Any, str, Any]:
+        item, future = submitted.popleft()
+        output, result = future.result()
+        return item, output, result
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "FilePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
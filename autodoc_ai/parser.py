@@ -1,30 +1,120 @@
-from tree_sitter import Parser, Query, Language
-from typing import Optional
-from tree_sitter_python import language as python_language
-from tree_sitter_javascript import language as javascript_language
-from tree_sitter_java import language as java_language
-from tree_sitter_go import language as go_language
-from tree_sitter_cpp import language as cpp_language
-
-LANGUAGES = {
-   "python": Language(python_language()),
-   "javascript": Language(javascript_language()),
-   "java": Language(java_language()),
-   "go": Language(go_language()),
-   "cpp": Language(cpp_language()),
+import importlib
+import threading
+import time
+from collections.abc import Mapping
+from tree_sitter import Parser, Query, Language, Tree
+from typing import Any, Dict, Optional, Tuple
+# Grammar package of each supported language, imported the first time the language is used
+GRAMMAR_MODULES = {
+   "python": "tree_sitter_python",
+   "javascript": "tree_sitter_javascript",
+   "java": "tree_sitter_java",
+   "go": "tree_sitter_go",
+   "cpp": "tree_sitter_cpp",
 }
 
+
+class _LazyLanguages(Mapping):
+    """
+    Maps language names to tree-sitter Languages, loading each grammar on first
+    access. A run over Python files never imports the Java or C++ grammars.
+    """
+
+    def __init__(self, modules: Dict[str, str]):
+        self._modules = modules
+        self._loaded: Dict[str, Language] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> Language:
+        language = self._loaded.get(name)
+        if language is None:
+            module_name = self._modules[name]
+            with self._lock:
+                language = self._loaded.get(name)
+                if language is None:
+                    try:
+                        module = importlib.import_module(module_name)
+                    except ImportError:
+                        raise KeyError(name) from None
+                    language = self._loaded[name] = Language(module.language())
+        return language
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+
+LANGUAGES = _LazyLanguages(GRAMMAR_MODULES)
+
+# Bytes handed to the parser per read when a parse can be cut short
+PARSE_CHUNK_SIZE = 64 * 1024
+
+_parsers = threading.local()
+
+
+class ParseTimeout(Exception):
+    """Raised when a parse is cancelled or runs past its time limit."""
+
+
 def get_language_parser(language_name: str) -> Optional[Parser]:
-    """Returns a pre-configured Tree-sitter parser for a given language."""
+    """
+    Returns a pre-configured Tree-sitter parser for a given language.
+    Parsers are pooled per thread: each thread (or worker process) creates one
+    parser per language on first use and reuses it for every later file.
+    """
+    pool = getattr(_parsers, 'pool', None)
+    if pool is None:
+        pool = _parsers.pool = {}
+    parser = pool.get(language_name)
+    if parser is not None:
+        return parser
+
     language = LANGUAGES.get(language_name)
     if not language:
         print(f"Error: Grammar for '{language_name}' not found.")
         print(f"Please make sure you have run 'pip install tree-sitter-{language_name}'.")
         return None
     
-    parser = Parser(language)
+    parser = pool[language_name] = Parser(language)
     return parser
 
+def parse_source(language_name: str, source_bytes: bytes, timeout: Optional[float] = None,
+                 cancel: Optional[Any] = None) -> Optional[Tree]:
+    """
+    Parses `source_bytes` with this thread's pooled parser. Returns None if the
+    language has no grammar.
+
+    With a `timeout` (seconds) or a `cancel` event (anything with `is_set()`), the
+    source is fed to the parser in chunks and the input is cut off as soon as the
+    deadline passes or the event is set; ParseTimeout is raised instead of
+    returning the partial tree. Both are checked between chunks.
+    """
+    parser = get_language_parser(language_name)
+    if parser is None:
+        return None
+    if not timeout and cancel is None:
+        return parser.parse(source_bytes)
+
+    deadline = time.monotonic() + timeout if timeout else None
+    stopped = []
+
+    def read(byte_offset, point):
+        if byte_offset >= len(source_bytes):
+            return b""
+        if (cancel is not None and cancel.is_set()) or (deadline is not None and time.monotonic() > deadline):
+            stopped.append(byte_offset)
+            return b""
+        return source_bytes[byte_offset:byte_offset + PARSE_CHUNK_SIZE]
+
+    tree = parser.parse(read)
+    if stopped:
+        parser.reset()
+        reason = "cancelled" if cancel is not None and cancel.is_set() else f"timed out after {timeout:g}s"
+        raise ParseTimeout(f"parsing {reason} at byte {stopped[0]:,} of {len(source_bytes):,}")
+    return tree
+
 def get_language_queries(language_name: str) -> dict:
     """Returns a dictionary of Tree-sitter queries for a given language."""
     language = LANGUAGES.get(language_name)
@@ -34,9 +124,10 @@ def get_language_queries(language_name: str) -> dict:
     if language_name == 'python':
         return {
             "all_functions": "(function_definition) @func",
+            "function_scopes": "(function_definition) @func",
             "documented_function": """
                 (function_definition
-                  body: (block (expression_statement (string) @docstring))
+                  body: (block . (expression_statement . (string) @docstring))
                 ) @func
                 """,
             "functions_with_type_hints": """
@@ -49,11 +140,19 @@ def get_language_queries(language_name: str) -> dict:
                   (integer) @number
                   (float) @number
                 ]
+                """,
+            "imports": "[(import_statement) (import_from_statement)] @import",
+            "calls": """
+                (call function: [
+                  (identifier) @callee
+                  (attribute attribute: (identifier) @callee)
+                ])
                 """
         }
     if language_name == 'javascript':
         return {
             "all_functions": "(function_declaration) @func",
+            "function_scopes": "[(function_declaration) (method_definition)] @func",
             "documented_function": """
                 (
                   (comment) @docstring
@@ -62,12 +161,20 @@ def get_language_queries(language_name: str) -> dict:
                 )
                 (#match? @docstring "^/\\\\*\\\\*")
                 """,
-            "numeric_literals": "(number) @number"
+            "numeric_literals": "(number) @number",
+            "imports": "(import_statement) @import",
+            "calls": """
+                (call_expression function: [
+                  (identifier) @callee
+                  (member_expression property: (property_identifier) @callee)
+                ])
+                """
         }
 
     if language_name == 'java':
         return {
             "all_functions": "(method_declaration) @func",
+            "function_scopes": "(method_declaration) @func",
             "documented_function": """
                 (
                     (block_comment)+ @docstring
@@ -79,16 +186,16 @@ def get_language_queries(language_name: str) -> dict:
                 [
                   (decimal_integer_literal) @number
                   (decimal_floating_point_literal) @number
-                  (hex_integer_literal) @number
-                  (octal_integer_literal) @number
-                  (binary_integer_literal) @number
                 ]
-                """
+                """,
+            "imports": "(import_declaration) @import",
+            "calls": "(method_invocation name: (identifier) @callee)"
         }
 
     if language_name == 'go':
         return {
             "all_functions": "(function_declaration) @func",
+            "function_scopes": "(function_declaration) @func",
             "documented_function": """
                 (
                   (comment) @doc_comment
@@ -98,15 +205,23 @@ def get_language_queries(language_name: str) -> dict:
                 """,
             "numeric_literals": """
                 [
-                  (int_lit) @number
-                  (float_lit) @number
+                  (int_literal) @number
+                  (float_literal) @number
                 ]
+                """,
+            "imports": "(import_declaration) @import",
+            "calls": """
+                (call_expression function: [
+                  (identifier) @callee
+                  (selector_expression field: (field_identifier) @callee)
+                ])
                 """
         }
 
     if language_name == 'cpp':
         return {
             "all_functions": "(function_definition) @func",
+            "function_scopes": "(function_definition) @func",
             "documented_function": """
                 (
                   (comment) @docstring
@@ -114,7 +229,41 @@ def get_language_queries(language_name: str) -> dict:
                   (function_definition) @func
                 )
                 """,
-            "numeric_literals": "(number_literal) @number"
+            "numeric_literals": "(number_literal) @number",
+            "imports": "[(preproc_include) (using_declaration)] @import",
+            "calls": """
+                (call_expression function: [
+                  (identifier) @callee
+                  (field_expression field: (field_identifier) @callee)
+                  (qualified_identifier name: (identifier) @callee)
+                ])
+                """
         }
         
-    return {}
\ No newline at end of file
+    return {}
+
+
+_compiled_queries: Dict[Tuple[str, ...], Query] = {}
+_compile_lock = threading.Lock()
+
+def get_compiled_query(language_name: str, *query_names: str) -> Optional[Query]:
+    """
+    Returns the named entries of `get_language_queries` compiled into a single Query.
+    Several names combine into one multi-pattern query, so one cursor pass in the
+    tree-sitter engine serves them all. Queries are compiled lazily, once per process,
+    and shared: a Query is immutable and each search runs in its own QueryCursor.
+    """
+    key = (language_name, *query_names)
+    query = _compiled_queries.get(key)
+    if query is not None:
+        return query
+    language = LANGUAGES.get(language_name)
+    sources = get_language_queries(language_name)
+    if not language or not all(name in sources for name in query_names):
+        return None
+    with _compile_lock:
+        query = _compiled_queries.get(key)
+        if query is None:
+            query = Query(language, "\n".join(sources[name] for name in query_names))
+            _compiled_queries[key] = query
+    return query
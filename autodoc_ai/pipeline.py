@@ -0,0 +1,352 @@
+"""
+Three-stage run pipeline: analysis, a repo-wide LLM work queue, and apply.
+
+Processors are written as straight-line code that calls the generator and
+uses the answer. To take the LLM waits out of that code, each file is first
+analysed with a PlanningGenerator: calls it already has an answer for are
+served immediately, the rest are queued on the LLMWorkQueue and answered with
+a neutral placeholder (no docstring, no type hints, no constant name, "the
+docstring is fine"). The queue works through requests from every file in the
+background while later files are analysed. As soon as a file's requests are
+answered it is analysed again, which may queue follow-up requests (e.g. a
+docstring for a function whose existing one was judged poor), until a pass
+needs nothing new. That final pass's transformed code and log are then
+written out, in the original file order. At most `max_waiting` files are in
+flight at once, and queued requests hold a function's text rather than its
+node, so no parse tree outlives the pass that produced it.
+"""
+
+import hashlib
+import io
+import itertools
+import queue
+import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from tree_sitter import Node
+
+from .generators import IDocstringGenerator
+from .parser import parse_source
+from .resilience import failures_on_this_thread
+from .utils import language_for
+
+# Requests whose answers unlock follow-up work go first.
+PRIORITIES = {"evaluate": 0}
+DEFAULT_PRIORITY = 1
+# Files analysed but not written out yet (waiting for answers, or for an earlier file)
+MAX_WAITING_FILES = 64
+
+# Placeholder answers used while a request is still queued
+PLACEHOLDERS = {
+    "generate": "",
+    "evaluate": True,
+    "generate_type_hints": {},
+    "suggest_name": None,
+    "suggest_constant_name": None,
+}
+# Answers to requests that failed: as outside the pipeline, a failed evaluation judges the docstring poor
+FAILED_ANSWERS = {**PLACEHOLDERS, "evaluate": False}
+
+# A queued request: its key, generator arguments and future
+Request = Tuple[Hashable, Tuple[Any, ...], Future]
+
+
+def _node_key(node: Node) -> str:
+    return hashlib.sha256(node.text).hexdigest()
+
+
+class _Snippet:
+    """The language, type and text of a node, queued instead of the node (which keeps its whole tree alive)."""
+    __slots__ = ("language", "type", "text")
+
+    def __init__(self, language: str, node: Node):
+        self.language = language
+        self.type = node.type
+        self.text = node.text
+
+
+def _attach(value: Any) -> Any:
+    """Re-parses a _Snippet into a node of a tree of its own; other arguments pass through."""
+    if not isinstance(value, _Snippet):
+        return value
+    tree = parse_source(value.language, value.text)
+    node = tree.root_node if tree is not None else None
+    while node is not None and node.type != value.type:
+        node = node.children[0] if node.children and node.children[0].start_byte == 0 else None
+    if node is None:
+        raise ValueError(f"could not re-parse the queued {value.language} {value.type}")
+    return node
+
+
+class _OutputRouter:
+    """
+    A stdout replacement that sends a thread's output to its capture buffer, if
+    it has one. Uncaptured writes reach the real stream one at a time.
+    """
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self._lock:
+            return self.stream.write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buffer", None) is None:
+            with self._lock:
+                self.stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        """Captures what the current thread prints."""
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+
+class LLMWorkQueue:
+    """
+    A repo-wide, deduplicated priority queue of generator requests served by
+    `max_workers` threads. Docstring requests waiting in the queue together
+    are sent as one `generate_batch` call of up to `batch_size` functions.
+    With a `router`, what serving a request prints (a provider error, say) is
+    kept in `outputs` under the request's key, for the files that asked for it.
+    Keys of requests that ended in a recorded failure are kept in `failed`.
+    """
+
+    def __init__(self, generator: IDocstringGenerator, max_workers: int = 4, batch_size: int = 1,
+                 router: Optional[_OutputRouter] = None):
+        self.generator = generator
+        self.batch_size = max(1, int(batch_size))
+        self.router = router
+        self.futures: Dict[Hashable, Future] = {}
+        self.outputs: Dict[Hashable, str] = {}
+        self.failed: Set[Hashable] = set()
+        self._requesters: Dict[Hashable, Set[Hashable]] = {}
+        self.submitted = 0
+        self.deduplicated = 0
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"zenco-llm-queue-{i}", daemon=True)
+            for i in range(max(1, int(max_workers)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key: Hashable, method: str, args: Tuple[Any, ...], requester: Hashable = None) -> Future:
+        """
+        Queues `generator.<method>(*args)` unless a request with the same key is
+        already known. Requests merged across different requesters are counted.
+        """
+        with self._lock:
+            if key in self.futures:
+                if requester not in self._requesters[key]:
+                    self._requesters[key].add(requester)
+                    self.deduplicated += 1
+                return self.futures[key]
+            self._requesters[key] = {requester}
+            future = self.futures[key] = Future()
+            self.submitted += 1
+        self._queue.put((PRIORITIES.get(method, DEFAULT_PRIORITY), next(self._order), method, (key, args, future)))
+        return future
+
+    def _work(self) -> None:
+        while True:
+            _, _, method, request = self._queue.get()
+            if method is None:
+                return
+            requests = [request]
+            if method == "generate" and self.batch_size > 1:
+                requests += self._take_more_docstrings()
+            failures = failures_on_this_thread()
+            with self.router.capture() if self.router is not None else nullcontext() as output:
+                outcomes = self._run(method, requests)
+            text = output.getvalue() if output is not None else ""
+            with self._lock:
+                if text:
+                    self.outputs.update((key, text) for key, _, _ in requests)
+                if failures_on_this_thread() > failures:
+                    self.failed.update(key for key, _, _ in requests)
+            for (_, _, future), (succeeded, value) in zip(requests, outcomes):
+                if succeeded:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _run(self, method: str, requests: List[Request]) -> List[Tuple[bool, Any]]:
+        """Serves the requests; returns (True, result) or (False, exception) for each."""
+        try:
+            if method == "generate" and self.batch_size > 1:
+                docstrings = self.generator.generate_batch([_attach(args[0]) for _, args, _ in requests])
+                return [(True, docstring) for docstring in docstrings]
+            _, args, _ = requests[0]
+            return [(True, getattr(self.generator, method)(*map(_attach, args)))]
+        except Exception as e:
+            return [(False, e)] * len(requests)
+
+    def _take_more_docstrings(self) -> List[Request]:
+        """Takes up to batch_size - 1 more queued docstring requests without waiting."""
+        taken, others = [], []
+        while len(taken) < self.batch_size - 1:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] == "generate":
+                taken.append(item[3])
+            else:
+                others.append(item)
+        for item in others:
+            self._queue.put(item)
+        return taken
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued_requests": self.submitted, "queued_duplicates": self.deduplicated}
+
+    def shutdown(self) -> None:
+        """Stops the worker threads once every queued request has been served."""
+        for _ in self._threads:
+            self._queue.put((float("inf"), next(self._order), None, None))
+        for thread in self._threads:
+            thread.join()
+
+
+class PlanningGenerator(IDocstringGenerator):
+    """
+    Answers generator calls from the work queue. A call whose request has not
+    been answered yet is queued, remembered in `pending`, and answered with a
+    placeholder for this analysis pass. A call whose request failed gets the
+    placeholder too, as a failed call does outside the pipeline, and sets `failed`.
+    """
+
+    def __init__(self, work_queue: LLMWorkQueue):
+        self.work_queue = work_queue
+        self.requester: Hashable = None
+        self.language: Optional[str] = None
+        self.pending: List[Future] = []
+        self.failed = False
+
+    def begin_pass(self, requester: Hashable, language: Optional[str] = None) -> None:
+        """
+        Starts an analysis pass on behalf of `requester` (the file being analysed).
+        Nodes of a known `language` are queued as text rather than as live nodes.
+        """
+        self.requester = requester
+        self.language = language
+        self.pending = []
+        self.failed = False
+
+    def _ask(self, method: str, key: Hashable, *args: Any) -> Any:
+        if self.language is not None:
+            args = tuple(_Snippet(self.language, arg) if isinstance(arg, Node) else arg for arg in args)
+        future = self.work_queue.submit(key, method, args, self.requester)
+        if not future.done():
+            self.pending.append(future)
+            return PLACEHOLDERS[method]
+        output = self.work_queue.outputs.get(key)
+        if output:
+            print(output, end="")
+        if key in self.work_queue.failed:
+            self.failed = True
+        error = future.exception()
+        if error is not None:
+            self.failed = True
+            print(f"  [WARN] LLM request failed: {error}")
+            return FAILED_ANSWERS[method]
+        return future.result()
+
+    def generate(self, node: Node) -> str:
+        return self._ask("generate", ("generate", _node_key(node)), node)
+
+    def generate_batch(self, nodes: List[Node]) -> List[str]:
+        # The queue batches docstring requests across files.
+        return [self.generate(node) for node in nodes]
+
+    def evaluate(self, node: Node, docstring: str) -> bool:
+        return self._ask("evaluate", ("evaluate", _node_key(node), docstring), node, docstring)
+
+    def suggest_name(self, node: Node, old_name: str) -> Optional[str]:
+        return self._ask("suggest_name", ("suggest_name", _node_key(node), old_name), node, old_name)
+
+    def generate_type_hints(self, node: Node) -> dict:
+        return self._ask("generate_type_hints", ("generate_type_hints", _node_key(node)), node)
+
+    def suggest_constant_name(self, code_context: str, magic_number: str) -> Optional[str]:
+        key = ("suggest_constant_name", code_context, magic_number)
+        return self._ask("suggest_constant_name", key, code_context, magic_number)
+
+
+def run_pipeline(files: Iterable[str], analyse: Callable[[str, IDocstringGenerator], Any],
+                 generator: IDocstringGenerator, max_workers: int = 4, batch_size: int = 1,
+                 stats: Optional[Dict[str, int]] = None,
+                 max_waiting: int = MAX_WAITING_FILES) -> Iterator[Tuple[str, str, Any, bool]]:
+    """
+    Runs `analyse(filepath, planner)` over `files` until no pass queues new LLM
+    requests, and yields (filepath, log, result, failed) of each file's final
+    pass in the order of `files`, where `failed` tells whether some of the
+    pass's LLM requests or processors failed (see `resilience.record_failure`). `files` may be a stream that is still being
+    discovered. A file is analysed again as soon as its requests are answered,
+    and a new file is only started while fewer than `max_waiting` files wait to
+    be written. Queue counters are added to `stats` when given.
+    """
+    router = _OutputRouter(sys.stdout)
+    work_queue = LLMWorkQueue(generator, max_workers=max_workers, batch_size=batch_size, router=router)
+    planner = PlanningGenerator(work_queue)
+    # Processors print their reports: each pass's output is captured for its file's log.
+    sys.stdout = router
+    finished: Dict[int, Tuple[str, str, Any, bool]] = {}
+    next_index = 0
+    incoming = enumerate(files)
+    exhausted = False
+    waiting = deque()  # (index, filepath, pending futures), oldest first
+    try:
+        while True:
+            entry = next((entry for entry in waiting if all(future.done() for future in entry[2])), None)
+            if entry is not None:
+                waiting.remove(entry)
+            elif not exhausted and len(waiting) + len(finished) < max(1, max_waiting):
+                upcoming = next(incoming, None)
+                if upcoming is None:
+                    exhausted = True
+                    continue
+                entry = (*upcoming, [])
+            elif waiting:
+                wait([future for _, _, pending in waiting for future in pending if not future.done()],
+                     return_when=FIRST_COMPLETED)
+                continue
+            else:
+                break
+            index, filepath, _ = entry
+            planner.begin_pass(filepath, language_for(filepath))
+            failures = failures_on_this_thread()
+            with router.capture() as log:
+                result = analyse(filepath, planner)
+            if planner.pending:
+                waiting.append((index, filepath, planner.pending))
+                continue
+            failed = planner.failed or failures_on_this_thread() > failures
+            finished[index] = (filepath, log.getvalue(), result, failed)
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+    finally:
+        sys.stdout = router.stream
+        work_queue.shutdown()
+        if stats is not None:
+            stats.update(work_queue.stats())
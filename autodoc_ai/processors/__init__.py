@@ -7,10 +7,16 @@ from .dead_code_processor import DeadCodeProcessor
 from .docstring_processor import DocstringProcessor
 from .type_hint_processor import TypeHintProcessor
 from .magic_number_processor import MagicNumberProcessor
+from .file_index import FileIndex
+from .source_buffer import SourceBuffer
+from .symbol_table import SymbolTable
 
 __all__ = [
     'DeadCodeProcessor',
     'DocstringProcessor',
     'TypeHintProcessor',
     'MagicNumberProcessor',
+    'FileIndex',
+    'SourceBuffer',
+    'SymbolTable',
 ]
@@ -3,8 +3,10 @@ Base processor class for code enhancement features.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Set, Any
+from typing import Optional, Set, Any, List
 from ..transformers import CodeTransformer
+from .file_index import FileIndex, function_name_node
+from .source_buffer import SourceBuffer
 
 
 class BaseProcessor(ABC):
@@ -15,7 +17,8 @@ class BaseProcessor(ABC):
     (docstrings, type hints, magic numbers, dead code detection).
     """
     
-    def __init__(self, lang: str, tree: Any, source_bytes: bytes, transformer: CodeTransformer):
+    def __init__(self, lang: str, tree: Any, source_bytes: bytes, transformer: CodeTransformer,
+                 index: Optional[FileIndex] = None, source: Optional[SourceBuffer] = None):
         """
         Initialize the processor.
         
@@ -24,12 +27,16 @@ class BaseProcessor(ABC):
             tree: Tree-sitter parse tree
             source_bytes: Source code as bytes
             transformer: Code transformation utility
+            index: Shared index of the file's tree (built here if omitted)
+            source: Shared decoded source and line offsets (built here if omitted)
         """
         self.lang = lang
         self.tree = tree
         self.source_bytes = source_bytes
         self.transformer = transformer
-        self.source_text = source_bytes.decode('utf8')
+        self.source = source if source is not None else SourceBuffer(source_bytes)
+        self.source_text = self.source.text
+        self.index = index if index is not None else FileIndex(lang, tree)
     
     @abstractmethod
     def process(self, **kwargs) -> Optional[Set[Any]]:
@@ -41,44 +48,14 @@ class BaseProcessor(ABC):
         """
         pass
     
-    def find_nodes_by_type(self, node: Any, target_type: str):
-        """
-        Recursively find all nodes of a specific type.
-        
-        Args:
-            node: Starting node
-            target_type: Type of nodes to find
-            
-        Returns:
-            List of matching nodes
-        """
-        results = []
-        if node.type == target_type:
-            results.append(node)
-        for child in node.children:
-            results.extend(self.find_nodes_by_type(child, target_type))
-        return results
-    
-    def get_function_nodes(self):
+    def get_function_nodes(self) -> List[Any]:
         """
         Get all function nodes for the current language.
         
         Returns:
-            Set of function nodes
+            Function nodes in source order
         """
-        type_map = {
-            'python': 'function_definition',
-            'javascript': 'function_declaration',
-            'java': 'method_declaration',
-            'go': 'function_declaration',
-            'cpp': 'function_definition',
-        }
-        
-        func_type = type_map.get(self.lang)
-        if not func_type:
-            return set()
-        
-        return set(self.find_nodes_by_type(self.tree.root_node, func_type))
+        return [record.node for record in self.index.definitions()]
     
     def get_function_name(self, func_node: Any) -> Optional[str]:
         """
@@ -90,17 +67,7 @@ class BaseProcessor(ABC):
         Returns:
             Function name or None
         """
-        name_node = func_node.child_by_field_name('name')
-        
-        # For C++, check declarator
-        if not name_node and self.lang == 'cpp':
-            declarator = func_node.child_by_field_name('declarator')
-            if declarator:
-                for child in declarator.children:
-                    if child.type == 'identifier':
-                        name_node = child
-                        break
-        
+        name_node = function_name_node(self.lang, func_node)
         if name_node:
             return name_node.text.decode('utf8')
         return None
@@ -3,9 +3,9 @@ Dead code detection processor.
 Identifies unused functions, imports, and variables.
 """
 
-import ast
-from typing import Set, Optional, Any, List, Tuple
+from typing import Set, Optional, Any, Dict, List
 from .base import BaseProcessor
+from .symbol_table import FUNCTION, IMPORT, VARIABLE, Symbol, SymbolTable
 
 
 class DeadCodeProcessor(BaseProcessor):
@@ -14,19 +14,21 @@ class DeadCodeProcessor(BaseProcessor):
     Returns set of dead function names for filtering by other processors.
     """
     
-    def process(self, in_place: bool = False, strict: bool = False) -> Set[str]:
+    def process(self, in_place: bool = False, strict: bool = False,
+                external_uses: Optional[Set[str]] = None) -> Set[str]:
         """
         Detect dead code and return set of dead function names.
         
         Args:
             in_place: Whether to actually remove dead code
             strict: Whether to remove all unused code (strict mode)
+            external_uses: Functions of this file used by other modules of the project
             
         Returns:
             Set of dead function names to skip in other processors
         """
         if self.lang == 'python':
-            return self._process_python(in_place, strict)
+            return self._process_python(in_place, strict, external_uses or set())
         elif self.lang == 'javascript':
             return self._process_javascript(in_place, strict)
         elif self.lang == 'java':
@@ -37,113 +39,68 @@ class DeadCodeProcessor(BaseProcessor):
             return self._process_cpp(in_place, strict)
         return set()
     
-    def _process_python(self, in_place: bool, strict: bool) -> Set[str]:
+    def _process_python(self, in_place: bool, strict: bool, external_uses: Set[str]) -> Set[str]:
         """Python dead code detection."""
         dead_functions = set()
-        
-        try:
-            tree_ast = ast.parse(self.source_text)
-        except Exception as e:
-            print(f"  [ERROR] AST parse error for dead code detection: {e}")
+
+        if self.tree.root_node.has_error:
+            print(f"  [ERROR] Parse error for dead code detection: syntax error near line {_first_error_line(self.tree)}")
             return dead_functions
-        
-        lines = self.source_text.split('\n')
-        
-        # Collect imports
-        imports = []
-        for node in ast.walk(tree_ast):
-            if isinstance(node, ast.Import):
-                names = [alias.asname or alias.name.split('.')[0] for alias in node.names]
-                imports.append({
-                    'type': 'import',
-                    'names': names,
-                    'lineno': node.lineno,
-                    'text': lines[node.lineno-1] if 1 <= node.lineno <= len(lines) else ''
-                })
-            elif isinstance(node, ast.ImportFrom):
-                names = [alias.asname or alias.name for alias in node.names]
-                imports.append({
-                    'type': 'from',
-                    'module': node.module or '',
-                    'names': names,
-                    'lineno': node.lineno,
-                    'text': lines[node.lineno-1] if 1 <= node.lineno <= len(lines) else ''
-                })
-        
-        # Collect used identifiers
-        used = set()
-        for node in ast.walk(tree_ast):
-            if isinstance(node, ast.Name):
-                used.add(node.id)
-            elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
-                used.add(node.value.id)
-        
-        # Collect function definitions and calls
-        func_defs = []
-        func_calls = set()
-        for node in ast.walk(tree_ast):
-            if isinstance(node, ast.FunctionDef):
-                # Only top-level functions
-                if getattr(node, 'col_offset', 0) == 0:
-                    func_defs.append((node.name, node.lineno))
-            elif isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name):
-                    func_calls.add(node.func.id)
-                elif isinstance(node.func, ast.Attribute):
-                    func_calls.add(node.func.attr)
-        
+
+        # One walk of the tree for every definition, reference and call below
+        symbols = SymbolTable(self.tree)
+        lines = self.source.lines()
+
         # Report dead code
         print("\n  [CLEANUP] Dead Code Report (Python):")
-        
-        # Unused imports
+
+        # Unused imports: statements none of whose names is ever read
         to_delete_lines = []
-        for imp in imports:
-            imp_used = any(name.split('.')[0] in used for name in imp.get('names', []))
-            if not imp_used:
-                print(f"  • Unused import at line {imp['lineno']}: {imp['text'].strip()}")
-                to_delete_lines.append(imp['lineno'])
-        
-        # Never-called functions (dead code)
-        never_called = [(name, ln) for (name, ln) in func_defs if name not in func_calls]
-        for name, ln in never_called:
-            print(f"  • Function never called: {name} (line {ln})")
-            dead_functions.add(name)  # Add to dead set for filtering
-        
-        # Unused variables
+        imports: Dict[Any, List[Symbol]] = {}
+        for symbol in symbols.definitions(IMPORT):
+            imports.setdefault(symbol.statement, []).append(symbol)
+        for statement, names in imports.items():
+            if not any(symbol.references for symbol in names):
+                ln = statement.start_point[0] + 1
+                print(f"  • Unused import at line {ln}: {lines[ln-1].strip()}")
+                to_delete_lines.append(ln)
+
+        # Never-called top-level functions (dead code): no call here, no use in another module
+        func_calls = symbols.called_names() | external_uses
+        for symbol in symbols.definitions(FUNCTION, symbols.module):
+            if symbol.statement.start_point[1] == 0 and symbol.name not in func_calls:
+                print(f"  • Function never called: {symbol.name} (line {symbol.line})")
+                dead_functions.add(symbol.name)  # Add to dead set for filtering
+
+        # Unused variables: top-level `name = value` assignments nothing reads
         unused_vars = []
-        for node in ast.walk(tree_ast):
-            if isinstance(node, ast.Assign) and getattr(node, 'col_offset', 1) == 0:
-                for target in node.targets:
-                    if isinstance(target, ast.Name):
-                        var_name = target.id
-                        # Check if variable is used anywhere except its definition
-                        usage_count = sum(1 for n in ast.walk(tree_ast) 
-                                         if isinstance(n, ast.Name) and n.id == var_name)
-                        if usage_count <= 1:  # Only defined, never used
-                            ln = node.lineno
-                            txt = lines[ln-1] if 1 <= ln <= len(lines) else ''
-                            unused_vars.append((var_name, ln, txt))
-        
+        for symbol in symbols.definitions(VARIABLE, symbols.module):
+            statement = symbol.statement
+            if (statement.type == 'assignment' and statement.start_point[1] == 0
+                    and statement.child_by_field_name('right') is not None
+                    and symbol.node.parent.type == 'assignment' and not symbol.references
+                    and not _is_dunder(symbol.name)):
+                ln = symbol.line
+                unused_vars.append((symbol.name, ln, lines[ln-1] if 1 <= ln <= len(lines) else ''))
+
         for name, ln, txt in unused_vars:
             print(f"  • Unused variable: {name} (line {ln}): {txt.strip()}")
-        
+
         # Apply deletions if in_place
         if in_place and to_delete_lines:
             for ln in sorted(to_delete_lines, reverse=True):
-                line_start = sum(len(l) + 1 for l in lines[:ln-1])
-                line_end = line_start + len(lines[ln-1]) + 1
-                self.transformer.add_change(start_byte=line_start, end_byte=line_end, new_text='')
+                self.transformer.add_change(start_byte=self.source.line_start(ln-1),
+                                            end_byte=self.source.line_end(ln-1), new_text='')
             print(f"  [REMOVE]  Removed {len(to_delete_lines)} unused import line(s)")
-        
+
         if in_place and strict and unused_vars:
-            for _, ln, _ in sorted(unused_vars, key=lambda x: x[1], reverse=True):
-                line_start = sum(len(l) + 1 for l in lines[:ln-1])
-                line_end = line_start + len(lines[ln-1]) + 1
-                self.transformer.add_change(start_byte=line_start, end_byte=line_end, new_text='')
+            for ln in sorted({ln for _, ln, _ in unused_vars}, reverse=True):
+                self.transformer.add_change(start_byte=self.source.line_start(ln-1),
+                                            end_byte=self.source.line_end(ln-1), new_text='')
             print(f"  [REMOVE]  Strict: Removed {len(unused_vars)} unused variable(s)")
-        
+
         return dead_functions
-    
+
     def _process_javascript(self, in_place: bool, strict: bool) -> Set[str]:
         """JavaScript dead code detection - simplified version."""
         # Similar logic but using tree-sitter nodes
@@ -169,3 +126,22 @@ class DeadCodeProcessor(BaseProcessor):
         print("\n  [CLEANUP] Dead Code Report (C++):")
         print("  • Dead code detection for C++ (basic implementation)")
         return set()
+
+
+def _is_dunder(name: str) -> bool:
+    """`__all__`, `__version__` and the like are read by tools and the interpreter, not by the module."""
+    return len(name) > 4 and name.startswith('__') and name.endswith('__')
+
+
+def _first_error_line(tree: Any) -> int:
+    """1-based line of the first syntax error in a tree with errors."""
+    node = tree.root_node
+    while True:
+        for child in node.children:
+            if child.is_error or child.is_missing:
+                return child.start_point[0] + 1
+            if child.has_error:
+                node = child
+                break
+        else:
+            return node.start_point[0] + 1
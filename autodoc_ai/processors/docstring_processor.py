@@ -4,9 +4,15 @@ Handles generating and improving docstrings for all supported languages.
 """
 
 import textwrap
-from typing import Set, Any, Optional, Dict
+from typing import Set, Any, Optional, Dict, List
 from .base import BaseProcessor
+from .file_index import function_name_node
+from ..concurrency import LLMExecutor, SERIAL_EXECUTOR, chunk_by_budget
+from ..docstring_quality import DocstringScorer
 from ..formatters import FormatterFactory
+from ..llm_services import estimate_tokens
+
+DEFAULT_BATCH_TOKEN_BUDGET = 6000
 
 
 def indent(text: str, prefix: str) -> str:
@@ -18,8 +24,16 @@ def indent(text: str, prefix: str) -> str:
 class DocstringProcessor(BaseProcessor):
     """Generates docstrings for undocumented functions, skipping dead code."""
     
+    batch_size = 1
+    batch_token_budget = DEFAULT_BATCH_TOKEN_BUDGET
+    quality_scorer: Optional[DocstringScorer] = None
+    
     def process(self, generator: Any, overwrite_existing: bool = False, 
-                dead_functions: Optional[Set[str]] = None) -> None:
+                dead_functions: Optional[Set[str]] = None,
+                executor: Optional[LLMExecutor] = None,
+                batch_size: int = 1,
+                batch_token_budget: int = DEFAULT_BATCH_TOKEN_BUDGET,
+                quality_scorer: Optional[DocstringScorer] = None) -> None:
         """
         Generate docstrings for functions, skipping dead code.
         
@@ -27,31 +41,25 @@ class DocstringProcessor(BaseProcessor):
             generator: Docstring generator instance
             overwrite_existing: Whether to improve existing docstrings
             dead_functions: Set of dead function names to skip
+            executor: Runs the LLM calls concurrently (serial if omitted)
+            batch_size: Maximum functions per batched request (1 disables batching)
+            batch_token_budget: Maximum estimated prompt tokens per batched request
+            quality_scorer: Decides clearly good or poor existing docstrings without the LLM
         """
         dead_functions = dead_functions or set()
+        executor = executor or SERIAL_EXECUTOR
+        self.batch_size = batch_size
+        self.batch_token_budget = batch_token_budget
+        self.quality_scorer = quality_scorer
         
-        # Get all functions
-        all_functions = self.get_function_nodes()
-        
-        # Find documented functions
-        documented_functions = set()
-        documented_nodes = {}
-        
-        for func_node in all_functions:
-            body_node = func_node.child_by_field_name("body")
-            if body_node and body_node.children:
-                first_stmt = body_node.children[0]
-                if first_stmt.type == 'expression_statement':
-                    expr = first_stmt.children[0] if first_stmt.children else None
-                    if expr and expr.type == 'string':
-                        documented_functions.add(func_node)
-                        documented_nodes[func_node] = expr
-        
-        undocumented_functions = all_functions - documented_functions
+        # Functions in source order, so results are applied deterministically
+        records = self.index.definitions()
+        documented_nodes = {record.node: record.docstring for record in records if record.docstring is not None}
+        undocumented_functions = [record.node for record in records if record.docstring is None]
         
         # Process undocumented functions, skipping dead code
-        processed_count = 0
         skipped_count = 0
+        pending = []
         
         for func_node in undocumented_functions:
             func_name = self.get_function_name(func_node)
@@ -61,41 +69,55 @@ class DocstringProcessor(BaseProcessor):
                 skipped_count += 1
                 continue
             
-            if func_name:
-                self._generate_docstring_for_function(func_node, func_name, generator)
-                processed_count += 1
+            if func_name and self._announce_docstring(func_node, func_name):
+                pending.append(func_node)
+        
+        # Generate concurrently, then insert in source order
+        docstrings = self._generate_all(generator, pending, executor)
+        processed_count = 0
+        for func_node, docstring in zip(pending, docstrings):
+            # An empty result means the LLM request failed; never insert an empty docstring.
+            if not docstring or not docstring.strip():
+                print(f"  [WARN] No docstring generated for `{self.get_function_name(func_node)}()`, skipping")
+                continue
+            self._insert_docstring(func_node, docstring)
+            processed_count += 1
         
         # Process existing docstrings if overwrite is enabled
         if overwrite_existing:
             improved_count = self._improve_existing_docstrings(
-                documented_nodes, generator, dead_functions
+                documented_nodes, generator, dead_functions, executor
             )
             print(f"  [DOC] Improved {improved_count} existing docstring(s)")
         
         if skipped_count > 0:
             print(f"  [DOC] Processed {processed_count} functions, skipped {skipped_count} dead functions")
     
-    def _generate_docstring_for_function(self, func_node: Any, func_name: str, generator: Any) -> None:
-        """Generate and insert docstring for a single function."""
-        name_node = func_node.child_by_field_name('name')
-        if not name_node:
-            # For C++, check declarator
-            declarator = func_node.child_by_field_name('declarator')
-            if declarator:
-                for child in declarator.children:
-                    if child.type == 'identifier':
-                        name_node = child
-                        break
+    def _generate_all(self, generator: Any, func_nodes: List[Any], executor: LLMExecutor) -> List[str]:
+        """Generate docstrings for `func_nodes`, in batches when enabled, preserving order."""
+        if self.batch_size <= 1:
+            return executor.map(generator.generate, func_nodes)
         
+        batches = chunk_by_budget(
+            func_nodes, self.batch_size, self.batch_token_budget,
+            cost=lambda node: estimate_tokens(node.text.decode('utf8'))
+        )
+        print(f"  [DOC] Batching {len(func_nodes)} function(s) into {len(batches)} request(s)", flush=True)
+        results = executor.map(generator.generate_batch, batches)
+        return [docstring for batch in results for docstring in batch]
+    
+    def _announce_docstring(self, func_node: Any, func_name: str) -> bool:
+        """Log that a docstring will be generated. Returns False if the function has no name node."""
+        name_node = function_name_node(self.lang, func_node)
         if not name_node:
-            return
+            return False
         
         line_num = name_node.start_point[0] + 1
         print(f"  [DOC] Line {line_num}: Generating docstring for `{func_name}()`", flush=True)
-        
-        docstring = generator.generate(func_node)
-        
-        # Insert docstring based on language
+        return True
+    
+    def _insert_docstring(self, func_node: Any, docstring: str) -> None:
+        """Insert a generated docstring based on language."""
         if self.lang == 'python':
             self._insert_python_docstring(func_node, docstring)
         else:
@@ -109,9 +131,7 @@ class DocstringProcessor(BaseProcessor):
         
         try:
             # Calculate indentation
-            func_start_line = func_node.start_point[0]
-            func_line = self.source_text.split('\n')[func_start_line]
-            func_def_indent = len(func_line) - len(func_line.lstrip())
+            func_def_indent = self.source.indentation(func_node.start_point[0])
             body_indent_level = func_def_indent + 4
             indentation_str = ' ' * body_indent_level
             first_child = body_node.children[0]
@@ -131,11 +151,7 @@ class DocstringProcessor(BaseProcessor):
             
             if is_docstring:
                 # Replace existing docstring
-                first_stmt_line_num = first_child.start_point[0]
-                lines = self.source_text.split('\n')
-                line_start_byte = sum(len(line) + 1 for line in lines[:first_stmt_line_num])
-                
-                insertion_point = line_start_byte
+                insertion_point = self.source.line_start(first_child.start_point[0])
                 end_point = first_child.end_byte
                 formatted_docstring = formatted_docstring.rstrip() + '\n' + indentation_str
                 self.transformer.add_change(
@@ -145,11 +161,7 @@ class DocstringProcessor(BaseProcessor):
                 )
             else:
                 # Insert before first statement
-                first_stmt_line_num = first_child.start_point[0]
-                lines = self.source_text.split('\n')
-                line_start_byte = sum(len(line) + 1 for line in lines[:first_stmt_line_num])
-                
-                insertion_point = line_start_byte
+                insertion_point = self.source.line_start(first_child.start_point[0])
                 end_point = first_child.start_byte
                 formatted_docstring = formatted_docstring + indentation_str
                 
@@ -164,16 +176,13 @@ class DocstringProcessor(BaseProcessor):
     def _insert_other_language_docstring(self, func_node: Any, docstring: str) -> None:
         """Insert docstring for Java/JavaScript/C++/Go (before function)."""
         func_start_line = func_node.start_point[0]
-        func_line = self.source_text.split('\n')[func_start_line]
-        func_def_indent = len(func_line) - len(func_line.lstrip())
-        indentation_str = ' ' * func_def_indent
+        indentation_str = ' ' * self.source.indentation(func_start_line)
         
         formatter = FormatterFactory.create_formatter(self.lang)
         formatted_docstring = formatter.format(docstring, indentation_str)
         
         # Find start of line
-        lines = self.source_text.split('\n')
-        line_start_byte = sum(len(line) + 1 for line in lines[:func_start_line])
+        line_start_byte = self.source.line_start(func_start_line)
         
         # Insert before function
         self.transformer.add_change(
@@ -183,43 +192,72 @@ class DocstringProcessor(BaseProcessor):
         )
     
     def _improve_existing_docstrings(self, documented_nodes: Dict[Any, Any], 
-                                    generator: Any, dead_functions: Set[str]) -> int:
+                                    generator: Any, dead_functions: Set[str],
+                                    executor: LLMExecutor = SERIAL_EXECUTOR) -> int:
         """Improve existing docstrings that are low quality."""
         improved_count = 0
         
+        candidates = []
         for func_node, doc_node in documented_nodes.items():
             func_name = self.get_function_name(func_node)
             
             # Skip dead functions
             if func_name and func_name in dead_functions:
                 continue
-            
-            docstring_text = doc_node.text.decode('utf8')
-            is_good = generator.evaluate(func_node, docstring_text)
-            
-            if not is_good:
-                name_node = func_node.child_by_field_name('name')
-                func_name = name_node.text.decode('utf8') if name_node else 'unknown'
-                print(f"  [IMPROVE] Line {doc_node.start_point[0]+1}: Improving docstring for `{func_name}()` (low quality detected)")
+            candidates.append((func_node, doc_node))
+        
+        # Settle clear cases with the static scorer; only ambiguous ones cost an LLM evaluation.
+        reasons = {}
+        ambiguous = []
+        static_good = 0
+        for func_node, doc_node in candidates:
+            if self.quality_scorer is None:
+                ambiguous.append((func_node, doc_node))
+                continue
+            score, why = self.quality_scorer.score(func_node, doc_node.text.decode('utf8'))
+            if score >= self.quality_scorer.accept_threshold:
+                static_good += 1
+            elif score <= self.quality_scorer.reject_threshold:
+                reasons[func_node] = f"static score {score:.2f}: {'; '.join(why)}"
+            else:
+                ambiguous.append((func_node, doc_node))
+        if self.quality_scorer is not None and candidates:
+            print(f"  [QUALITY] Static check: {static_good} good, {len(reasons)} poor, "
+                  f"{len(ambiguous)} sent to LLM for evaluation", flush=True)
+        
+        verdicts = executor.map(
+            lambda item: generator.evaluate(item[0], item[1].text.decode('utf8')), ambiguous
+        )
+        rejected = {func_node for (func_node, _), is_good in zip(ambiguous, verdicts) if not is_good}
+        rejected.update(reasons)
+        poor = [item for item in candidates if item[0] in rejected]
+        
+        for func_node, doc_node in poor:
+            name_node = func_node.child_by_field_name('name')
+            func_name = name_node.text.decode('utf8') if name_node else 'unknown'
+            why = reasons.get(func_node, 'low quality detected')
+            print(f"  [IMPROVE] Line {doc_node.start_point[0]+1}: Improving docstring for `{func_name}()` ({why})")
+        
+        new_docstrings = self._generate_all(generator, [func_node for func_node, _ in poor], executor)
+        
+        for (func_node, doc_node), new_docstring in zip(poor, new_docstrings):
+            if not new_docstring or not new_docstring.strip():
+                continue
+            try:
+                func_def_indent = self.source.indentation(func_node.start_point[0])
+                body_indent_level = func_def_indent + 4
+                indentation_str = ' ' * body_indent_level
                 
-                new_docstring = generator.generate(func_node)
+                formatter = FormatterFactory.create_formatter(self.lang)
+                formatted_docstring = formatter.format(new_docstring, indentation_str).strip()
                 
-                try:
-                    func_line = self.source_text.split('\n')[func_node.start_point[0]]
-                    func_def_indent = len(func_line) - len(func_line.lstrip())
-                    body_indent_level = func_def_indent + 4
-                    indentation_str = ' ' * body_indent_level
-                    
-                    formatter = FormatterFactory.create_formatter(self.lang)
-                    formatted_docstring = formatter.format(new_docstring, indentation_str).strip()
-                    
-                    self.transformer.add_change(
-                        start_byte=doc_node.start_byte,
-                        end_byte=doc_node.end_byte,
-                        new_text=formatted_docstring
-                    )
-                    improved_count += 1
-                except Exception as e:
-                    print(f"  [ERROR] Improving docstring failed: {e}", flush=True)
+                self.transformer.add_change(
+                    start_byte=doc_node.start_byte,
+                    end_byte=doc_node.end_byte,
+                    new_text=formatted_docstring
+                )
+                improved_count += 1
+            except Exception as e:
+                print(f"  [ERROR] Improving docstring failed: {e}", flush=True)
         
         return improved_count
@@ -0,0 +1,179 @@
+"""
+Single-pass index of a parsed file.
+Collects what the processors need from the tree with one compiled query.
+"""
+
+from bisect import bisect_right
+from typing import Any, List, Optional, Tuple
+
+from tree_sitter import QueryCursor
+
+from ..parser import get_compiled_query
+
+# Queries (from parser.get_language_queries) the index is built from
+INDEX_QUERIES = ("function_scopes", "numeric_literals", "imports", "calls")
+
+# Function node each processor documents / annotates, per language
+FUNCTION_TYPES = {
+    'python': 'function_definition',
+    'javascript': 'function_declaration',
+    'java': 'method_declaration',
+    'go': 'function_declaration',
+    'cpp': 'function_definition',
+}
+
+def function_name_node(lang: str, func_node: Any) -> Optional[Any]:
+    """The identifier naming a function node, looking through C++ declarators."""
+    name_node = func_node.child_by_field_name('name')
+    if not name_node and lang == 'cpp':
+        declarator = func_node.child_by_field_name('declarator')
+        if declarator:
+            for child in declarator.children:
+                if child.type == 'identifier':
+                    return child
+    return name_node
+
+
+def docstring_node(func_node: Any) -> Optional[Any]:
+    """The string literal opening a function body, if any."""
+    body_node = func_node.child_by_field_name('body')
+    if body_node and body_node.children:
+        first_stmt = body_node.children[0]
+        if first_stmt.type == 'expression_statement':
+            expr = first_stmt.children[0] if first_stmt.children else None
+            if expr and expr.type == 'string':
+                return expr
+    return None
+
+
+class FunctionRecord:
+    """A function-like node, its name and its docstring node (if documented)."""
+    __slots__ = ('id', 'node', 'name', 'name_node', 'docstring', 'primary')
+
+    def __init__(self, id: int, node: Any, name_node: Optional[Any], docstring: Optional[Any], primary: bool):
+        self.id = id
+        self.node = node
+        self.name_node = name_node
+        self.name = name_node.text.decode('utf8') if name_node else None
+        self.docstring = docstring
+        self.primary = primary
+
+
+class NumberRecord:
+    """A numeric literal and the id of the function it appears in (None at module level)."""
+    __slots__ = ('node', 'value', 'function_id', 'parent_type')
+
+    def __init__(self, node: Any, function_id: Optional[int], parent_type: Optional[str]):
+        self.node = node
+        self.value = node.text.decode('utf8')
+        self.function_id = function_id
+        self.parent_type = parent_type
+
+
+class CallRecord:
+    """The name of a called function and the id of the function the call appears in."""
+    __slots__ = ('node', 'name', 'function_id')
+
+    def __init__(self, node: Any, function_id: Optional[int]):
+        self.node = node
+        self.name = node.text.decode('utf8')
+        self.function_id = function_id
+
+
+class ImportRecord:
+    """An import / include statement."""
+    __slots__ = ('node', 'text')
+
+    def __init__(self, node: Any):
+        self.node = node
+        self.text = node.text.decode('utf8')
+
+
+class FileIndex:
+    """
+    Functions, numeric literals, imports and calls of one parse tree, gathered by a
+    single run of the language's compiled index query in the tree-sitter engine.
+    Build it once per file and hand it to every processor instead of letting each
+    one search the tree again. Records are in source order.
+
+    With `changed_lines` (1-based inclusive ranges, e.g. git hunks), the work
+    views `definitions()` and `literals()` only cover functions overlapping them.
+    """
+
+    def __init__(self, lang: str, tree: Any, changed_lines: Optional[List[Tuple[int, int]]] = None):
+        self.lang = lang
+        self.changed_lines = sorted(changed_lines) if changed_lines is not None else None
+        self._reach: List[int] = []  # furthest end line among the first i+1 changed ranges
+        for _, end in self.changed_lines or ():
+            self._reach.append(max(end, self._reach[-1]) if self._reach else end)
+        self.functions: List[FunctionRecord] = []
+        self.numbers: List[NumberRecord] = []
+        self.imports: List[ImportRecord] = []
+        self.calls: List[CallRecord] = []
+        query = get_compiled_query(lang, *INDEX_QUERIES)
+        if query is not None:
+            self._build(QueryCursor(query).captures(tree.root_node))
+
+    def _build(self, captures: dict) -> None:
+        primary_type = FUNCTION_TYPES.get(self.lang)
+        for node in sorted(captures.get('func', ()), key=_start):
+            primary = node.type == primary_type
+            self.functions.append(FunctionRecord(
+                len(self.functions), node, function_name_node(self.lang, node),
+                docstring_node(node) if primary else None, primary,
+            ))
+
+        numbers = sorted(captures.get('number', ()), key=_start)
+        for node, function_id in zip(numbers, self._enclosing(numbers)):
+            parent = node.parent
+            self.numbers.append(NumberRecord(node, function_id, parent.type if parent else None))
+
+        calls = sorted(captures.get('callee', ()), key=_start)
+        self.calls = [CallRecord(node, function_id) for node, function_id in zip(calls, self._enclosing(calls))]
+        self.imports = [ImportRecord(node) for node in sorted(captures.get('import', ()), key=_start)]
+
+    def _enclosing(self, nodes: List[Any]) -> List[Optional[int]]:
+        """Id of the innermost function around each node; `nodes` must be in source order."""
+        result = []
+        stack: List[FunctionRecord] = []
+        functions = iter(self.functions)
+        upcoming = next(functions, None)
+        for node in nodes:
+            start = node.start_byte
+            while upcoming is not None and upcoming.node.start_byte <= start:
+                while stack and stack[-1].node.end_byte <= upcoming.node.start_byte:
+                    stack.pop()
+                stack.append(upcoming)
+                upcoming = next(functions, None)
+            while stack and stack[-1].node.end_byte <= start:
+                stack.pop()
+            result.append(stack[-1].id if stack else None)
+        return result
+
+    def touches(self, node: Any) -> bool:
+        """True if the node's lines overlap a changed range (always, without `changed_lines`)."""
+        if self.changed_lines is None:
+            return True
+        first, last = node.start_point[0] + 1, node.end_point[0] + 1
+        index = bisect_right(self.changed_lines, (last, float('inf')))
+        return index > 0 and self._reach[index - 1] >= first
+
+    def definitions(self) -> List[FunctionRecord]:
+        """The language's documentable functions to work on, in source order."""
+        return [record for record in self.functions if record.primary and self.touches(record.node)]
+
+    def literals(self) -> List[NumberRecord]:
+        """Numeric literals to work on: those in changed functions, or on changed lines outside any function."""
+        if self.changed_lines is None:
+            return self.numbers
+        return [
+            record for record in self.numbers
+            if self.touches(self.functions[record.function_id].node if record.function_id is not None else record.node)
+        ]
+
+    def function_name(self, function_id: Optional[int]) -> Optional[str]:
+        return self.functions[function_id].name if function_id is not None else None
+
+
+def _start(node: Any) -> int:
+    return node.start_byte
@@ -5,269 +5,107 @@ Replaces magic numbers with named constants across all languages.
 
 from typing import Set, Any, Optional, List, Tuple, Dict
 from .base import BaseProcessor
+from ..concurrency import LLMExecutor, SERIAL_EXECUTOR
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 1000
 
 
 class MagicNumberProcessor(BaseProcessor):
     """Replaces magic numbers with named constants, skipping dead code."""
     
-    def process(self, generator: Any, dead_functions: Optional[Set[str]] = None) -> None:
+    executor: LLMExecutor = SERIAL_EXECUTOR
+    context_token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET
+    
+    # Nodes whose header line tells the LLM what a literal belongs to
+    SCOPE_TYPES = {
+        'class_definition', 'class_declaration', 'class_specifier', 'struct_specifier',
+        'function_definition', 'function_declaration', 'method_declaration', 'method_definition',
+        'type_declaration', 'namespace_definition',
+    }
+    # Nodes whose target names the value a literal is part of
+    ASSIGNMENT_TYPES = {
+        'assignment', 'augmented_assignment', 'variable_declarator', 'assignment_expression',
+        'short_var_declaration', 'const_spec', 'var_spec', 'init_declarator', 'field_declaration',
+    }
+    
+    # Literals common enough to never be worth naming
+    ACCEPTABLE_VALUES = {'0', '1', '-1', '2'}
+    
+    def process(self, generator: Any, dead_functions: Optional[Set[str]] = None,
+                executor: Optional[LLMExecutor] = None,
+                context_token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET) -> None:
         """
         Replace magic numbers with constants, skipping dead code.
         
         Args:
             generator: Generator instance for naming suggestions
             dead_functions: Set of dead function names to skip
+            executor: Runs the LLM calls concurrently (serial if omitted)
+            context_token_budget: Maximum estimated tokens of code sent per literal
         """
         dead_functions = dead_functions or set()
-        
-        if self.lang == 'python':
-            self._process_python(generator, dead_functions)
-        elif self.lang == 'javascript':
-            self._process_javascript(generator, dead_functions)
-        elif self.lang == 'java':
-            self._process_java(generator, dead_functions)
-        elif self.lang == 'go':
-            self._process_go(generator, dead_functions)
-        elif self.lang == 'cpp':
-            self._process_cpp(generator, dead_functions)
-    
-    def _process_python(self, generator: Any, dead_functions: Set[str]) -> None:
-        """Process Python magic numbers."""
-        # Find numeric literals
-        def find_numeric_literals(node):
-            results = []
-            if node.type in ['integer', 'float']:
-                results.append(node)
-            for child in node.children:
-                results.extend(find_numeric_literals(child))
-            return results
-        
-        numeric_nodes = find_numeric_literals(self.tree.root_node)
-        magic_numbers = {}
-        
-        for node in numeric_nodes:
-            value = node.text.decode('utf8')
-            
-            # Skip acceptable numbers
-            if value in ['0', '1', '-1', '2', 'True', 'False']:
-                continue
-            
-            # Skip numbers in default parameters
-            parent = node.parent
-            if parent and parent.type == 'default_parameter':
-                continue
-            
-            # Find containing function
-            current = node.parent
-            function_node = None
-            func_name = None
-            while current:
-                if current.type == 'function_definition':
-                    function_node = current
-                    func_name = self.get_function_name(function_node)
-                    break
-                current = current.parent
-            
-            # Skip if in dead function
-            if func_name and func_name in dead_functions:
-                continue
-            
-            if value not in magic_numbers:
-                magic_numbers[value] = []
-            magic_numbers[value].append((node, function_node))
-        
-        # Process magic numbers
-        constants_to_add, replacements = self._generate_replacements(
-            magic_numbers, generator
-        )
-        
-        # Apply replacements
-        self._apply_replacements(replacements)
-        
-        # Add constants at module level
-        if constants_to_add:
-            self._add_python_constants(constants_to_add)
-    
-    def _process_javascript(self, generator: Any, dead_functions: Set[str]) -> None:
-        """Process JavaScript magic numbers."""
-        def find_js_numbers(node):
-            results = []
-            if node.type == 'number':
-                results.append(node)
-            for child in node.children:
-                results.extend(find_js_numbers(child))
-            return results
-        
-        magic_numbers = {}
-        for node in find_js_numbers(self.tree.root_node):
-            value = node.text.decode('utf8')
-            if value in ['0', '1', '-1', '2']:
-                continue
-            
-            # Find containing function
-            current = node.parent
-            func_node = None
-            func_name = None
-            while current:
-                if current.type in ['function_declaration', 'method_definition']:
-                    func_node = current
-                    func_name = self.get_function_name(func_node)
-                    break
-                current = current.parent
-            
-            # Skip if in dead function
-            if func_name and func_name in dead_functions:
-                continue
-            
-            if value not in magic_numbers:
-                magic_numbers[value] = []
-            magic_numbers[value].append((node, func_node))
-        
+        self.executor = executor or SERIAL_EXECUTOR
+        self.context_token_budget = context_token_budget
+        
+        add_constants = {
+            'python': self._add_python_constants,
+            'javascript': self._add_javascript_constants,
+            'java': self._add_java_constants,
+            'go': self._add_go_constants,
+            'cpp': self._add_cpp_constants,
+        }.get(self.lang)
+        if add_constants is None:
+            return
+        
+        magic_numbers = self._find_magic_numbers(dead_functions)
         constants_to_add, replacements = self._generate_replacements(
             magic_numbers, generator
         )
         self._apply_replacements(replacements)
         
         if constants_to_add:
-            self._add_javascript_constants(constants_to_add)
+            add_constants(constants_to_add)
     
-    def _process_java(self, generator: Any, dead_functions: Set[str]) -> None:
-        """Process Java magic numbers."""
-        def find_java_numbers(node):
-            results = []
-            if node.type in ['decimal_integer_literal', 'decimal_floating_point_literal']:
-                results.append(node)
-            for child in node.children:
-                results.extend(find_java_numbers(child))
-            return results
-        
+    def _find_magic_numbers(self, dead_functions: Set[str]) -> Dict[str, List[Tuple[Any, Any]]]:
+        """Group the indexed numeric literals by value, skipping acceptable values and dead code."""
         magic_numbers = {}
-        for node in find_java_numbers(self.tree.root_node):
-            value = node.text.decode('utf8')
-            if value in ['0', '1', '-1', '2']:
-                continue
-            
-            current = node.parent
-            func_node = None
-            func_name = None
-            while current:
-                if current.type == 'method_declaration':
-                    func_node = current
-                    func_name = self.get_function_name(func_node)
-                    break
-                current = current.parent
-            
-            if func_name and func_name in dead_functions:
+        for record in self.index.literals():
+            if record.value in self.ACCEPTABLE_VALUES:
                 continue
             
-            if value not in magic_numbers:
-                magic_numbers[value] = []
-            magic_numbers[value].append((node, func_node))
-        
-        constants_to_add, replacements = self._generate_replacements(
-            magic_numbers, generator
-        )
-        self._apply_replacements(replacements)
-        
-        if constants_to_add:
-            self._add_java_constants(constants_to_add)
-    
-    def _process_go(self, generator: Any, dead_functions: Set[str]) -> None:
-        """Process Go magic numbers."""
-        def find_go_numbers(node):
-            results = []
-            if node.type in ['int_lit', 'float_lit']:
-                results.append(node)
-            for child in node.children:
-                results.extend(find_go_numbers(child))
-            return results
-        
-        magic_numbers = {}
-        for node in find_go_numbers(self.tree.root_node):
-            value = node.text.decode('utf8')
-            if value in ['0', '1', '-1', '2']:
-                continue
-            
-            current = node.parent
-            func_node = None
-            func_name = None
-            while current:
-                if current.type == 'function_declaration':
-                    func_node = current
-                    func_name = self.get_function_name(func_node)
-                    break
-                current = current.parent
-            
-            if func_name and func_name in dead_functions:
-                continue
-            
-            if value not in magic_numbers:
-                magic_numbers[value] = []
-            magic_numbers[value].append((node, func_node))
-        
-        constants_to_add, replacements = self._generate_replacements(
-            magic_numbers, generator
-        )
-        self._apply_replacements(replacements)
-        
-        if constants_to_add:
-            self._add_go_constants(constants_to_add)
-    
-    def _process_cpp(self, generator: Any, dead_functions: Set[str]) -> None:
-        """Process C++ magic numbers."""
-        def find_cpp_numbers(node):
-            results = []
-            if node.type == 'number_literal':
-                results.append(node)
-            for child in node.children:
-                results.extend(find_cpp_numbers(child))
-            return results
-        
-        magic_numbers = {}
-        for node in find_cpp_numbers(self.tree.root_node):
-            value = node.text.decode('utf8')
-            if value in ['0', '1', '-1', '2']:
+            # Skip numbers in default parameters
+            if self.lang == 'python' and record.parent_type == 'default_parameter':
                 continue
             
-            current = node.parent
-            func_node = None
-            func_name = None
-            while current:
-                if current.type == 'function_definition':
-                    func_node = current
-                    func_name = self.get_function_name(func_node)
-                    break
-                current = current.parent
-            
+            # Skip if in dead function
+            func_name = self.index.function_name(record.function_id)
             if func_name and func_name in dead_functions:
                 continue
             
-            if value not in magic_numbers:
-                magic_numbers[value] = []
-            magic_numbers[value].append((node, func_node))
-        
-        constants_to_add, replacements = self._generate_replacements(
-            magic_numbers, generator
-        )
-        self._apply_replacements(replacements)
-        
-        if constants_to_add:
-            self._add_cpp_constants(constants_to_add)
+            function_node = self.index.functions[record.function_id].node if record.function_id is not None else None
+            magic_numbers.setdefault(record.value, []).append((record.node, function_node))
+        return magic_numbers
     
     def _generate_replacements(self, magic_numbers: Dict, generator: Any) -> Tuple[List, List]:
         """Generate constant names and replacement list."""
         constants_to_add = []
         replacements = []
         
-        for value, occurrences in magic_numbers.items():
+        def suggest(item):
+            value, occurrences = item
             first_node, first_function = occurrences[0]
-            function_code = first_function.text.decode('utf8') if first_function else self.source_text
-            
+            return generator.suggest_constant_name(self._extract_context(first_node, first_function), value)
+        
+        # Literals are discovered in source order; suggestions are requested
+        # concurrently but reported and applied in that same order.
+        items = list(magic_numbers.items())
+        suggestions = self.executor.map(suggest, items)
+        
+        for (value, occurrences), constant_name in zip(items, suggestions):
+            first_node = occurrences[0][0]
             line_num = first_node.start_point[0] + 1
             print(f"  [MAGIC] Line {line_num}: Found magic number `{value}`", flush=True)
             
-            constant_name = generator.suggest_constant_name(function_code, value)
-            
             if constant_name:
                 print(f"     → Suggested constant: {constant_name}")
                 constants_to_add.append((constant_name, value))
@@ -279,6 +117,61 @@ class MagicNumberProcessor(BaseProcessor):
         
         return constants_to_add, replacements
     
+    def _extract_context(self, node: Any, function_node: Any) -> str:
+        """
+        Build the prompt context for a literal: the enclosing function if it fits the
+        token budget, otherwise a window of the surrounding statements, prefixed with
+        the enclosing class/function header and assignment target. The result is
+        bounded by `context_token_budget`, whatever the size of the file.
+        """
+        budget = self.context_token_budget * 4  # ~4 bytes per token
+        if function_node is not None and function_node.end_byte - function_node.start_byte <= budget:
+            return function_node.text.decode('utf8')
+        
+        # Largest enclosing construct that still fits the budget
+        window = node
+        while (window.parent is not None and window.parent.parent is not None
+               and window.parent.end_byte - window.parent.start_byte <= budget):
+            window = window.parent
+        start, end = window.start_byte, window.end_byte
+        
+        # Widen to neighbouring statements, alternating before/after, while within budget
+        if window.parent is not None:
+            siblings = window.parent.named_children
+            index = next((i for i, sibling in enumerate(siblings) if sibling == window), None)
+            before, after = (index - 1, index + 1) if index is not None else (-1, len(siblings))
+            while before >= 0 or after < len(siblings):
+                if before >= 0:
+                    if end - siblings[before].start_byte > budget:
+                        before = -1
+                    else:
+                        start = siblings[before].start_byte
+                        before -= 1
+                if after < len(siblings):
+                    if siblings[after].end_byte - start > budget:
+                        after = len(siblings)
+                    else:
+                        end = siblings[after].end_byte
+                        after += 1
+        
+        # Keep the header lines that name what the literal belongs to
+        headers = []
+        current = node.parent
+        while current is not None:
+            if current.start_byte < start or current.end_byte > end:
+                if current.type in self.ASSIGNMENT_TYPES and not headers:
+                    target = current.child_by_field_name('left') or current.child_by_field_name('name')
+                    if target is not None:
+                        headers.append(f"{target.text.decode('utf8')} = ...")
+                elif current.type in self.SCOPE_TYPES:
+                    first_line = self.source_bytes[current.start_byte:current.end_byte].split(b'\n', 1)[0]
+                    headers.append(first_line.decode('utf8', errors='replace').strip() + " ...")
+            current = current.parent
+        
+        line_start = self.source_bytes.rfind(b'\n', 0, start) + 1
+        snippet = self.source_bytes[line_start:end].decode('utf8', errors='replace')
+        return '\n'.join(list(reversed(headers)) + [snippet])
+    
     def _apply_replacements(self, replacements: List) -> None:
         """Apply replacements in reverse order."""
         replacements.sort(key=lambda x: x[0].start_byte, reverse=True)
@@ -291,14 +184,14 @@ class MagicNumberProcessor(BaseProcessor):
     
     def _add_python_constants(self, constants_to_add: List) -> None:
         """Add constants at module level for Python."""
-        lines = self.source_text.split('\n')
+        lines = self.source.lines()
         insert_position = 0
         
         # Find end of imports
         for i, line in enumerate(lines):
             stripped = line.strip()
             if stripped and not stripped.startswith('#') and not stripped.startswith('import') and not stripped.startswith('from'):
-                insert_position = sum(len(l) + 1 for l in lines[:i])
+                insert_position = self.source.line_start(i)
                 break
         
         constants_text = '\n'.join(f"{name} = {value}" for name, value in constants_to_add)
@@ -313,13 +206,13 @@ class MagicNumberProcessor(BaseProcessor):
     
     def _add_javascript_constants(self, constants_to_add: List) -> None:
         """Add constants at module level for JavaScript."""
-        lines = self.source_text.split('\n')
+        lines = self.source.lines()
         insert_position = 0
         
         for i, line in enumerate(lines):
             stripped = line.strip()
             if stripped and not stripped.startswith('//') and not stripped.startswith('import') and not stripped.startswith('const '):
-                insert_position = sum(len(l) + 1 for l in lines[:i])
+                insert_position = self.source.line_start(i)
                 break
         
         constants_text = '\n'.join(f"const {name} = {value};" for name, value in constants_to_add)
@@ -334,13 +227,13 @@ class MagicNumberProcessor(BaseProcessor):
     
     def _add_java_constants(self, constants_to_add: List) -> None:
         """Add constants at class level for Java."""
-        lines = self.source_text.split('\n')
+        lines = self.source.lines()
         insert_position = 0
         
         # Find first line inside class
         for i, line in enumerate(lines):
             if '{' in line and ('class ' in lines[max(0, i-1)] or 'class ' in line):
-                insert_position = sum(len(l) + 1 for l in lines[:i+1])
+                insert_position = self.source.line_start(i + 1)
                 break
         
         constants_text = '\n    ' + '\n    '.join(
@@ -358,13 +251,13 @@ class MagicNumberProcessor(BaseProcessor):
     
     def _add_go_constants(self, constants_to_add: List) -> None:
         """Add constants at package level for Go."""
-        lines = self.source_text.split('\n')
+        lines = self.source.lines()
         insert_position = 0
         
         for i, line in enumerate(lines):
             s = line.strip()
             if s and not (s.startswith('package ') or s.startswith('import ') or s.startswith('//')):
-                insert_position = sum(len(l) + 1 for l in lines[:i])
+                insert_position = self.source.line_start(i)
                 break
         
         constants_text = '\n'.join(f"const {name} = {value}" for name, value in constants_to_add)
@@ -379,13 +272,13 @@ class MagicNumberProcessor(BaseProcessor):
     
     def _add_cpp_constants(self, constants_to_add: List) -> None:
         """Add constants at file scope for C++."""
-        lines = self.source_text.split('\n')
+        lines = self.source.lines()
         insert_position = 0
         
         for i, line in enumerate(lines):
             s = line.strip()
             if s and not s.startswith('#include') and not s.startswith('//') and not s.startswith('using'):
-                insert_position = sum(len(l) + 1 for l in lines[:i])
+                insert_position = self.source.line_start(i)
                 break
         
         constants_text = '\n'.join(
@@ -0,0 +1,80 @@
+"""
+Shared view of a file's source.
+Decodes the text once and maps lines to byte offsets for every processor.
+"""
+
+from bisect import bisect_right
+from typing import List, Optional
+
+
+class SourceBuffer:
+    """
+    A file's bytes, its decoded text and the byte offset each line starts at.
+
+    Edits are expressed in bytes (tree-sitter and CodeTransformer both work in
+    bytes), so line offsets are byte offsets and stay exact for non-ASCII
+    sources. Line lookups are O(1) and offset-to-line lookups are a bisect,
+    instead of re-splitting and re-summing the text for every edit.
+    """
+
+    def __init__(self, source_bytes: bytes):
+        self.data = source_bytes
+        self.text = source_bytes.decode('utf8')
+        self._lines: Optional[List[str]] = None
+        self._char_starts: Optional[List[int]] = None
+        self.line_starts = [0]
+        find, newline = source_bytes.find, b'\n'
+        position = find(newline)
+        while position != -1:
+            self.line_starts.append(position + 1)
+            position = find(newline, position + 1)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def lines(self) -> List[str]:
+        """Decoded lines without their newline, split once and shared."""
+        if self._lines is None:
+            self._lines = self.text.split('\n')
+        return self._lines
+
+    def line(self, line: int) -> str:
+        """Decoded text of a 0-based line, or '' past the end."""
+        lines = self.lines()
+        return lines[line] if 0 <= line < len(lines) else ''
+
+    def line_start(self, line: int) -> int:
+        """Byte offset where a 0-based line starts (end of file past the last line)."""
+        if line < 0:
+            return 0
+        if line >= len(self.line_starts):
+            return len(self.data)
+        return self.line_starts[line]
+
+    def line_end(self, line: int) -> int:
+        """Byte offset just past a 0-based line, including its newline."""
+        return self.line_start(line + 1)
+
+    def line_of(self, byte_offset: int) -> int:
+        """0-based line containing a byte offset."""
+        return bisect_right(self.line_starts, byte_offset) - 1
+
+    def indentation(self, line: int) -> int:
+        """Width of the leading whitespace of a 0-based line."""
+        text = self.line(line)
+        return len(text) - len(text.lstrip())
+
+    def char_offset(self, byte_offset: int) -> int:
+        """Offset into `text` of a byte offset (they differ once a non-ASCII character precedes it)."""
+        if len(self.text) == len(self.data):
+            return byte_offset
+        if self._char_starts is None:
+            starts, total = [], 0
+            for text in self.lines():
+                starts.append(total)
+                total += len(text) + 1
+            self._char_starts = starts
+        line = self.line_of(byte_offset)
+        start = self.line_starts[line]
+        return self._char_starts[line] + len(self.data[start:byte_offset].decode('utf8', errors='replace'))
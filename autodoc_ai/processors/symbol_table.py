@@ -0,0 +1,290 @@
+"""
+Scope-aware symbol table of a Python parse tree.
+Definitions, references and call sites gathered in one walk of the tree-sitter tree.
+"""
+
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Set
+
+# Kinds of definitions
+IMPORT = 'import'
+FUNCTION = 'function'
+CLASS = 'class'
+PARAMETER = 'parameter'
+VARIABLE = 'variable'  # assignment target
+NAME = 'name'          # any other binding: for / with / except targets, walrus, ...
+
+# Scope kinds; class bodies are not visible from the functions nested in them
+MODULE_SCOPE = 'module'
+FUNCTION_SCOPE = 'function'
+CLASS_SCOPE = 'class'
+
+COMPREHENSIONS = frozenset({'list_comprehension', 'set_comprehension', 'dictionary_comprehension',
+                            'generator_expression'})
+# Node types whose children are assignment targets when the node itself is one
+TARGET_PATTERNS = frozenset({'pattern_list', 'tuple_pattern', 'list_pattern', 'list_splat_pattern',
+                             'tuple', 'list', 'parenthesized_expression', 'as_pattern_target'})
+# Leaves and subtrees that never define or reference a name
+INERT = frozenset({'comment', 'integer', 'float', 'true', 'false', 'none', 'string_start', 'string_content',
+                   'string_end', 'escape_sequence', 'future_import_statement', 'pass_statement'})
+
+# Node types that define, open a scope, call or declare, and need more than a plain descent
+_STRUCTURAL = frozenset({'import_statement', 'import_from_statement', 'function_definition', 'class_definition',
+                         'lambda', 'call', 'global_statement', 'nonlocal_statement'}) | COMPREHENSIONS
+
+# How the names in a subtree are used
+_REF, _TARGET, _UPDATE, _PARAM, _DECLARE, _SKIP = range(6)
+
+# Fields that switch a child out of the parent's mode, per parent node type
+_FIELD_MODES = {
+    'assignment': {'left': _TARGET},
+    'augmented_assignment': {'left': _UPDATE},
+    'for_statement': {'left': _TARGET},
+    'for_in_clause': {'left': _TARGET},
+    'as_pattern': {'alias': _TARGET},
+    'named_expression': {'name': _TARGET},
+    'attribute': {'attribute': _SKIP},
+    'keyword_argument': {'name': _SKIP},
+    'function_definition': {'name': _SKIP, 'parameters': _PARAM},
+    'lambda': {'parameters': _PARAM},
+    'class_definition': {'name': _SKIP},
+}
+
+
+class Scope:
+    """A module, function, lambda, comprehension or class body and the names bound in it."""
+    __slots__ = ('kind', 'node', 'parent', 'symbol', 'bindings', 'globals', 'nonlocals')
+
+    def __init__(self, kind: str, node: Any, parent: Optional['Scope'], symbol: Optional['Symbol'] = None):
+        self.kind = kind
+        self.node = node
+        self.parent = parent
+        self.symbol = symbol  # the function or class defining the scope
+        self.bindings: Dict[str, List[Symbol]] = {}
+        self.globals: Set[str] = set()
+        self.nonlocals: Set[str] = set()
+
+
+class Symbol:
+    """A definition of a name: its kind, identifier node, scope and defining statement."""
+    __slots__ = ('name', 'kind', 'node', 'scope', 'statement', 'references')
+
+    def __init__(self, name: str, kind: str, node: Any, scope: Scope, statement: Any):
+        self.name = name
+        self.kind = kind
+        self.node = node
+        self.scope = scope
+        self.statement = statement
+        self.references = 0
+
+    @property
+    def line(self) -> int:
+        """1-based line of the defining statement."""
+        return self.statement.start_point[0] + 1
+
+
+class Reference:
+    """A name read in a scope, and the definitions it resolves to."""
+    __slots__ = ('name', 'node', 'scope', 'symbols')
+
+    def __init__(self, name: str, node: Any, scope: Scope):
+        self.name = name
+        self.node = node
+        self.scope = scope
+        self.symbols: List[Symbol] = []
+
+
+class CallSite:
+    """A call: the called name (the attribute for `obj.name()`) and the function it appears in."""
+    __slots__ = ('name', 'node', 'scope', 'caller')
+
+    def __init__(self, name: str, node: Any, scope: Scope, caller: Optional['Symbol']):
+        self.name = name
+        self.node = node
+        self.scope = scope
+        self.caller = caller
+
+
+class SymbolTable:
+    """
+    Definitions, references and call sites of a Python module, with every reference
+    resolved to the definitions it can read under Python's scoping rules (local,
+    enclosing functions, module; `global` / `nonlocal` honored; class bodies skipped
+    by nested functions). Built in a single iterative walk of the tree, so its cost
+    is linear in the size of the file.
+    """
+
+    def __init__(self, tree: Any):
+        root = tree.root_node
+        self.module = Scope(MODULE_SCOPE, root, None)
+        self.scopes: List[Scope] = [self.module]
+        self.symbols: List[Symbol] = []
+        self.references: List[Reference] = []
+        self.calls: List[CallSite] = []
+        self.imports: List[Any] = []  # import statements, including star imports (which bind nothing)
+        self._walk(root)
+        for reference in self.references:
+            reference.symbols = self._resolve(reference.name, reference.scope)
+            for symbol in reference.symbols:
+                symbol.references += 1
+
+    # -- building -----------------------------------------------------------
+
+    def _walk(self, root: Any) -> None:
+        stack = [(root, self.module, _REF)]
+        pop, push, extend = stack.pop, stack.append, stack.extend
+        references = self.references
+        while stack:
+            node, scope, mode = pop()
+            node_type = node.type
+
+            if node_type == 'identifier':
+                if mode == _SKIP:
+                    continue
+                name = node.text.decode('utf8')
+                if mode == _REF or mode == _UPDATE:
+                    references.append(Reference(name, node, scope))
+                if mode == _TARGET or mode == _UPDATE:
+                    self._bind(name, VARIABLE if _assignment_of(node) else NAME, node, scope)
+                elif mode == _PARAM:
+                    self._bind(name, PARAMETER, node, scope)
+                elif mode == _DECLARE:
+                    (scope.globals if node.parent.type == 'global_statement' else scope.nonlocals).add(name)
+                continue
+
+            if mode == _SKIP or node_type in INERT:
+                continue
+            children = node.children
+            if not children:
+                continue
+
+            child_scope = scope
+            if node_type in _STRUCTURAL:
+                if node_type == 'import_statement' or node_type == 'import_from_statement':
+                    self.imports.append(node)
+                    self._bind_imports(node, scope)
+                    continue
+                if node_type == 'function_definition' or node_type == 'class_definition':
+                    name_node = node.child_by_field_name('name')
+                    symbol = None
+                    if name_node is not None:
+                        symbol = self._bind(name_node.text.decode('utf8'),
+                                            FUNCTION if node_type == 'function_definition' else CLASS,
+                                            name_node, scope, node)
+                    child_scope = self._open(FUNCTION_SCOPE if node_type == 'function_definition' else CLASS_SCOPE,
+                                             node, scope, symbol)
+                elif node_type == 'call':
+                    self._add_call(node, scope)
+                elif node_type == 'global_statement' or node_type == 'nonlocal_statement':
+                    mode = _DECLARE
+                else:  # lambda or comprehension
+                    child_scope = self._open(FUNCTION_SCOPE, node, scope)
+
+            # What the children of this node do with names
+            if (mode == _TARGET or mode == _UPDATE) and node_type not in TARGET_PATTERNS:
+                mode = _REF  # obj.attr = ..., items[i] += ...: the names inside are read
+            field_modes = _FIELD_MODES.get(node_type)
+            if field_modes is None and mode != _PARAM:
+                extend(zip(reversed(children), repeat(child_scope), repeat(mode)))
+                continue
+            is_class = node_type == 'class_definition'
+            is_function = node_type == 'function_definition'
+            for i in range(len(children) - 1, -1, -1):
+                field = node.field_name_for_child(i)
+                child_mode = mode
+                target_scope = child_scope
+                if field_modes is not None and field in field_modes:
+                    child_mode = field_modes[field]
+                elif mode == _PARAM and (field == 'type' or field == 'value'):
+                    # Annotations and defaults are read where the function is defined, not in its body.
+                    child_mode = _REF
+                    target_scope = scope.parent
+                if is_function and field == 'return_type':
+                    target_scope = scope
+                elif is_class and field != 'body':
+                    target_scope = scope  # a class body is a scope of its own; bases are read outside it
+                push((children[i], target_scope, child_mode))
+
+    def _open(self, kind: str, node: Any, parent: Scope, symbol: Optional[Symbol] = None) -> Scope:
+        scope = Scope(kind, node, parent, symbol)
+        self.scopes.append(scope)
+        return scope
+
+    def _bind(self, name: str, kind: str, node: Any, scope: Scope, statement: Any = None) -> Optional[Symbol]:
+        if name in scope.nonlocals:
+            return None  # rebinds an enclosing function's name
+        if name in scope.globals:
+            scope = self.module
+        symbol = Symbol(name, kind, node, scope, statement if statement is not None else _statement_of(node))
+        scope.bindings.setdefault(name, []).append(symbol)
+        self.symbols.append(symbol)
+        return symbol
+
+    def _bind_imports(self, node: Any, scope: Scope) -> None:
+        for i, child in enumerate(node.children):
+            if node.field_name_for_child(i) != 'name':
+                continue  # the module of a from-import, keywords, wildcard
+            alias = child.child_by_field_name('alias') if child.type == 'aliased_import' else None
+            if alias is not None:
+                bound = alias
+            else:
+                dotted = child.child_by_field_name('name') if child.type == 'aliased_import' else child
+                bound = dotted.named_children[0] if dotted.named_children else dotted  # `import a.b` binds `a`
+            self._bind(bound.text.decode('utf8'), IMPORT, bound, scope, node)
+
+    def _add_call(self, node: Any, scope: Scope) -> None:
+        function = node.child_by_field_name('function')
+        if function is None:
+            return
+        if function.type == 'attribute':
+            function = function.child_by_field_name('attribute')
+        if function is None or function.type != 'identifier':
+            return
+        caller = scope
+        while caller is not None and not (caller.kind == FUNCTION_SCOPE and caller.symbol is not None):
+            caller = caller.parent
+        self.calls.append(CallSite(function.text.decode('utf8'), node, scope,
+                                   caller.symbol if caller is not None else None))
+
+    # -- resolution -----------------------------------------------------------
+
+    def _resolve(self, name: str, scope: Scope) -> List[Symbol]:
+        if name in scope.globals:
+            return self.module.bindings.get(name, [])
+        current: Optional[Scope] = scope
+        while current is not None:
+            if current is scope or current.kind != CLASS_SCOPE:
+                if name in current.bindings and name not in current.nonlocals:
+                    return current.bindings[name]
+            current = current.parent
+        return []
+
+    # -- queries ----------------------------------------------------------------
+
+    def definitions(self, kind: Optional[str] = None, scope: Optional[Scope] = None) -> List[Symbol]:
+        """Definitions in source order, optionally of one kind and/or directly in one scope."""
+        return [
+            symbol for symbol in self.symbols
+            if (kind is None or symbol.kind == kind) and (scope is None or symbol.scope is scope)
+        ]
+
+    def called_names(self) -> Set[str]:
+        return {call.name for call in self.calls}
+
+
+def _statement_of(node: Any) -> Any:
+    """The outermost assignment a target belongs to (chained `a = b = 1`), else the node's parent."""
+    statement = node.parent
+    while statement is not None and statement.type in TARGET_PATTERNS:
+        statement = statement.parent
+    while statement is not None and statement.parent is not None and statement.parent.type == 'assignment':
+        statement = statement.parent
+    return statement if statement is not None else node
+
+
+def _assignment_of(node: Any) -> bool:
+    """True if an identifier is (part of) the target of an assignment statement."""
+    parent = node.parent
+    while parent is not None and parent.type in TARGET_PATTERNS:
+        parent = parent.parent
+    return parent is not None and parent.type in ('assignment', 'augmented_assignment')
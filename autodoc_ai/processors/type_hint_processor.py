@@ -5,39 +5,41 @@ Adds type hints to Python functions, skipping dead code.
 
 from typing import Set, Any, Optional, Dict
 from .base import BaseProcessor
+from ..concurrency import LLMExecutor, SERIAL_EXECUTOR
 
 
 class TypeHintProcessor(BaseProcessor):
     """Adds type hints to Python functions, skipping dead code."""
     
-    def process(self, generator: Any, dead_functions: Optional[Set[str]] = None) -> None:
+    def process(self, generator: Any, dead_functions: Optional[Set[str]] = None,
+                executor: Optional[LLMExecutor] = None) -> None:
         """
         Add type hints to functions, skipping dead code.
         
         Args:
             generator: Generator instance for AI-powered type inference
             dead_functions: Set of dead function names to skip
+            executor: Runs the LLM calls concurrently (serial if omitted)
         """
         if self.lang != 'python':
             return  # Type hints only for Python currently
         
         dead_functions = dead_functions or set()
+        executor = executor or SERIAL_EXECUTOR
         typing_imports_needed = set()
         
-        # Get all functions
+        # Get all functions, in source order so results are applied deterministically
         all_functions = self.get_function_nodes()
         
-        # Find functions with type hints
-        functions_with_hints = set()
-        for func_node in all_functions:
-            if func_node.child_by_field_name('return_type'):
-                functions_with_hints.add(func_node)
-        
         # Find functions without type hints
-        functions_without_hints = all_functions - functions_with_hints
+        functions_without_hints = [
+            func_node for func_node in all_functions
+            if not func_node.child_by_field_name('return_type')
+        ]
         
         processed_count = 0
         skipped_count = 0
+        pending = []
         
         for func_node in functions_without_hints:
             name_node = func_node.child_by_field_name('name')
@@ -57,9 +59,20 @@ class TypeHintProcessor(BaseProcessor):
             
             line_num = name_node.start_point[0] + 1
             print(f"  [TYPE] Line {line_num}: Adding type hints to `{func_name}()`", flush=True)
-            
+            pending.append((func_node, func_name))
+        
+        def infer(item):
+            try:
+                return generator.generate_type_hints(item[0]), None
+            except Exception as e:
+                return None, e
+        
+        results = executor.map(infer, pending)
+        
+        for (func_node, func_name), (type_hints, error) in zip(pending, results):
             try:
-                type_hints = generator.generate_type_hints(func_node)
+                if error is not None:
+                    raise error
                 
                 if not type_hints or (not type_hints.get('parameters') and not type_hints.get('return_type')):
                     print(f"     [WARN] Could not infer types for `{func_name}()`")
@@ -174,8 +187,8 @@ class TypeHintProcessor(BaseProcessor):
     def _add_typing_import(self, typing_imports_needed: Set[str]) -> None:
         """Add typing import statement at the beginning of the file."""
         # Check if typing import already exists
-        has_typing_import = ('from typing import' in self.source_text or 
-                           'import typing' in self.source_text)
+        has_typing_import = any('from typing import' in record.text or 'import typing' in record.text
+                                for record in self.index.imports)
         
         if not has_typing_import:
             imports_str = ', '.join(sorted(typing_imports_needed))
@@ -0,0 +1,337 @@
+"""
+Project-wide symbol and reference index for cross-file dead-code detection.
+
+On its own, DeadCodeProcessor only sees the calls in the file it analyses, so
+every helper another module imports looks dead and the other processors skip
+it. ProjectIndex records, for every Python module of the project, its
+top-level functions and the imported names it actually uses (calls,
+references, `module.attr` chains, re-exports from `__init__.py`). Resolving
+those imports across files gives each file the set of its functions used
+elsewhere. Per-file entries are keyed by content hash and persisted in the
+cache directory with each module's importers, so a run only re-indexes the
+files that changed (on a process pool when there are many of them), and a
+--diff run only looks at the changed files and the modules around them.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .manifest import file_digest, tool_version
+
+INDEX_FORMAT = 2
+INDEX_NAME = "project_index.json"
+# Stale files per worker process below which indexing stays in this process
+INDEX_FILES_PER_WORKER = 50
+
+# Entry of a file that could not be read or parsed
+EMPTY_SYMBOLS = {"functions": [], "uses": [], "unread_imports": [], "star_imports": []}
+
+# A use of an imported name: the dotted target ("pkg.util.helper") and its relative-import level
+Use = Tuple[str, int]
+
+
+def extract_symbols(source_bytes: bytes) -> Optional[Dict[str, Any]]:
+    """
+    The cross-file facts of one Python module: its top-level functions, the
+    imported names it uses and the modules it star-imports. None if it cannot be parsed.
+    """
+    from .parser import parse_source
+    from .processors.symbol_table import FUNCTION, IMPORT, SymbolTable
+
+    tree = parse_source("python", source_bytes)
+    if tree is None:
+        return None
+    table = SymbolTable(tree)
+
+    bindings: Dict[Any, Dict[str, Use]] = {}
+    stars: Set[Use] = set()
+    for statement in table.imports:
+        bindings[statement], star = _import_targets(statement)
+        if star is not None:
+            stars.add(star)
+    targets = {symbol: bindings[symbol.statement][symbol.name] for symbol in table.definitions(IMPORT)
+               if symbol.name in bindings.get(symbol.statement, {})}
+
+    uses: Set[Use] = set()
+    for reference in table.references:
+        for symbol in reference.symbols:
+            if symbol in targets:
+                target, level = targets[symbol]
+                uses.add((target + _attribute_chain(reference.node), level))
+    # Imported and never read: dead in a module, a re-export in a package `__init__`
+    unread = {use for symbol, use in targets.items() if symbol.references == 0}
+
+    return {
+        "functions": [symbol.name for symbol in table.definitions(FUNCTION, table.module)
+                      if symbol.statement.start_point[1] == 0],
+        "uses": sorted(uses),
+        "unread_imports": sorted(unread),
+        "star_imports": sorted(stars),
+    }
+
+
+def _import_targets(statement: Any) -> Tuple[Dict[str, Use], Optional[Use]]:
+    """Maps each name an import binds to what it refers to; also returns a star import's module."""
+    bindings: Dict[str, Use] = {}
+    module, level = "", 0
+    if statement.type == "import_from_statement":
+        module_node = statement.child_by_field_name("module_name")
+        if module_node is not None and module_node.type == "relative_import":
+            for child in module_node.children:
+                if child.type == "import_prefix":
+                    level = child.text.count(b".")
+                elif child.type == "dotted_name":
+                    module = child.text.decode("utf8")
+        elif module_node is not None:
+            module = module_node.text.decode("utf8")
+        if any(child.type == "wildcard_import" for child in statement.children):
+            return bindings, (module, level)
+
+    for i, child in enumerate(statement.children):
+        if statement.field_name_for_child(i) != "name":
+            continue
+        dotted = child.child_by_field_name("name") if child.type == "aliased_import" else child
+        alias = child.child_by_field_name("alias") if child.type == "aliased_import" else None
+        name = dotted.text.decode("utf8")
+        if statement.type == "import_from_statement":
+            target = f"{module}.{name}" if module else name
+            bindings[(alias or dotted).text.decode("utf8")] = (target, level)
+        elif alias is not None:
+            bindings[alias.text.decode("utf8")] = (name, 0)
+        else:
+            first = name.split(".")[0]
+            bindings[first] = (first, 0)  # `import a.b` binds `a`
+    return bindings, None
+
+
+def _attribute_chain(node: Any) -> str:
+    """The `.b.c` of `a.b.c` read through an imported name `a`."""
+    chain = []
+    while node.parent is not None and node.parent.type == "attribute" and \
+            node.parent.child_by_field_name("object") == node:
+        node = node.parent
+        attribute = node.child_by_field_name("attribute")
+        if attribute is None:
+            break
+        chain.append(attribute.text.decode("utf8"))
+    return "".join("." + part for part in chain)
+
+
+def module_name(path: str, root: str) -> str:
+    """Dotted module name of a file relative to the project root (`pkg/__init__.py` -> `pkg`)."""
+    relative = os.path.splitext(os.path.relpath(path, root))[0]
+    parts = [part for part in relative.replace(os.sep, "/").split("/") if part not in ("", ".")]
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _index_file_job(context: Any, path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            return extract_symbols(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _setup_index_worker() -> None:
+    return None
+
+
+class ProjectIndex:
+    """
+    Top-level functions and cross-file uses of every Python module under a root,
+    persisted in `<cache_dir>/project_index.json` together with, for each module,
+    the modules that import it. After `update(paths)` (every module) or
+    `update_changed(paths)` (changed modules only), `external_uses(path)` names the
+    functions of `path` that other modules use, and `affected` holds the files
+    whose external uses changed since the last run.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.path = os.path.join(cache_dir, INDEX_NAME)
+        self.root: Optional[str] = None
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.indexed = 0
+        self.reindexed = 0
+        self.affected: Set[str] = set()
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf8") as f:
+                data = json.load(f)
+            if data.get("format") == INDEX_FORMAT and data.get("version") == tool_version():
+                self.root = data.get("root")
+                self.files = data.get("files", {})
+        except (OSError, ValueError, AttributeError):
+            self.files = {}
+
+    def update(self, paths: Iterable[str], root: str, workers: Optional[int] = None) -> None:
+        """Re-indexes the changed files among `paths` and resolves every module's uses against the others."""
+        root = os.path.abspath(root)
+        digests = self._digests(paths)
+        self._reindex(digests, workers)
+        for path in [path for path in self.files if path not in digests and not os.path.exists(path)]:
+            del self.files[path]
+            self._dirty = True
+        if self.root != root:
+            self.root = root
+            self._dirty = True
+
+        modules = _module_map(digests, root)
+        used: Dict[str, Set[str]] = {}
+        importers: Dict[str, Set[str]] = {}
+        for path in digests:
+            for owner, names in self._uses_of(path, modules).items():
+                used.setdefault(owner, set()).update(names)
+                importers.setdefault(owner, set()).add(path)
+        self.affected = set()
+        for path in digests:
+            self._resolved(path, used.get(path, set()), importers.get(path, set()))
+        self.indexed = len(digests)
+
+    def update_changed(self, paths: Iterable[str], root: str, workers: Optional[int] = None) -> bool:
+        """
+        Re-indexes only `paths` (the files changed since the last run) and the
+        modules the persisted index records as importing them, then re-resolves the
+        modules whose users may have changed. Returns False, doing nothing, if there
+        is no persisted index of `root` to start from.
+        """
+        root = os.path.abspath(root)
+        if not self.files or self.root != root:
+            return False
+        changed = {os.path.abspath(path) for path in paths if path.endswith(".py")}
+        changed = {path for path in changed if os.path.commonpath([path, root]) == root}
+        modules = _module_map(self.files, root)
+        # Modules used by the changed files before the change, then after it
+        targets = {owner for path in changed if path in self.files for owner in self._uses_of(path, modules)}
+        related = changed | {importer for path in changed for importer in self.files.get(path, {}).get("importers", [])}
+        digests = self._digests(related)
+        for path in related - digests.keys():
+            if self.files.pop(path, None) is not None:
+                self._dirty = True
+        self._reindex(digests, workers)
+
+        modules = _module_map(self.files, root)
+        changed &= self.files.keys()
+        targets.update(owner for path in changed for owner in self._uses_of(path, modules))
+        self.affected = set()
+        for owner in (changed | targets) & self.files.keys():
+            used: Set[str] = set()
+            importers: Set[str] = set()
+            for importer in set(self.files[owner].get("importers", [])) | changed:
+                names = self._uses_of(importer, modules).get(owner) if importer in self.files else None
+                if names:
+                    used.update(names)
+                    importers.add(importer)
+            self._resolved(owner, used, importers)
+        self.indexed = len(self.files)
+        return True
+
+    def _digests(self, paths: Iterable[str]) -> Dict[str, str]:
+        digests = {}
+        for path in paths:
+            path = os.path.abspath(path)
+            digest = file_digest(path)
+            if digest is not None:
+                digests[path] = digest
+        return digests
+
+    def _reindex(self, digests: Dict[str, str], workers: Optional[int]) -> None:
+        """Extracts the symbols of the files whose digest differs from their entry's."""
+        stale = [path for path, digest in digests.items() if self.files.get(path, {}).get("sha256") != digest]
+        for path, symbols in self._extract(stale, workers):
+            previous = self.files.get(path, {})
+            # What other modules do with this one is kept until it is resolved again.
+            resolution = {key: previous[key] for key in ("external", "importers") if key in previous}
+            self.files[path] = {"sha256": digests[path], **(symbols or EMPTY_SYMBOLS), **resolution}
+            self._dirty = True
+        self.reindexed = len(stale)
+
+    def _extract(self, paths: List[str], workers: Optional[int]):
+        if workers is None:
+            workers = min(os.cpu_count() or 1, len(paths) // INDEX_FILES_PER_WORKER)
+        if workers <= 1:
+            return [(path, _index_file_job(None, path)) for path in paths]
+        from .parallel import FilePool
+        with FilePool(workers, _setup_index_worker) as pool:
+            return [(path, symbols) for path, _, symbols in pool.map(_index_file_job, paths)]
+
+    def _uses_of(self, path: str, modules: Dict[str, List[str]]) -> Dict[str, Set[str]]:
+        """The names one module uses from each of the others, by the other module's path."""
+        entry = self.files[path]
+        name = module_name(path, self.root)
+        is_package = os.path.basename(path) == "__init__.py"
+        package = name if is_package else name.rpartition(".")[0]
+        found: Dict[str, Set[str]] = {}
+        uses = entry.get("uses", []) + (entry.get("unread_imports", []) if is_package else [])
+        for target, level in uses:
+            parts = _absolute(target, level, package).split(".")
+            for split in range(1, len(parts)):
+                for owner in modules.get(".".join(parts[:split]), ()):
+                    if owner != path:
+                        found.setdefault(owner, set()).add(parts[split])
+        for target, level in entry.get("star_imports", []):
+            for owner in modules.get(_absolute(target, level, package), ()):
+                if owner != path:
+                    found.setdefault(owner, set()).update(
+                        name for name in self.files[owner].get("functions", []) if not name.startswith("_"))
+        return found
+
+    def _resolved(self, path: str, used: Set[str], importers: Set[str]) -> None:
+        """Stores a module's external uses and importers; a changed external set marks it affected."""
+        entry = self.files[path]
+        external = sorted(used & set(entry.get("functions", [])))
+        if entry.get("external", []) != external:
+            self.affected.add(path)
+        if entry.get("external") != external or entry.get("importers") != sorted(importers):
+            entry["external"] = external
+            entry["importers"] = sorted(importers)
+            self._dirty = True
+
+    def external_uses(self, path: str) -> Set[str]:
+        """Names of `path`'s top-level functions used by other modules of the project."""
+        return set(self.files.get(os.path.abspath(path), {}).get("external", []))
+
+    def uses_by_file(self) -> Dict[str, Set[str]]:
+        """`external_uses` of every indexed file that has some, for handing to worker processes."""
+        return {path: set(entry["external"]) for path, entry in self.files.items() if entry.get("external")}
+
+    def save(self) -> None:
+        """Writes the index atomically. Failures are ignored: the index is best-effort."""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump({"format": INDEX_FORMAT, "version": tool_version(), "root": self.root,
+                           "files": self.files}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+def _module_map(paths: Iterable[str], root: str) -> Dict[str, List[str]]:
+    """
+    Files by the module names an import may use for them: the name relative to the
+    root, and any dotted suffix of it (for src/ layouts and sys.path entries below the root).
+    """
+    modules: Dict[str, List[str]] = {}
+    for path in paths:
+        parts = module_name(path, root).split(".")
+        for start in range(len(parts)):
+            modules.setdefault(".".join(parts[start:]), []).append(path)
+    return modules
+
+
+def _absolute(target: str, level: int, package: str) -> str:
+    """Resolves a relative import target against the importing module's package."""
+    if not level:
+        return target
+    base = package.split(".") if package else []
+    base = base[:len(base) - (level - 1)] if level > 1 else base
+    return ".".join(base + ([target] if target else []))
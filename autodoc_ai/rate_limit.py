@@ -0,0 +1,158 @@
+"""
+Client-side rate limiting for LLM providers.
+
+Each (provider, model) pair gets a shared pair of token buckets, one for requests
+per minute (RPM) and one for tokens per minute (TPM). Callers block until both
+buckets can cover their request, so a run can go as fast as the provider allows
+without triggering 429 responses.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .llm_services import ILLMService, LLMServiceWrapper, estimate_tokens
+
+DEFAULT_EXPECTED_OUTPUT_TOKENS = 512
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket holding at most `capacity` tokens, refilled at
+    `capacity` tokens per `period` seconds.
+
+    Reservations may drive the balance negative; the caller then sleeps for the
+    time it takes to pay the debt back. This keeps waiting callers in FIFO order
+    without a condition variable.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` tokens and returns how many seconds the caller must wait before using them."""
+        # A single request larger than the bucket could never be served; cap it.
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.refill_rate
+
+    def adjust(self, delta: float) -> None:
+        """Corrects a reservation once the real cost is known (negative `delta` refunds tokens)."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter:
+    """RPM and TPM buckets for one provider/model. Either limit may be absent."""
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.requests = TokenBucket(rpm, clock=clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock=clock) if tpm else None
+        self.sleep = sleep
+
+    def acquire(self, tokens: int) -> float:
+        """Blocks until one request of `tokens` tokens may be sent. Returns the time waited."""
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Charges or refunds the difference between the reserved and the actual token count."""
+        if self.tokens and actual != estimated:
+            self.tokens.adjust(actual - estimated)
+
+
+_limiters: Dict[Tuple[str, str, Optional[float], Optional[float]], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str, rpm: Optional[float], tpm: Optional[float]) -> RateLimiter:
+    """
+    Returns the process-wide limiter for a provider/model and its limits, creating
+    it on first use. Callers configured with different limits get separate limiters.
+    """
+    with _limiters_lock:
+        key = (provider, model, rpm, tpm)
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rpm=rpm, tpm=tpm)
+        return _limiters[key]
+
+
+def resolve_limits(rate_limits: Optional[Dict[str, Any]], provider: str, model: str) -> Dict[str, Any]:
+    """
+    Looks up the limits for a provider/model in the `[tool.zenco.rate_limits]` table.
+    A "provider/model" entry overrides the provider-wide entry key by key.
+    """
+    rate_limits = rate_limits or {}
+    limits: Dict[str, Any] = {}
+    limits.update(rate_limits.get(provider, {}))
+    limits.update(rate_limits.get(f"{provider}/{model}", {}))
+    return limits
+
+
+def split_limits(rate_limits: Optional[Dict[str, Any]], parts: int) -> Dict[str, Any]:
+    """
+    Divides every RPM/TPM budget in a rate_limits table evenly between `parts`
+    processes, each of which enforces its share with its own limiter.
+    """
+    parts = max(1, int(parts))
+    return {
+        key: {name: value / parts if name in ("rpm", "tpm") and value else value for name, value in limits.items()}
+        for key, limits in (rate_limits or {}).items()
+    }
+
+
+class RateLimitedLLMService(LLMServiceWrapper):
+    """An ILLMService wrapper that blocks until the provider's RPM/TPM budget allows a request."""
+
+    def __init__(self, inner: ILLMService, limiter: RateLimiter,
+                 expected_output_tokens: int = DEFAULT_EXPECTED_OUTPUT_TOKENS):
+        super().__init__(inner)
+        self.limiter = limiter
+        self.expected_output_tokens = expected_output_tokens
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def create_completion(self, prompt: str) -> str:
+        estimated = estimate_tokens(prompt) + self.expected_output_tokens
+        waited = self.limiter.acquire(estimated)
+        if waited:
+            with self._lock:
+                self.waits += 1
+                self.wait_seconds += waited
+
+        # A failed call is charged its estimate: whatever it consumed at the provider is unknown.
+        actual = estimated
+        try:
+            response = self.inner.create_completion(prompt)
+            actual = estimate_tokens(prompt) + estimate_tokens(response or "")
+            return response
+        finally:
+            self.limiter.record_usage(estimated, actual)
+
+    def stats(self) -> Dict[str, int]:
+        return {"rate_limit_waits": self.waits, "rate_limit_wait_seconds": int(round(self.wait_seconds))}
@@ -0,0 +1,196 @@
+"""
+Retry and circuit-breaker handling for LLM provider errors.
+
+Adapters raise whatever their SDK raises. ResilientLLMService classifies each
+error as retryable (rate limits, timeouts, server errors) or fatal (bad request,
+authentication), retries the former with capped exponential backoff and jitter,
+and opens a circuit breaker after consecutive failures so that a degraded
+provider fails fast instead of stalling the whole run.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .llm_services import ILLMService, LLMServiceWrapper
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429}
+RETRYABLE_ERROR_NAMES = (
+    "Timeout", "Connection", "RateLimit", "TooManyRequests", "ServiceUnavailable",
+    "InternalServer", "ResourceExhausted", "DeadlineExceeded", "Overloaded",
+)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Extracts the HTTP status from OpenAI/Groq/Anthropic (`status_code`) or Google (`code`) errors."""
+    for candidate in (getattr(exc, "status_code", None),
+                      getattr(getattr(exc, "response", None), "status_code", None),
+                      getattr(exc, "code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Returns True for transient errors worth retrying, False for fatal ones."""
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(name in cls.__name__ for cls in type(exc).__mro__ for name in RETRYABLE_ERROR_NAMES)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Returns the server-requested delay (Retry-After header) in seconds, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Failures counted per thread, so each file's work can be told apart from its neighbours'
+_thread_failures = threading.local()
+
+
+def record_failure() -> None:
+    """
+    Counts a failure on the current thread: an LLM call that produced nothing, or
+    work a processor had to abandon. Callers compare `failures_on_this_thread()`
+    before and after a unit of work to tell whether it completed.
+    """
+    _thread_failures.count = getattr(_thread_failures, "count", 0) + 1
+
+
+def failures_on_this_thread() -> int:
+    return getattr(_thread_failures, "count", 0)
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, exc: Optional[BaseException] = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        requested = retry_after(exc) if exc is not None else None
+        if requested is not None:
+            backoff = max(backoff, min(requested, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. After that a single trial call is let through
+    (half-open): success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """Returns True if a call may be attempted now."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_in_flight or self.clock() - self.opened_at < self.reset_timeout:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Records a failed call. Returns True if this failure tripped the breaker."""
+        with self._lock:
+            self.failures += 1
+            was_trial = self.trial_in_flight
+            self.trial_in_flight = False
+            if was_trial or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = self.clock()
+                self.trips += 1
+                return True
+            return False
+
+
+class ResilientLLMService(LLMServiceWrapper):
+    """
+    An ILLMService wrapper that retries transient provider errors and stops
+    calling a provider while its circuit breaker is open. Failures that cannot
+    be recovered are reported and turned into an empty completion, which is
+    how callers already detect a failed request.
+    """
+
+    def __init__(self, inner: ILLMService, policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        super().__init__(inner)
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+        self.retries = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def create_completion(self, prompt: str) -> str:
+        for attempt in range(1, self.policy.max_attempts + 1):
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                record_failure()
+                return ""
+            try:
+                response = self.inner.create_completion(prompt)
+            except Exception as e:
+                tripped = self.breaker.record_failure()
+                if tripped:
+                    print(f"  [WARN] {self.provider} circuit breaker opened after repeated failures; "
+                          f"skipping LLM calls for {self.breaker.reset_timeout:.0f}s", flush=True)
+                if not is_retryable(e) or attempt == self.policy.max_attempts:
+                    self._count("failures")
+                    record_failure()
+                    print(f"Error calling {self.provider} API: {e}", flush=True)
+                    return ""
+                self._count("retries")
+                self.sleep(self.policy.delay(attempt, e))
+                continue
+            self.breaker.record_success()
+            return response
+        return ""
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "llm_retries": self.retries,
+            "llm_failures": self.failures,
+            "circuit_breaker_trips": self.breaker.trips,
+            "circuit_breaker_rejections": self.short_circuited,
+        }
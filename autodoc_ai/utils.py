@@ -1,6 +1,7 @@
+import codecs
 import os
-import pathspec
-import git
+import re
+import subprocess
 from typing import Optional
 
 SUPPORTED_EXTENSIONS = {
@@ -13,61 +14,151 @@ SUPPORTED_EXTENSIONS = {
     '.h'
 }
 
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.java': 'java',
+    '.go': 'go',
+    '.cpp': 'cpp',
+    '.hpp': 'cpp',
+    '.h': 'cpp',
+}
+
+
+def language_for(path: str) -> Optional[str]:
+    """The tree-sitter language of a source file, from its extension (None if unsupported)."""
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(path)[1])
+
+
 def get_source_files(path: str) -> list[str]:
     """
-    Finds all supported source files in a given path, respecting .gitignore
+    Finds all supported source files in a given path, respecting .gitignore and
+    .zencoignore files. See `discovery.iter_source_files` to stream them instead.
     """
-    if os.path.isfile(path):
-        if any(path.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
-            return [os.path.abspath(path)]
-        return []
+    from .discovery import iter_source_files
+    return list(iter_source_files(path))
 
-    if not os.path.isdir(path):
-        print(f"Error: Path `{path}` is not valid file or directory.")
-        return []
 
-    gitignore_path = os.path.join(path, '.gitignore')
-    spec = None
-    if os.path.exists(gitignore_path):
-        with open(gitignore_path, 'r') as f:
-            patterns = f.read().splitlines()
-            patterns.extend(['.git/', 'venv/', '__pycache__/', 'node_modules/'])
-            spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+class GitError(Exception):
+    """Raised when a git command fails (not a repository, unknown ref, git missing)."""
 
-    source_files = []
-    for root, _, files in os.walk(path):
-        for file in files:
-            if any(file.endswith(ext) for ext in SUPPORTED_EXTENSIONS):
-                full_path = os.path.join(root, file)
-                if spec and spec.match_file(full_path):
-                    continue
-                source_files.append(full_path)
-                
-    return source_files
 
+def run_git(args: list[str], cwd: Optional[str] = None) -> str:
+    """Runs `git <args>` and returns its stdout. Raises GitError on failure."""
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True,
+                                encoding='utf8', errors='surrogateescape')
+    except FileNotFoundError:
+        raise GitError("git executable not found") from None
+    if result.returncode != 0:
+        raise GitError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def is_source_file(path: str) -> bool:
+    return os.path.splitext(path)[1] in SUPPORTED_EXTENSIONS
 
-def get_git_changed_files() -> Optional[list[str]]:
-    """Finds all changed/untracked supported source files in the current git repo."""
+
+def parse_porcelain_status(output: str) -> list[str]:
+    """
+    Paths from `git status --porcelain -z` output that still exist in the working
+    tree: modified, added, renamed (new name) and untracked. Deletions are dropped.
+    """
+    paths = []
+    entries = iter(output.split('\0'))
+    for entry in entries:
+        if len(entry) < 4:
+            continue
+        status, path = entry[:2], entry[3:]
+        if 'R' in status or 'C' in status:
+            next(entries, None)  # the entry after a rename/copy is its source path
+        if 'D' in status:
+            continue
+        paths.append(path)
+    return paths
+
+
+def get_git_changed_files(since: Optional[str] = None) -> Optional[list[str]]:
+    """
+    Finds all changed/untracked supported source files in the current git repo,
+    from a single `git status --porcelain -z` query. With `since`, files changed
+    on this branch since its merge base with that ref are included as well, which
+    is exactly a pull request's changes in CI.
+    """
     try:
-        repo = git.Repo(search_parent_directories=True)
-        repo_root = repo.working_tree_dir
+        repo_root = run_git(['rev-parse', '--show-toplevel']).strip()
+        paths = parse_porcelain_status(
+            run_git(['status', '--porcelain', '-z', '--untracked-files=all'], cwd=repo_root)
+        )
+        if since:
+            committed = run_git(['diff', '--name-only', '-z', '--diff-filter=d', f'{since}...HEAD'], cwd=repo_root)
+            paths.extend(path for path in committed.split('\0') if path)
+    except GitError as e:
+        if 'not a git repository' in str(e):
+            print("Error: --diff flag was used, but this is not a git repository.")
+        else:
+            print(f"An unexpected error occurred with Git: {e}")
+        return None
 
-        staged_files = [os.path.join(repo_root, item.a_path) for item in repo.index.diff(None) if item.a_path.endswith('.py')]
+    changed = {os.path.join(repo_root, path) for path in paths if is_source_file(path)}
+    return sorted(path for path in changed if os.path.isfile(path))
 
-        unstaged_files = [os.path.join(repo_root, item.a_path) for item in repo.head.commit.diff(None) if item.a_path.endswith('.py')]
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
 
-        untracked_files = [os.path.join(repo_root, f) for f in repo.untracked_files if f.endswith('.py')]
+LineRanges = list[tuple[int, int]]
 
-        all_changed_files = set(staged_files + unstaged_files + untracked_files)
-        return list(all_changed_files)
 
-    except git.InvalidGitRepositoryError:
-        print("Error: --diff flag was used, but this is not a git repository.")
-        return None
+def _diff_header_path(target: str) -> str:
+    """
+    The path of a `+++` header: git appends a TAB to names containing spaces, and
+    C-quotes names with control characters, quotes or backslashes.
+    """
+    target = target.rstrip('\t')
+    if len(target) >= 2 and target.startswith('"') and target.endswith('"'):
+        raw = codecs.escape_decode(target[1:-1].encode('utf8', 'surrogateescape'))[0]
+        target = raw.decode('utf8', 'surrogateescape')
+    return target
+
 
-    except Exception as e:
-        print(f"An unexpected error occurred with Git: {e}")
+def parse_unified_diff(output: str) -> dict[str, LineRanges]:
+    """
+    Maps each file in `git diff -U0` output (repository-relative path) to the
+    1-based, inclusive line ranges its hunks touch in the new version. A pure
+    deletion touches the line it follows.
+    """
+    ranges: dict[str, LineRanges] = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith('+++ '):
+            target = _diff_header_path(line[4:])
+            current = target[2:] if target.startswith('b/') else None
+            if current is not None:
+                ranges.setdefault(current, [])
+        elif current is not None and line.startswith('@@'):
+            match = HUNK_HEADER.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                ranges[current].append((max(start, 1), max(start + count - 1, start, 1)))
+    return ranges
+
+
+def get_git_changed_lines(since: Optional[str] = None) -> Optional[dict[str, LineRanges]]:
+    """
+    Changed line ranges of every modified file (absolute path), from one
+    `git diff -U0` of the working tree against HEAD, or against the merge base
+    with `since`. Files absent from the result (untracked, or new in a repository
+    without commits) count as changed throughout. Returns None if git fails.
+    """
+    try:
+        repo_root = run_git(['rev-parse', '--show-toplevel']).strip()
+        base = run_git(['merge-base', since, 'HEAD'], cwd=repo_root).strip() if since else 'HEAD'
+        output = run_git(['-c', 'core.quotepath=off', 'diff', '-U0', '--no-color', '--no-ext-diff', base],
+                         cwd=repo_root)
+    except GitError:
         return None
+    return {os.path.join(repo_root, path): lines for path, lines in parse_unified_diff(output).items()}
+
 
 def get_python_files(path: str) -> list[str]:
     """
@@ -88,6 +179,7 @@ def get_python_files(path: str) -> list[str]:
     gitignore_path = os.path.join(path, ".gitignore")
     spec = None
     if os.path.exists(gitignore_path):
+        import pathspec
         with open(gitignore_path, 'r') as f:
             patterns = f.read().splitlines()
             patterns.extend(['.git/', 'venv/', '__pycache__/'])
@@ -0,0 +1,95 @@
+"""
+Benchmark: Python dead-code analysis of a large module with the single-pass
+SymbolTable versus the ast-based scan it replaced (one full `ast.walk` per
+module-level assignment).
+
+    python benchmarks/bench_dead_code.py --lines 20000 --repeat 3
+
+At 20,000 lines the old scan takes minutes (about 490 s against 0.9 s for
+parsing plus the symbol table on the machine it was written on); pass
+--skip-baseline to time the symbol table alone.
+"""
+
+import argparse
+import ast
+import io
+import time
+from contextlib import redirect_stdout
+
+from autodoc_ai.parser import parse_source
+from autodoc_ai.processors import DeadCodeProcessor
+from autodoc_ai.transformers import CodeTransformer
+
+# Lines per generated block: one constant, one helper and one function calling it
+BLOCK_LINES = 10
+
+
+def make_source(lines: int) -> bytes:
+    chunks = ["import os\nimport sys\nfrom typing import List\n\n"]
+    for i in range(lines // BLOCK_LINES):
+        chunks.append(
+            f"LIMIT_{i} = {i * 3 + 7}\n"
+            f"def helper_{i}(items: List[int]) -> int:\n"
+            f"    total = sum(x for x in items if x > LIMIT_{i})\n"
+            f"    return total + len(os.sep)\n"
+            f"\n"
+            f"def task_{i}(path):\n"
+            f"    values = [len(part) for part in path.split('/')]\n"
+            f"    return helper_{i}(values)\n"
+            f"\n"
+            f"\n"
+        )
+    return "".join(chunks).encode("utf8")
+
+
+def ast_scan(source: str):
+    """The analysis DeadCodeProcessor ran before: four ast walks plus one per top-level assignment."""
+    tree = ast.parse(source)
+    used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+    calls = {node.func.id for node in ast.walk(tree)
+             if isinstance(node, ast.Call) and isinstance(node.func, ast.Name)}
+    functions = [node.name for node in ast.walk(tree) if isinstance(node, ast.FunctionDef) and node.col_offset == 0]
+    unused = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and node.col_offset == 0:
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    if sum(1 for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id == target.id) <= 1:
+                        unused.append(target.id)
+    return used, calls, functions, unused
+
+
+def symbol_table_scan(source: bytes):
+    tree = parse_source("python", source)
+    with redirect_stdout(io.StringIO()):
+        return DeadCodeProcessor("python", tree, source, CodeTransformer(source)).process()
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-baseline", action="store_true", help="only time the symbol table")
+    args = parser.parse_args()
+
+    source = make_source(args.lines)
+    print(f"{len(source.splitlines()):,} lines")
+    symbol_table = best_of(args.repeat, symbol_table_scan, source)
+    print(f"  symbol table (parse + analysis): {symbol_table * 1000:10.1f} ms")
+    if not args.skip_baseline:
+        baseline = best_of(1, ast_scan, source.decode("utf8"))
+        print(f"  ast walks:                       {baseline * 1000:10.1f} ms  "
+              f"({baseline / symbol_table:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: indexing a large file with the compiled tree-sitter queries (FileIndex)
+versus the recursive Python walks the processors used before.
+
+    python benchmarks/bench_file_index.py --functions 5000 --repeat 5
+"""
+
+import argparse
+import time
+
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import FileIndex
+
+
+def make_source(functions: int) -> bytes:
+    chunks = ["import os\nfrom typing import List\n\n"]
+    for i in range(functions):
+        chunks.append(
+            f"def handler_{i}(value, retries=3):\n"
+            f"    \"\"\"Handle case {i}.\"\"\"\n"
+            f"    def scale(x):\n"
+            f"        return x * {i + 17} + 0.5\n"
+            f"    if value > {i * 7 + 100}:\n"
+            f"        return os.path.join(str(scale(value)), 'out')\n"
+            f"    return handler_{max(i - 1, 0)}(value - 1)\n\n\n"
+        )
+    return "".join(chunks).encode("utf8")
+
+
+def recursive_index(tree):
+    """What the processors did before: one recursive walk per node type, then a parent climb per literal."""
+    def find(node, types):
+        results = []
+        if node.type in types:
+            results.append(node)
+        for child in node.children:
+            results.extend(find(child, types))
+        return results
+
+    functions = find(tree.root_node, {"function_definition"})
+    numbers = []
+    for node in find(tree.root_node, {"integer", "float"}):
+        current = node.parent
+        while current and current.type != "function_definition":
+            current = current.parent
+        numbers.append((node, current))
+    return functions, numbers
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--functions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = make_source(args.functions)
+    tree = get_language_parser("python").parse(source)
+    FileIndex("python", tree)  # compile the query outside the timings
+
+    baseline = best_of(args.repeat, recursive_index, tree)
+    indexed = best_of(args.repeat, FileIndex, "python", tree)
+    lines = source.count(b"\n")
+    print(f"{lines:,} lines, {args.functions:,} functions")
+    print(f"  recursive walks:  {baseline * 1000:8.1f} ms")
+    print(f"  FileIndex query:  {indexed * 1000:8.1f} ms  ({baseline / indexed:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
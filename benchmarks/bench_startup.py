@@ -0,0 +1,57 @@
+"""
+Benchmark: CLI startup time (`zenco --help` in a fresh interpreter).
+
+Fails with exit status 1 when the median exceeds --max-ms, so it can guard
+against heavy imports creeping back into the startup path:
+
+    python benchmarks/bench_startup.py --runs 10 --max-ms 300
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+COMMAND = [sys.executable, "-c", "import sys; from autodoc_ai.cli import main; sys.argv = ['zenco', '--help']; main()"]
+# Modules that must only load when a run actually needs them
+DEFERRED_MODULES = ("groq", "openai", "anthropic", "google.generativeai", "git", "rich", "colorama",
+                    "pathspec", "tree_sitter_python", "tree_sitter_javascript", "tree_sitter_java",
+                    "tree_sitter_go", "tree_sitter_cpp")
+
+
+def loaded_deferred_modules() -> list:
+    """Deferred modules that importing the CLI loads anyway."""
+    probe = f"import sys, autodoc_ai.cli; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def time_startup(runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(COMMAND, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=300.0, help="Fail if the median startup exceeds this")
+    args = parser.parse_args()
+
+    eager = loaded_deferred_modules()
+    timings = time_startup(args.runs)
+    median = statistics.median(timings)
+    print(f"zenco --help: median {median:.0f} ms, min {min(timings):.0f} ms over {args.runs} runs")
+    if eager:
+        print(f"  loaded at startup: {', '.join(eager)}")
+    if median > args.max_ms or eager:
+        print(f"  REGRESSION: startup budget is {args.max_ms:.0f} ms with no deferred modules loaded")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Tests for adapter lifecycle and connection-pool reuse."""
+from autodoc_ai.llm_services import GroqAdapter, close_shared_adapters, get_shared_adapter
+
+
+def test_shared_adapter_is_created_once_and_pooled():
+    first = get_shared_adapter(GroqAdapter, "test-key", "test-model", pool_size=7, timeout=5.0)
+    second = get_shared_adapter(GroqAdapter, "test-key", "test-model", pool_size=7, timeout=5.0)
+    other = get_shared_adapter(GroqAdapter, "test-key", "other-model", pool_size=7, timeout=5.0)
+    assert first is second
+    assert first is not other
+    assert first.client._client is first.http_client
+    assert first.http_client.timeout.read == 5.0
+
+    close_shared_adapters()
+    assert first.http_client.is_closed
+    assert get_shared_adapter(GroqAdapter, "test-key", "test-model", pool_size=7, timeout=5.0) is not first
+    close_shared_adapters()
@@ -0,0 +1,69 @@
+"""Tests for batched docstring generation."""
+import json
+import re
+
+from autodoc_ai.concurrency import chunk_by_budget
+from autodoc_ai.generators import LLMGenerator
+from autodoc_ai.llm_services import OpenAIAdapter
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import DocstringProcessor
+from autodoc_ai.transformers import CodeTransformer
+
+
+class ScriptedAdapter(OpenAIAdapter):
+    """Answers batch prompts with docstrings for every id except those in `drop`."""
+    provider = "fake"
+
+    def __init__(self, drop=()):
+        self.model = "fake-model"
+        self.drop = set(drop)
+        self.prompts = []
+
+    def create_completion(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        names = re.findall(r"def (\w+)\(", prompt)
+        if "### f1" not in prompt:
+            return f"Single docstring for {names[0]}."
+        ids = re.findall(r"### (f\d+)", prompt)
+        answer = {fid: f"Batched docstring for {name}." for fid, name in zip(ids, names) if name not in self.drop}
+        self.drop = set()  # Only the first response is incomplete.
+        return "```json\n" + json.dumps(answer) + "\n```"
+
+
+def _functions(count):
+    source = "".join(f"def func_{i}(x):\n    return x\n\n" for i in range(count)).encode("utf8")
+    tree = get_language_parser("python").parse(source)
+    return source, tree, [n for n in tree.root_node.children if n.type == "function_definition"]
+
+
+def test_batch_returns_docstrings_in_order():
+    adapter = ScriptedAdapter()
+    _, _, nodes = _functions(5)
+    docstrings = LLMGenerator(adapter).generate_batch(nodes)
+    assert docstrings == [f"Batched docstring for func_{i}." for i in range(5)]
+    assert len(adapter.prompts) == 1
+
+
+def test_only_missing_items_are_retried():
+    adapter = ScriptedAdapter(drop={"func_1", "func_3"})
+    _, _, nodes = _functions(5)
+    docstrings = LLMGenerator(adapter).generate_batch(nodes)
+    assert docstrings == [f"Batched docstring for func_{i}." for i in range(5)]
+    assert len(adapter.prompts) == 2
+    assert "func_0" not in adapter.prompts[1]
+    assert "func_1" in adapter.prompts[1] and "func_3" in adapter.prompts[1]
+
+
+def test_processor_batches_by_size():
+    adapter = ScriptedAdapter()
+    source, tree, _ = _functions(7)
+    transformer = CodeTransformer(source)
+    DocstringProcessor("python", tree, source, transformer).process(LLMGenerator(adapter), batch_size=3)
+    assert len(adapter.prompts) == 3
+    output = transformer.apply_changes().decode("utf8")
+    assert output.count("docstring for func_") == 7
+
+
+def test_chunk_by_budget_respects_item_and_token_limits():
+    assert chunk_by_budget([1, 1, 1, 1, 1], 2, 100, cost=lambda x: x) == [[1, 1], [1, 1], [1]]
+    assert chunk_by_budget([5, 5, 50, 5], 10, 12, cost=lambda x: x) == [[5, 5], [50], [5]]
@@ -0,0 +1,49 @@
+"""Tests for concurrent LLM execution inside processors."""
+import random
+import threading
+import time
+
+from autodoc_ai.concurrency import LLMExecutor
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import DocstringProcessor
+from autodoc_ai.transformers import CodeTransformer
+
+
+class SlowGenerator(MockGenerator):
+    """Answers after a random delay and records the peak number of concurrent calls."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate(self, node):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(random.uniform(0.001, 0.02))
+        with self.lock:
+            self.active -= 1
+        return f"Docs for {node.child_by_field_name('name').text.decode('utf8')}."
+
+
+def test_executor_preserves_order():
+    with LLMExecutor(max_workers=8) as executor:
+        results = executor.map(lambda n: (time.sleep(random.uniform(0, 0.01)), n)[1], range(50))
+    assert results == list(range(50))
+
+
+def test_docstrings_are_generated_concurrently_and_applied_in_order():
+    source = "".join(f"def func_{i}(x):\n    return x\n\n" for i in range(20)).encode("utf8")
+    tree = get_language_parser("python").parse(source)
+    transformer = CodeTransformer(source)
+    generator = SlowGenerator()
+
+    with LLMExecutor(max_workers=4) as executor:
+        DocstringProcessor("python", tree, source, transformer).process(generator, executor=executor)
+
+    output = transformer.apply_changes().decode("utf8")
+    positions = [output.index(f"Docs for func_{i}.") for i in range(20)]
+    assert positions == sorted(positions)
+    assert 1 < generator.peak <= 4
@@ -0,0 +1,115 @@
+"""Tests for the symbol table behind Python dead-code detection."""
+from autodoc_ai.parser import parse_source
+from autodoc_ai.processors import DeadCodeProcessor
+from autodoc_ai.processors.symbol_table import FUNCTION, IMPORT, PARAMETER, SymbolTable
+from autodoc_ai.transformers import CodeTransformer
+
+SOURCE = b'''import os
+import os.path as osp, sys
+from __future__ import annotations
+from typing import *
+from json import loads, dumps
+
+__all__ = ["run"]
+LIMIT = 10
+shadowed = 1
+counter = 0
+a = b = 2
+a = 3
+
+class Config:
+    LIMIT = 99
+    def method(self):
+        return LIMIT
+
+def run(path, retries=LIMIT):
+    shadowed = osp.join(path, "x")
+    total = [shadowed for shadowed in range(retries)]
+    helper(sys.argv)
+    return loads(shadowed), total
+
+def bump():
+    global counter
+    counter += 1
+
+def helper(args):
+    def inner():
+        nonlocal args
+        args = []
+    inner()
+    return args
+'''
+
+
+def _process(source, **kwargs):
+    tree = parse_source("python", source)
+    transformer = CodeTransformer(source)
+    dead = DeadCodeProcessor("python", tree, source, transformer).process(**kwargs)
+    return dead, transformer
+
+
+def test_references_resolve_through_python_scopes():
+    table = SymbolTable(parse_source("python", SOURCE))
+    module = {symbol.name: symbol for symbol in table.definitions(scope=table.module)}
+
+    assert module["os"].references == 0 and module["osp"].references == 1 and module["sys"].references == 1
+    assert [s.name for s in table.definitions(IMPORT) if s.references == 0] == ["os", "dumps"]
+    # The class attribute is invisible to the method; the local `shadowed` hides the module one.
+    assert module["LIMIT"].references == 2
+    assert module["shadowed"].references == 0
+    assert module["counter"].references == 1  # through `global counter`
+    assert [s.name for s in table.definitions(PARAMETER)] == ["self", "path", "retries", "args"]
+    calls = {(call.name, call.caller.name if call.caller else None) for call in table.calls}
+    assert {("join", "run"), ("helper", "run"), ("inner", "helper"), ("range", "run")} <= calls
+    assert [s.name for s in table.definitions(FUNCTION, table.module)] == ["run", "bump", "helper"]
+
+
+def test_parameter_defaults_and_annotations_are_read_outside_the_function():
+    source = b'''import os
+from typing import List
+_SENTINEL = object()
+
+def f(os=os, *, marker=_SENTINEL):
+    return os, marker
+
+def g(List: List, *rest: List) -> List:
+    return [List, rest]
+
+handler = lambda os=os: os
+'''
+    table = SymbolTable(parse_source("python", source))
+    module = {symbol.name: symbol for symbol in table.definitions(scope=table.module)}
+
+    assert module["os"].references == 2
+    assert module["List"].references == 3
+    assert module["_SENTINEL"].references == 1
+    params = {(s.name, s.scope.symbol.name if s.scope.symbol else None): s.references
+              for s in table.definitions(PARAMETER)}
+    assert params[("os", "f")] == 1 and params[("List", "g")] == 1
+
+
+def test_dead_code_report_and_strict_removal(capsys):
+    dead, transformer = _process(SOURCE, in_place=True, strict=True)
+    report = capsys.readouterr().out
+
+    assert dead == {"run", "bump"}
+    assert "Unused import at line 1: import os" in report
+    assert "Unused import at line 5: from json import loads, dumps" not in report
+    assert "annotations" not in report and "import *" not in report
+    assert "Unused variable: shadowed (line 9)" in report
+    assert "Unused variable: a (line 11)" in report and "Unused variable: b (line 11)" in report
+    assert "__all__" not in report and "LIMIT" not in report
+    new_code = transformer.apply_changes().decode()
+    assert "import os\n" not in new_code and "shadowed = 1" not in new_code and "a = b = 2" not in new_code
+
+
+def test_syntax_errors_skip_the_analysis(capsys):
+    dead, _ = _process(b"import os\n\ndef broken(:\n    pass\n")
+    assert dead == set()
+    assert "syntax error near line 3" in capsys.readouterr().out
+
+
+def test_functions_used_by_other_modules_are_not_dead(capsys):
+    dead, _ = _process(SOURCE, external_uses={"run"})
+    assert dead == {"bump"}
+    assert "Function never called: run" not in capsys.readouterr().out
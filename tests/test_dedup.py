@@ -0,0 +1,117 @@
+"""Tests for exact and near-duplicate function detection."""
+from autodoc_ai.dedup import DedupGenerator, FunctionShape, parameter_names
+from autodoc_ai.generators import IDocstringGenerator
+from autodoc_ai.parser import get_language_parser
+
+
+class CountingGenerator(IDocstringGenerator):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, node):
+        self.calls += 1
+        name = node.child_by_field_name("name").text.decode()
+        params = ", ".join(parameter_names(node))
+        return f'"""{name} sums {params}."""'
+
+    def evaluate(self, node, docstring):
+        return True
+
+    def suggest_name(self, node, old_name):
+        return None
+
+    def generate_type_hints(self, node):
+        self.calls += 1
+        return {"parameters": {p: "int" for p in parameter_names(node)}, "return_type": "int"}
+
+    def suggest_constant_name(self, code_context, magic_number):
+        return None
+
+
+def _functions(source):
+    tree = get_language_parser("python").parse(source.encode())
+    return [n for n in tree.root_node.children if n.type == "function_definition"]
+
+
+ORIGINAL = '''def total(values, start):
+    # running sum
+    result = start
+    for value in values:
+        if value is not None and value > 0:
+            result = result + value * 2 - 1
+    return result
+'''
+
+RENAMED = '''def add_up(items, initial):
+    """Already documented."""
+    result = initial
+    for value in items:
+        if value is not None and value > 0:
+            result = result + value * 2 - 1
+    return result
+'''
+
+NEAR = '''def add_all(items, initial):
+    result = initial
+    for value in items:
+        if value is not None and value > 0:
+            result = result + value * 2 - 1
+    print(result)
+    return result
+'''
+
+DIFFERENT = '''def render(template, context):
+    return template.format(**context)
+'''
+
+
+def test_fingerprint_ignores_names_comments_and_docstrings():
+    (a,), (b,) = _functions(ORIGINAL), _functions(RENAMED)
+    assert FunctionShape(a).fingerprint == FunctionShape(b).fingerprint
+    (c,) = _functions(DIFFERENT)
+    assert FunctionShape(a).fingerprint != FunctionShape(c).fingerprint
+
+
+def test_exact_duplicate_reuses_result_with_local_names():
+    inner = CountingGenerator()
+    generator = DedupGenerator(inner)
+    (a,), (b,) = _functions(ORIGINAL), _functions(RENAMED)
+    assert generator.generate(a) == '"""total sums values, start."""'
+    assert generator.generate(b) == '"""add_up sums items, initial."""'
+    assert generator.generate_type_hints(b)["parameters"] == {"items": "int", "initial": "int"}
+    assert inner.calls == 2
+    assert generator.stats()["dedup_exact"] == 1
+
+
+def test_near_duplicate_and_unrelated_functions():
+    inner = CountingGenerator()
+    generator = DedupGenerator(inner, threshold=0.6)
+    (a,), (near,), (other,) = _functions(ORIGINAL), _functions(NEAR), _functions(DIFFERENT)
+    generator.generate(a)
+    assert generator.generate(near) == '"""add_all sums items, initial."""'
+    generator.generate(other)
+    assert inner.calls == 2
+    assert generator.stats() == {"dedup_exact": 0, "dedup_near": 1}
+
+
+def test_batch_generates_each_distinct_function_once():
+    inner = CountingGenerator()
+    generator = DedupGenerator(inner)
+    nodes = _functions(ORIGINAL + "\n" + RENAMED + "\n" + DIFFERENT)
+    docstrings = generator.generate_batch(nodes)
+    assert docstrings[1] == '"""add_up sums items, initial."""'
+    assert inner.calls == 2
+
+
+EXTRA_PARAM = ORIGINAL.replace("def total(values, start):", "def scaled_total(items, initial, scale):")
+
+
+def test_type_hints_are_not_reused_across_different_parameter_counts():
+    inner = CountingGenerator()
+    generator = DedupGenerator(inner, threshold=0.6)
+    (a,), (near,), (extra,) = _functions(ORIGINAL), _functions(NEAR), _functions(EXTRA_PARAM)
+    generator.generate_type_hints(a)
+    assert generator.generate_type_hints(near)["parameters"] == {"items": "int", "initial": "int"}
+    assert inner.calls == 1
+    assert generator.generate_type_hints(extra)["parameters"] == {"items": "int", "initial": "int", "scale": "int"}
+    assert inner.calls == 2
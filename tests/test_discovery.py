@@ -0,0 +1,74 @@
+"""Tests for streamed source file discovery."""
+import os
+import subprocess
+
+from autodoc_ai import discovery
+from autodoc_ai.discovery import iter_source_files, walk_source_files
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.pipeline import run_pipeline
+
+GIT_ENV = {"GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com",
+           "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com"}
+
+
+def _write(root, files):
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+def _names(root, paths):
+    return [os.path.relpath(p, root).replace(os.sep, "/") for p in paths]
+
+
+def test_walk_prunes_ignored_directories_and_honors_nested_ignore_files(tmp_path, monkeypatch):
+    _write(tmp_path, {
+        ".gitignore": "build/\n*.gen.py\n",
+        "main.py": "", "notes.txt": "", "app.gen.py": "",
+        "build/out.py": "", "node_modules/lib/index.js": "",
+        "pkg/.gitignore": "!keep.gen.py\n",
+        "pkg/.zencoignore": "vendored.go\n",
+        "pkg/keep.gen.py": "", "pkg/drop.gen.py": "", "pkg/vendored.go": "", "pkg/util.go": "",
+        "pkg/sub/deep.cpp": "", "z.js": "",
+    })
+    scanned = []
+    scan = discovery._scan
+    monkeypatch.setattr(discovery, "_scan", lambda directory: scanned.append(directory) or scan(directory))
+
+    files = _names(tmp_path, walk_source_files(str(tmp_path)))
+
+    assert files == ["main.py", "z.js", "pkg/keep.gen.py", "pkg/util.go", "pkg/sub/deep.cpp"]
+    assert not any(part in directory for directory in scanned for part in ("build", "node_modules"))
+
+
+def test_git_index_fast_path_applies_repository_and_zenco_ignores(tmp_path):
+    _write(tmp_path, {
+        ".gitignore": "ignored.py\n",
+        "tracked.py": "", "gone.py": "", "untracked.js": "", "ignored.py": "",
+        "gen/.zencoignore": "*.java\n", "gen/Model.java": "", "gen/model.go": "",
+    })
+    env = {**os.environ, **GIT_ENV}
+    for args in (("init", "-q"), ("add", "tracked.py", "gone.py"), ("commit", "-q", "-m", "base")):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True, env=env)
+    (tmp_path / "gone.py").unlink()
+
+    files = iter_source_files(str(tmp_path))
+
+    assert sorted(_names(tmp_path, files)) == ["gen/model.go", "tracked.py", "untracked.js"]
+
+
+def test_discovery_streams_into_the_pipeline(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    _write(tmp_path, {"a.py": "", "b.py": ""})
+    events = []
+
+    def discovered():
+        for filepath in iter_source_files(str(tmp_path)):
+            events.append(("found", os.path.basename(filepath)))
+            yield filepath
+
+    for filepath, _, _, _ in run_pipeline(discovered(), lambda filepath, planner: None, MockGenerator()):
+        events.append(("done", os.path.basename(filepath)))
+
+    assert events == [("found", "a.py"), ("done", "a.py"), ("found", "b.py"), ("done", "b.py")]
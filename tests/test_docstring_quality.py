@@ -0,0 +1,79 @@
+"""Tests for the static docstring-quality pre-filter."""
+from autodoc_ai.docstring_quality import DocstringScorer
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import DocstringProcessor
+from autodoc_ai.transformers import CodeTransformer
+
+SOURCE = b'''def good(path, mode):
+    """
+    Opens the file at path using the given mode and returns its handle.
+
+    Args:
+        path: File to open.
+        mode: Open mode, e.g. "r".
+
+    Returns:
+        The open file object.
+    """
+    return open(path, mode)
+
+def placeholder(x):
+    """TODO: add docstring"""
+    return x
+
+def unclear(self, key):
+    """Looks up key in the table."""
+    return self.table[key]
+'''
+
+
+class CountingMock(MockGenerator):
+    def __init__(self):
+        self.evaluated = []
+
+    def evaluate(self, node, docstring):
+        self.evaluated.append(node.child_by_field_name("name").text.decode())
+        return True
+
+
+def _functions(tree):
+    return [n for n in tree.root_node.children if n.type == "function_definition"]
+
+
+def _docstring(func):
+    return func.child_by_field_name("body").children[0].children[0].text.decode()
+
+
+def test_scorer_decides_clear_cases():
+    tree = get_language_parser("python").parse(SOURCE)
+    good, placeholder, unclear = _functions(tree)
+    scorer = DocstringScorer()
+    assert scorer.decide(good, _docstring(good)) is True
+    assert scorer.decide(placeholder, _docstring(placeholder)) is False
+    assert scorer.decide(unclear, _docstring(unclear)) is None
+    score, reasons = scorer.score(unclear, _docstring(unclear))
+    assert "no returns section" in reasons
+
+
+def test_only_ambiguous_docstrings_reach_the_llm(capsys):
+    tree = get_language_parser("python").parse(SOURCE)
+    generator = CountingMock()
+    processor = DocstringProcessor("python", tree, SOURCE, CodeTransformer(SOURCE))
+    processor.process(generator, overwrite_existing=True, quality_scorer=DocstringScorer())
+
+    assert generator.evaluated == ["unclear"]
+    output = capsys.readouterr().out
+    assert "Static check: 1 good, 1 poor, 1 sent to LLM" in output
+    assert "Improving docstring for `placeholder()` (static score 0.00: placeholder text)" in output
+
+
+def test_marker_words_inside_a_description_are_not_placeholders():
+    scorer = DocstringScorer()
+    tree = get_language_parser("python").parse(b"def f(item):\n    pass\n")
+    func = tree.root_node.children[0]
+    for docstring in ('"""Adds a todo item to the list."""', '"""Replaces placeholder tokens in a template."""',
+                      '"""Marks the xxx section of the item as done."""'):
+        assert scorer.score(func, docstring)[1] != ["placeholder text"]
+    for docstring in ('"""TODO"""', '"""FIXME: describe item"""', '"""Placeholder."""', '""""""'):
+        assert scorer.score(func, docstring) == (0.0, ["placeholder text"])
@@ -0,0 +1,82 @@
+"""Tests for the combined per-function enrichment request."""
+import json
+import re
+
+from autodoc_ai.enrichment import EnrichingGenerator
+from autodoc_ai.generators import LLMGenerator
+from autodoc_ai.llm_services import OpenAIAdapter
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import DocstringProcessor, TypeHintProcessor
+from autodoc_ai.transformers import CodeTransformer
+
+
+class EnrichAdapter(OpenAIAdapter):
+    """Answers combined enrichment prompts; any other prompt is counted as a separate call."""
+    provider = "fake"
+
+    def __init__(self):
+        self.model = "fake-model"
+        self.prompts = []
+
+    def create_completion(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        name = re.search(r"def (\w+)\(", prompt).group(1)
+        return json.dumps({
+            "docstring": f"Combined docstring for {name}.",
+            "parameters": {"x": "int"},
+            "return_type": "int",
+            "docstring_ok": False,
+        })
+
+
+SOURCE = b'''def first(x):
+    return x
+
+def second(x):
+    """Bad."""
+    return x
+'''
+
+
+def test_one_request_per_function_serves_all_processors():
+    adapter = EnrichAdapter()
+    generator = EnrichingGenerator(LLMGenerator(adapter), docstrings=True, type_hints=True, evaluation=True)
+    tree = get_language_parser("python").parse(SOURCE)
+    transformer = CodeTransformer(SOURCE)
+
+    DocstringProcessor("python", tree, SOURCE, transformer).process(generator, overwrite_existing=True)
+    TypeHintProcessor("python", tree, SOURCE, transformer).process(generator)
+
+    assert len(adapter.prompts) == 2
+    assert all("Return ONLY a valid JSON object" in prompt for prompt in adapter.prompts)
+    output = transformer.apply_changes().decode("utf8")
+    assert "def first(x: int) -> int:" in output
+    assert "Combined docstring for first." in output
+    assert "Combined docstring for second." in output
+    assert generator.stats() == {"enrich_requests": 2, "enrich_functions": 2}
+
+
+def test_malformed_response_falls_back_to_single_calls():
+    class BrokenAdapter(EnrichAdapter):
+        def create_completion(self, prompt):
+            self.prompts.append(prompt)
+            return "not json" if "Return ONLY a valid JSON object (no markdown" in prompt else "Plain docstring."
+
+    adapter = BrokenAdapter()
+    generator = EnrichingGenerator(LLMGenerator(adapter), docstrings=True, type_hints=True)
+    tree = get_language_parser("python").parse(b"def first(x):\n    return x\n")
+    node = tree.root_node.children[0]
+    assert generator.generate(node) == "Plain docstring."
+    assert len(adapter.prompts) == 2
+
+
+def test_cpp_functions_are_not_asked_for_type_hints():
+    adapter = EnrichAdapter()
+    generator = EnrichingGenerator(LLMGenerator(adapter), docstrings=True, type_hints=True)
+    source = b"int first(int x) {\n    return x;\n}\n"
+    tree = get_language_parser("cpp").parse(source)
+    func = tree.root_node.children[0]
+
+    assert generator._fields_for(func, None) == {"docstring"}
+    python_func = get_language_parser("python").parse(SOURCE).root_node.children[0]
+    assert generator._fields_for(python_func, None) == {"docstring", "type_hints"}
@@ -0,0 +1,55 @@
+"""Tests for the pre-parse file classifier."""
+from autodoc_ai.file_filter import BINARY, GENERATED, MINIFIED, OVERSIZED, FileClassifier
+
+
+def _kind(classifier, path):
+    verdict = classifier.classify(str(path))
+    return verdict[0] if verdict else None
+
+
+def test_classifies_files_not_worth_parsing(tmp_path):
+    classifier = FileClassifier(max_size_kb=4)
+    files = {
+        "handwritten.py": "def f(x):\n    return x * 2\n" * 20,
+        "bundle.js": "var a=1;" * 400,
+        "msg.pb.go": "// Code generated by protoc-gen-go. DO NOT EDIT.\npackage msg\n",
+        "schema_pb2.py": "# Generated by the protocol buffer compiler.\nimport sys\n",
+        "huge.py": "x = 1\n" * 1000,
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    (tmp_path / "blob.h").write_bytes(b"\x7fELF\x00\x01")
+    (tmp_path / "latin1.java").write_bytes("// caf\xe9\nclass A {}\n".encode("latin-1"))
+
+    assert _kind(classifier, tmp_path / "handwritten.py") is None
+    assert _kind(classifier, tmp_path / "bundle.js") == MINIFIED
+    assert _kind(classifier, tmp_path / "msg.pb.go") == GENERATED
+    assert _kind(classifier, tmp_path / "schema_pb2.py") == GENERATED
+    assert _kind(classifier, tmp_path / "huge.py") == OVERSIZED
+    assert _kind(classifier, tmp_path / "blob.h") == BINARY
+    assert _kind(classifier, tmp_path / "latin1.java") == BINARY
+    assert _kind(FileClassifier(skip_generated=False), tmp_path / "msg.pb.go") is None
+
+
+def test_multibyte_character_cut_at_the_sample_edge_is_not_undecodable(tmp_path):
+    path = tmp_path / "unicode.py"
+    text = "x = 1\n" * 341 + "#π\n" * 100  # the 2 KiB sample ends between the two bytes of a π
+    assert text.encode("utf8")[2047:2049] == "π".encode("utf8")
+    path.write_text(text, encoding="utf8")
+    assert _kind(FileClassifier(sample_kb=2, max_size_kb=0), path) is None
+
+
+def test_generated_markers_only_count_in_the_header_comment(tmp_path):
+    classifier = FileClassifier()
+    files = {
+        "table.py": "# do not edit this list by hand without updating schema.sql\nTABLES = []\n",
+        "ids.go": "// auto-generated IDs are unique per table\npackage ids\n",
+        "late.js": "const a = 1;\n// @generated\n",
+        "block.cpp": "/*\n * Auto-generated file. Do not modify.\n */\nint a;\n",
+        "script.py": "#!/usr/bin/env python\n# -*- coding: utf-8 -*-\n# @generated by tool\nimport os\n",
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+
+    assert [_kind(classifier, tmp_path / name) for name in files] == [None, None, None, GENERATED, GENERATED]
+    assert classifier.classify(str(tmp_path / "block.cpp")) == (GENERATED, "header says 'Auto-generated file'")
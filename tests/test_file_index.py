@@ -0,0 +1,65 @@
+"""Tests for the single-pass file index shared by the processors."""
+from autodoc_ai.parser import get_compiled_query, get_language_parser
+from autodoc_ai.processors import FileIndex
+
+SOURCE = b'''import os
+from typing import List
+
+
+def outer(x, retries=5):
+    """Documented."""
+    def inner():
+        return x * 60
+    return inner() + 3.5
+
+
+def plain():
+    return 42
+'''
+
+
+def test_index_collects_functions_numbers_and_imports_in_source_order():
+    index = FileIndex("python", get_language_parser("python").parse(SOURCE))
+
+    assert [record.name for record in index.definitions()] == ["outer", "inner", "plain"]
+    assert index.functions[0].docstring.text == b'"""Documented."""'
+    assert index.functions[1].docstring is None
+    assert [record.text for record in index.imports] == ["import os", "from typing import List"]
+
+    numbers = {record.value: record for record in index.numbers}
+    assert list(numbers) == ["5", "60", "3.5", "42"]
+    assert numbers["5"].parent_type == "default_parameter"
+    # Literals belong to their innermost enclosing function.
+    assert index.function_name(numbers["60"].function_id) == "inner"
+    assert index.function_name(numbers["3.5"].function_id) == "outer"
+    assert index.function_name(numbers["42"].function_id) == "plain"
+    assert [(call.name, index.function_name(call.function_id)) for call in index.calls] == [("inner", "outer")]
+
+
+def test_javascript_methods_are_scopes_but_not_definitions():
+    source = b"class A { run() { return 99; } }\nfunction f() { return 7; }\n"
+    index = FileIndex("javascript", get_language_parser("javascript").parse(source))
+
+    assert [record.name for record in index.definitions()] == ["f"]
+    assert [index.function_name(record.function_id) for record in index.numbers] == ["run", "f"]
+
+
+def test_queries_are_compiled_once_and_cover_go_literals():
+    query = get_compiled_query("go", "function_scopes", "numeric_literals", "imports", "calls")
+    assert query is get_compiled_query("go", "function_scopes", "numeric_literals", "imports", "calls")
+
+    source = b'package main\n\nimport "fmt"\n\nfunc main() {\n\tfmt.Println(42, 0.5)\n}\n'
+    index = FileIndex("go", get_language_parser("go").parse(source))
+    assert [record.value for record in index.numbers] == ["42", "0.5"]
+    assert [call.name for call in index.calls] == ["Println"]
+    assert [record.text for record in index.imports] == ['import "fmt"']
+
+
+def test_changed_lines_limit_definitions_and_literals():
+    tree = get_language_parser("python").parse(SOURCE)
+    # Line 8 is inside `inner` (and so inside `outer`); `plain` is untouched.
+    index = FileIndex("python", tree, changed_lines=[(8, 8)])
+
+    assert [record.name for record in index.definitions()] == ["outer", "inner"]
+    assert [record.value for record in index.literals()] == ["5", "60", "3.5"]
+    assert [record.name for record in FileIndex("python", tree, changed_lines=[]).definitions()] == []
@@ -0,0 +1,55 @@
+"""Tests for the per-function artifact store."""
+from autodoc_ai.function_store import MemoizingGenerator
+from autodoc_ai.generators import ENRICH_DOCSTRING, ENRICH_TYPE_HINTS, MockGenerator
+from autodoc_ai.llm_cache import ResponseCache
+from autodoc_ai.parser import get_language_parser
+
+
+class CountingMock(MockGenerator):
+    def __init__(self):
+        self.calls = []
+
+    def generate_batch(self, nodes):
+        self.calls.append(("generate_batch", len(nodes)))
+        return [f"Docs {i}." for i, _ in enumerate(nodes)]
+
+    def generate_type_hints(self, node):
+        self.calls.append(("generate_type_hints", 1))
+        return {"parameters": {"x": "int"}, "return_type": "int"}
+
+    def enrich(self, node, fields, existing_docstring=None):
+        self.calls.append(("enrich", tuple(sorted(fields))))
+        return {ENRICH_DOCSTRING: "Enriched.", ENRICH_TYPE_HINTS: {"parameters": {}, "return_type": "int"}}
+
+
+def _functions(source):
+    tree = get_language_parser("python").parse(source.encode())
+    return [n for n in tree.root_node.children if n.type == "function_definition"]
+
+
+def _memo(tmp_path, inner):
+    return MemoizingGenerator(inner, ResponseCache(str(tmp_path), namespace="functions"), "groq", "m", "google")
+
+
+def test_only_changed_functions_are_regenerated_across_runs(tmp_path):
+    before = _functions("def a(x):\n    return x\n\ndef b(x):\n    return x + 1\n")
+    _memo(tmp_path, CountingMock()).generate_batch(before)
+
+    # Next run: `b` was edited, `a` only re-indented by a trailing space.
+    after = _functions("def a(x):  \n    return x\n\ndef b(x):\n    return x + 2\n")
+    inner = CountingMock()
+    memo = _memo(tmp_path, inner)
+    assert memo.generate_batch(after) == ["Docs 0.", "Docs 0."]
+    assert inner.calls == [("generate_batch", 1)]
+    assert memo.stats() == {"function_store_hits": 1, "function_store_misses": 1}
+
+
+def test_enrich_asks_only_for_missing_fields(tmp_path):
+    (node,) = _functions("def f(x):\n    return x\n")
+    _memo(tmp_path, CountingMock()).generate_type_hints(node)
+
+    inner = CountingMock()
+    result = _memo(tmp_path, inner).enrich(node, {ENRICH_DOCSTRING, ENRICH_TYPE_HINTS})
+    assert inner.calls == [("enrich", (ENRICH_DOCSTRING,))]
+    assert result[ENRICH_TYPE_HINTS] == {"parameters": {"x": "int"}, "return_type": "int"}
+    assert result[ENRICH_DOCSTRING] == "Enriched."
@@ -0,0 +1,92 @@
+"""Tests for git change detection (--diff / --since)."""
+import os
+import subprocess
+
+from autodoc_ai.cli import transform_file
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.utils import get_git_changed_files, get_git_changed_lines, parse_porcelain_status, parse_unified_diff
+
+GIT_ENV = {"GIT_AUTHOR_NAME": "t", "GIT_AUTHOR_EMAIL": "t@example.com",
+           "GIT_COMMITTER_NAME": "t", "GIT_COMMITTER_EMAIL": "t@example.com"}
+
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env={**os.environ, **GIT_ENV})
+
+
+def test_porcelain_parsing_keeps_new_names_and_drops_deletions():
+    output = " M a.py\0R  new name.js\0old.js\0 D gone.py\0?? dir/c.go\0"
+    assert parse_porcelain_status(output) == ["a.py", "new name.js", "dir/c.go"]
+
+
+def test_changed_files_cover_every_language_and_since_ref(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for name in ("a.py", "b.js", "c.java", "notes.txt", "gone.py"):
+        (repo / name).write_text("x\n")
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "base")
+    _git(repo, "checkout", "-q", "-b", "feature")
+    (repo / "committed.cpp").write_text("int x;\n")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "feature")
+
+    (repo / "b.js").write_text("y\n")
+    (repo / "notes.txt").write_text("y\n")
+    (repo / "gone.py").unlink()
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "new.go").write_text("package pkg\n")
+    monkeypatch.chdir(repo / "pkg")
+
+    names = lambda paths: [os.path.relpath(p, repo) for p in paths]
+    assert names(get_git_changed_files()) == ["b.js", os.path.join("pkg", "new.go")]
+    assert names(get_git_changed_files(since="main")) == ["b.js", "committed.cpp", os.path.join("pkg", "new.go")]
+    assert get_git_changed_files(since="no-such-ref") is None
+
+
+def test_outside_a_repository(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    assert get_git_changed_files() is None
+    assert "not a git repository" in capsys.readouterr().out
+
+
+def test_unified_diff_hunks_become_line_ranges():
+    output = ("+++ b/a.py\n@@ -3 +3 @@ def f\n@@ -10,2 +9,0 @@\n@@ -20,0 +19,3 @@\n"
+              "+++ /dev/null\n@@ -1 +0,0 @@\n")
+    assert parse_unified_diff(output) == {"a.py": [(3, 3), (9, 9), (19, 21)]}
+
+
+def test_changed_lines_limit_work_to_touched_functions(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    module = repo / "module.py"
+    module.write_text("def first(x):\n    return x\n\n\ndef second(y):\n    return y\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "base")
+    module.write_text("def first(x):\n    return x\n\n\ndef second(y):\n    return y + 1\n")
+    monkeypatch.chdir(repo)
+
+    changed = get_git_changed_lines()
+    assert changed == {str(module): [(6, 6)]}
+    source, new_code = transform_file(str(module), MockGenerator(), in_place=False, overwrite_existing=False,
+                                      docstrings_enabled=True, changed_lines=changed[str(module)])
+    assert new_code.count(b'"""') == 2 and new_code.index(b'"""') > new_code.index(b"def second")
+
+
+def test_changed_lines_of_paths_with_spaces_and_quotes(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    spaced, quoted = repo / "x y.py", repo / 'say "hi".py'
+    for path in (spaced, quoted):
+        path.write_text("a = 1\n")
+    _git(repo, "init", "-q")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "base")
+    for path in (spaced, quoted):
+        path.write_text("a = 2\n")
+    monkeypatch.chdir(repo)
+
+    assert get_git_changed_lines() == {str(spaced): [(1, 1)], str(quoted): [(1, 1)]}
@@ -0,0 +1,79 @@
+"""Tests for the persistent LLM response cache."""
+import os
+import time
+
+from autodoc_ai.llm_cache import CachedLLMService, ResponseCache, normalize_prompt
+from autodoc_ai.llm_services import OpenAIAdapter
+
+
+class FakeAdapter(OpenAIAdapter):
+    """An adapter that answers locally and counts network calls."""
+    provider = "fake"
+
+    def __init__(self, response="YES"):
+        self.model = "fake-model"
+        self.response = response
+        self.calls = 0
+
+    def create_completion(self, prompt: str) -> str:
+        self.calls += 1
+        return self.response
+
+
+def test_repeated_prompt_is_served_from_disk(tmp_path):
+    adapter = FakeAdapter()
+    service = CachedLLMService(adapter, ResponseCache(str(tmp_path)))
+    assert service.create_completion("hello") == "YES"
+    assert service.create_completion("  hello  ") == "YES"
+    assert adapter.calls == 1
+    assert service.stats() == {"cache_hits": 1, "cache_misses": 1}
+
+    # A fresh process (new wrapper) reuses the on-disk entry.
+    second = CachedLLMService(FakeAdapter(), ResponseCache(str(tmp_path)))
+    assert second.create_completion("hello") == "YES"
+    assert second.inner.calls == 0
+
+
+def test_task_methods_go_through_cache(tmp_path):
+    adapter = FakeAdapter()
+    service = CachedLLMService(adapter, ResponseCache(str(tmp_path)))
+    assert service.evaluate_docstring("def f(): pass", "Does f.") is True
+    assert service.evaluate_docstring("def f(): pass", "Does f.") is True
+    assert adapter.calls == 1
+
+
+def test_empty_responses_are_not_cached(tmp_path):
+    adapter = FakeAdapter(response="")
+    service = CachedLLMService(adapter, ResponseCache(str(tmp_path)))
+    service.create_completion("hello")
+    service.create_completion("hello")
+    assert adapter.calls == 2
+
+
+def test_unserializable_responses_are_not_cached_and_leave_no_files(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = "dd" + "0" * 62
+    cache.put(key, {"value": object()})
+    cache.put(key, "ok", created_by=object())
+
+    assert cache.get(key) is None
+    assert os.listdir(os.path.dirname(cache._path(key))) == []
+
+
+def test_prune_evicts_expired_and_oversized_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size_mb=1, max_age_days=1)
+    cache.put("aa" + "0" * 62, "old")
+    cache.put("bb" + "0" * 62, "x" * (1024 * 1024))
+    cache.put("cc" + "0" * 62, "new")
+    old_path = cache._path("aa" + "0" * 62)
+    expired = time.time() - 2 * 24 * 60 * 60
+    os.utime(old_path, (expired, expired))
+
+    assert cache.prune() == 2
+    assert cache.get("aa" + "0" * 62) is None
+    assert cache.get("bb" + "0" * 62) is None
+    assert cache.get("cc" + "0" * 62) == "new"
+
+
+def test_normalize_prompt_ignores_template_indentation():
+    assert normalize_prompt("\n    a  \n    b\n") == normalize_prompt("a\nb")
@@ -0,0 +1,45 @@
+"""Tests for magic-number prompt context extraction."""
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import MagicNumberProcessor
+from autodoc_ai.transformers import CodeTransformer
+
+
+class RecordingGenerator(MockGenerator):
+    def __init__(self):
+        self.contexts = {}
+
+    def suggest_constant_name(self, code_context, magic_number):
+        self.contexts[magic_number] = code_context
+        return super().suggest_constant_name(code_context, magic_number)
+
+
+def _run(source, budget=200):
+    source = source.encode("utf8")
+    tree = get_language_parser("python").parse(source)
+    generator = RecordingGenerator()
+    MagicNumberProcessor("python", tree, source, CodeTransformer(source)).process(
+        generator, context_token_budget=budget
+    )
+    return generator.contexts
+
+
+def test_module_level_context_is_bounded_by_budget():
+    filler = "".join(f"setting_{i} = 'value'\n" for i in range(5000))
+    contexts = _run(filler + "class Limits:\n    timeout = 4242\n" + filler)
+    context = contexts["4242"]
+    assert "timeout = 4242" in context
+    assert "class Limits:" in context
+    assert len(context) <= 200 * 4 + 100
+
+
+def test_assignment_target_is_kept_for_large_literals():
+    entries = "".join(f"    'key_{i}': 'value',\n" for i in range(2000))
+    contexts = _run("CONFIG = {\n" + entries + "    'retries': 7777,\n}\n")
+    assert contexts["7777"].startswith("CONFIG = ...")
+    assert "'retries': 7777" in contexts["7777"]
+
+
+def test_small_functions_are_sent_whole():
+    contexts = _run("def area(r):\n    return 3.14159 * r * r\n")
+    assert contexts["3.14159"] == "def area(r):\n    return 3.14159 * r * r"
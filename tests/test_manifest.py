@@ -0,0 +1,93 @@
+"""Tests for the incremental-run manifest."""
+import sys
+
+from autodoc_ai.cli import _record_if_complete, main
+from autodoc_ai.generators import GeneratorFactory, MockGenerator
+from autodoc_ai.manifest import RunManifest, make_run_key
+from autodoc_ai.resilience import record_failure
+
+
+def test_unchanged_files_are_current_until_edited_or_settings_change(tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text("def f():\n    return 1\n")
+    cache_dir = str(tmp_path / ".zenco-cache")
+    key = make_run_key(features={"docstrings_enabled": True}, style="google", provider="groq", model="m")
+
+    manifest = RunManifest(cache_dir, key)
+    assert not manifest.is_current(str(source))
+    manifest.record(str(source))
+    manifest.save()
+
+    assert RunManifest(cache_dir, key).is_current(str(source))
+    other_key = make_run_key(features={"docstrings_enabled": True}, style="numpy", provider="groq", model="m")
+    assert not RunManifest(cache_dir, other_key).is_current(str(source))
+
+    source.write_text("def f():\n    return 2\n")
+    assert not RunManifest(cache_dir, key).is_current(str(source))
+
+    assert RunManifest.clear(cache_dir)
+    assert RunManifest(cache_dir, key).files == {}
+
+
+def test_only_completed_work_is_recorded(tmp_path):
+    source = tmp_path / "module.py"
+    source.write_text("x = 1\n")
+    manifest = RunManifest(str(tmp_path), "key")
+
+    _record_if_complete(manifest, str(source), True, True, False, in_place=True)
+    assert not manifest.is_current(str(source))
+    # A dry run that would change the file has not done its work yet.
+    _record_if_complete(manifest, str(source), False, True, True, in_place=False)
+    assert not manifest.is_current(str(source))
+    _record_if_complete(manifest, str(source), False, True, True, in_place=True)
+    assert manifest.is_current(str(source))
+
+
+class SkippingMock(MockGenerator):
+    """Answers SKIP for every magic number, as a model does for a value too generic to name."""
+
+    def suggest_constant_name(self, code_context, magic_number):
+        return None
+
+
+class FailingMock(MockGenerator):
+    """Every constant-name request fails the way a provider call that exhausted its retries does."""
+
+    def suggest_constant_name(self, code_context, magic_number):
+        record_failure()
+        return None
+
+
+def _run_twice(tmp_path, monkeypatch, capsys, generator, pyproject=None):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "rates.py").write_text("def rate(x):\n    return x * 1.0725\n")
+    monkeypatch.setattr(GeneratorFactory, "create_generator", staticmethod(lambda *args, **kwargs: generator))
+    monkeypatch.setattr(sys, "argv", ["zenco", "run", "src", "--fix-magic-numbers", "--strategy", "mock", "--in-place"])
+    main()
+    first = capsys.readouterr().out
+    if pyproject is not None:
+        (tmp_path / "pyproject.toml").write_text(pyproject)
+    main()
+    return first, capsys.readouterr().out
+
+
+def test_a_skip_answer_completes_the_file(tmp_path, monkeypatch, capsys):
+    first, second = _run_twice(tmp_path, monkeypatch, capsys, SkippingMock())
+
+    assert "[WARN]" in first
+    assert "Files skipped (unchanged since last run): 1" in second
+
+
+def test_a_failed_llm_call_leaves_the_file_for_the_next_run(tmp_path, monkeypatch, capsys):
+    _, second = _run_twice(tmp_path, monkeypatch, capsys, FailingMock())
+
+    assert "Files skipped (unchanged" not in second and "Processing: " in second
+
+
+def test_editing_output_settings_reprocesses_recorded_files(tmp_path, monkeypatch, capsys):
+    _, second = _run_twice(tmp_path, monkeypatch, capsys, SkippingMock(),
+                           pyproject="[tool.zenco]\nmagic_context_tokens = 200\n")
+
+    assert "Files skipped (unchanged" not in second and "Processing: " in second
@@ -0,0 +1,31 @@
+"""Tests for process-pool file parallelism (--jobs)."""
+from autodoc_ai.parallel import FilePool, shared_semaphore
+from autodoc_ai.rate_limit import split_limits
+
+
+def test_pool_returns_captured_output_in_item_order():
+    # Builtins keep the set-up and task importable from the spawned workers.
+    with FilePool(2, int) as pool:
+        results = list(pool.map(print, ["a.py", "b.py", "c.py"]))
+    assert [item for item, _, _ in results] == ["a.py", "b.py", "c.py"]
+    assert [output for _, output, _ in results] == ["0 a.py\n", "0 b.py\n", "0 c.py\n"]
+
+
+def test_worker_errors_are_reported_in_the_file_log():
+    with FilePool(1, int) as pool:
+        (item, output, result), = pool.map(divmod, [0])
+    assert result is None
+    assert "[ERROR] Worker failed on 0" in output
+    assert "ZeroDivisionError" in output
+
+
+def test_rate_limits_are_split_between_workers():
+    table = {"groq": {"rpm": 30, "tpm": 6000}, "groq/llama": {"tpm": 1200, "expected_output_tokens": 256}}
+    assert split_limits(table, 3) == {"groq": {"rpm": 10, "tpm": 2000}, "groq/llama": {"tpm": 400, "expected_output_tokens": 256}}
+
+
+def test_shared_semaphore_bounds_slots():
+    slots = shared_semaphore(1)
+    assert slots.acquire(timeout=0)
+    assert not slots.acquire(timeout=0)
+    slots.release()
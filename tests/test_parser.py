@@ -0,0 +1,33 @@
+"""Tests for the per-thread parser pool and cancellable parsing."""
+import threading
+
+import pytest
+
+from autodoc_ai.parser import ParseTimeout, get_language_parser, parse_source
+
+SOURCE = b"def f(x):\n    return x * 2\n" * 2000
+
+
+def test_parsers_are_reused_per_thread():
+    parser = get_language_parser("python")
+    assert get_language_parser("python") is parser
+    assert get_language_parser("go") is not parser
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_language_parser("python")))
+    thread.start()
+    thread.join()
+    assert other[0] is not None and other[0] is not parser
+
+
+def test_chunked_parse_matches_and_cancellation_stops_it():
+    plain = parse_source("python", SOURCE)
+    chunked = parse_source("python", SOURCE, timeout=60)
+    assert str(chunked.root_node) == str(plain.root_node)
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(ParseTimeout, match="cancelled"):
+        parse_source("python", SOURCE, cancel=cancel)
+    # The pooled parser is left ready for the next file.
+    assert not parse_source("python", b"def g():\n    pass\n").root_node.has_error
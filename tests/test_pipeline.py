@@ -0,0 +1,125 @@
+"""Tests for the analysis / LLM work queue / apply pipeline."""
+import threading
+
+from autodoc_ai.cli import transform_file
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.pipeline import run_pipeline
+
+
+class RecordingMock(MockGenerator):
+    """Judges every existing docstring poor and records which thread asked what."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _record(self, method, node):
+        with self.lock:
+            self.calls.append((method, node.child_by_field_name("name").text.decode(), threading.current_thread().name))
+
+    def generate(self, node):
+        self._record("generate", node)
+        return f"Docs for {node.child_by_field_name('name').text.decode()}."
+
+    def evaluate(self, node, docstring):
+        self._record("evaluate", node)
+        return False
+
+
+FIRST = '''def first(x):
+    return x
+
+
+def shared(y):
+    """Old."""
+    return y
+'''
+
+SECOND = '''def shared(y):
+    """Old."""
+    return y
+'''
+
+
+def _analyse(filepath, planner):
+    return transform_file(filepath, planner, in_place=True, overwrite_existing=True, docstrings_enabled=True)
+
+
+def test_pipeline_resolves_follow_up_requests_and_keeps_file_order(tmp_path):
+    first, second = tmp_path / "first.py", tmp_path / "second.py"
+    first.write_text(FIRST)
+    second.write_text(SECOND)
+    generator = RecordingMock()
+    stats = {}
+
+    results = list(run_pipeline([str(first), str(second)], _analyse, generator, max_workers=2, stats=stats))
+
+    assert [filepath for filepath, _, _, _ in results] == [str(first), str(second)]
+    assert not any(failed for _, _, _, failed in results)
+    source, new_code = results[1][2]
+    assert b"Docs for shared." in new_code and b"Old." not in new_code
+    assert "Improving docstring for `shared()`" in results[1][1]
+    # The identical function in both files is evaluated and regenerated once, off the main thread.
+    assert sorted((method, name) for method, name, _ in generator.calls) == [
+        ("evaluate", "shared"), ("generate", "first"), ("generate", "shared")]
+    assert all(thread != threading.main_thread().name for _, _, thread in generator.calls)
+    assert stats == {"queued_requests": 3, "queued_duplicates": 2}
+
+
+class FailingMock(MockGenerator):
+    """Fails every evaluation, printing an error as a provider wrapper would."""
+
+    def evaluate(self, node, docstring):
+        print("Error calling mock API: boom")
+        raise RuntimeError("boom")
+
+    def generate(self, node):
+        return "Fresh docs."
+
+
+def test_failed_request_degrades_and_is_reported_in_the_file_log(tmp_path, capsys):
+    source = tmp_path / "second.py"
+    source.write_text(SECOND + FIRST)
+
+    [(_, log, result, failed)] = list(run_pipeline([str(source)], _analyse, FailingMock(), max_workers=2))
+
+    # The failed evaluation judges the existing docstring poor, as outside the pipeline.
+    assert b"Old." not in result[1] and result[1].count(b"Fresh docs.") == 3
+    assert "Error calling mock API: boom" in log and "[WARN] LLM request failed: boom" in log
+    assert "Error calling mock API" not in capsys.readouterr().out
+    assert failed
+
+
+def test_files_are_revisited_as_soon_as_answered_and_queue_node_text(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(f"X = 1\n\n\ndef f{i}(x):\n    return x\n")
+        paths.append(str(path))
+    events = []
+    generator = RecordingMock()
+    generate = generator.generate
+
+    def record_argument(node):
+        root = node
+        while root.parent is not None:
+            root = root.parent
+        events.append(("served", root.text))
+        return generate(node)
+
+    generator.generate = record_argument
+
+    def analyse(filepath, planner):
+        events.append(("analyse", filepath[-5:]))
+        return _analyse(filepath, planner)
+
+    for filepath, _, _, _ in run_pipeline(paths, analyse, generator, max_workers=1, max_waiting=1):
+        events.append(("done", filepath[-5:]))
+
+    # With one file in flight, each is finished before the next one is started.
+    assert [event for event in events if event[0] != "served"] == [
+        ("analyse", "m0.py"), ("analyse", "m0.py"), ("done", "m0.py"),
+        ("analyse", "m1.py"), ("analyse", "m1.py"), ("done", "m1.py"),
+        ("analyse", "m2.py"), ("analyse", "m2.py"), ("done", "m2.py")]
+    # The queue served re-parsed function text, not nodes of the files' own trees.
+    assert [event[1].startswith(b"def f") for event in events if event[0] == "served"] == [True] * 3
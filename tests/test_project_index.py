@@ -0,0 +1,84 @@
+"""Tests for the project-wide symbol and reference index."""
+from autodoc_ai.project_index import ProjectIndex
+
+FILES = {
+    "pkg/__init__.py": "from .util import exported\n",
+    "pkg/util.py": ("def helper(x):\n    return x\n\ndef exported():\n    pass\n\ndef dead():\n    pass\n\n"
+                    "def via_module():\n    pass\n\ndef _private():\n    pass\n"),
+    "pkg/sub/mod.py": "from ..util import helper as h\n\ndef run():\n    return list(map(h, [1]))\n",
+    "pkg/stars.py": "def public():\n    pass\n\ndef _hidden():\n    pass\n",
+    "main.py": ("import pkg.util\nfrom pkg.stars import *\nfrom pkg.util import dead\n\n"
+                "def main():\n    return pkg.util.via_module()\n"),
+}
+
+
+def _project(tmp_path):
+    for name, text in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return [str(tmp_path / name) for name in FILES]
+
+
+def test_uses_resolve_across_modules(tmp_path):
+    paths = _project(tmp_path)
+    index = ProjectIndex(str(tmp_path / ".zenco-cache"))
+    index.update(paths, str(tmp_path))
+
+    # Called through an alias of a relative import, re-exported by the package, read as pkg.util.x;
+    # `dead` is imported but never read, so it stays dead.
+    assert index.external_uses(str(tmp_path / "pkg/util.py")) == {"helper", "exported", "via_module"}
+    assert index.external_uses(str(tmp_path / "pkg/stars.py")) == {"public"}
+    assert index.external_uses(str(tmp_path / "main.py")) == set()
+
+    parallel = ProjectIndex(str(tmp_path / "other-cache"))
+    parallel.update(paths, str(tmp_path), workers=2)
+    assert parallel.uses_by_file() == index.uses_by_file()
+
+
+def test_index_is_persisted_and_only_changed_files_are_reindexed(tmp_path):
+    paths = _project(tmp_path)
+    cache_dir = str(tmp_path / ".zenco-cache")
+    first = ProjectIndex(cache_dir)
+    first.update(paths, str(tmp_path))
+    first.save()
+    assert first.reindexed == len(FILES)
+
+    again = ProjectIndex(cache_dir)
+    again.update(paths, str(tmp_path))
+    assert again.reindexed == 0 and again.affected == set()
+
+    (tmp_path / "pkg/sub/mod.py").write_text("def run():\n    return 1\n")
+    changed = ProjectIndex(cache_dir)
+    changed.update(paths, str(tmp_path))
+    assert changed.reindexed == 1
+    # util.py is unchanged, but `helper` lost its only user: its analysis is out of date.
+    assert changed.affected == {str(tmp_path / "pkg/util.py")}
+    assert "helper" not in changed.external_uses(str(tmp_path / "pkg/util.py"))
+
+
+def test_changed_files_update_only_the_modules_around_them(tmp_path, monkeypatch):
+    paths = _project(tmp_path)
+    cache_dir = str(tmp_path / ".zenco-cache")
+    assert not ProjectIndex(cache_dir).update_changed([paths[2]], str(tmp_path))  # nothing persisted yet
+    full = ProjectIndex(cache_dir)
+    full.update(paths, str(tmp_path))
+    full.save()
+
+    util, mod, stars = (str(tmp_path / name) for name in ("pkg/util.py", "pkg/sub/mod.py", "pkg/stars.py"))
+    (tmp_path / "pkg/sub/mod.py").write_text("from ..util import dead\n\ndef run():\n    return dead()\n")
+    digested = []
+    index = ProjectIndex(cache_dir)
+    digest = index._digests
+    monkeypatch.setattr(index, "_digests", lambda files: digested.extend(files) or digest(files))
+    assert index.update_changed([mod], str(tmp_path))
+
+    # Only the changed module was read: util.py's users come from the persisted importers.
+    assert digested == [mod] and index.reindexed == 1
+    assert index.affected == {util}
+    assert index.external_uses(util) == {"dead", "exported", "via_module"}
+    assert index.external_uses(stars) == {"public"}
+    index.save()
+    again = ProjectIndex(cache_dir)
+    again.update(paths, str(tmp_path))
+    assert again.uses_by_file() == index.uses_by_file() and again.affected == set()
@@ -0,0 +1,74 @@
+"""Tests for the per-provider token-bucket rate limiter."""
+import pytest
+
+from autodoc_ai.rate_limit import RateLimitedLLMService, RateLimiter, TokenBucket, get_rate_limiter, resolve_limits
+
+
+class FakeClock:
+    """A manual clock; `sleep` advances it instead of blocking."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_allows_burst_then_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    assert all(bucket.reserve(1) == 0 for _ in range(60))
+    # One token per second refill: the 61st and 62nd requests queue up behind each other.
+    assert bucket.reserve(1) == 1.0
+    assert bucket.reserve(1) == 2.0
+    clock.now += 10
+    assert bucket.reserve(1) == 0
+
+
+def test_limiter_blocks_on_token_budget():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=100, tpm=600, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire(600) == 0
+    waited = limiter.acquire(300)
+    assert waited == 30.0
+    assert clock.slept == [30.0]
+
+
+def test_oversized_request_does_not_deadlock():
+    clock = FakeClock()
+    limiter = RateLimiter(tpm=100, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire(10_000) == 0
+
+
+def test_model_limits_override_provider_limits():
+    table = {"groq": {"rpm": 30, "tpm": 6000}, "groq/llama-3.3-70b-versatile": {"tpm": 12000}}
+    assert resolve_limits(table, "groq", "llama-3.3-70b-versatile") == {"rpm": 30, "tpm": 12000}
+    assert resolve_limits(table, "groq", "other") == {"rpm": 30, "tpm": 6000}
+    assert resolve_limits(None, "openai", "gpt-4o-mini") == {}
+
+
+def test_limiters_are_shared_per_provider_model_and_limits():
+    limiter = get_rate_limiter("test", "model", 10, 1000)
+    assert get_rate_limiter("test", "model", 10, 1000) is limiter
+    other = get_rate_limiter("test", "model", 20, 1000)
+    assert other is not limiter and other.requests.capacity == 20
+
+
+def test_failed_call_keeps_its_estimated_tokens_charged():
+    class Failing:
+        def create_completion(self, prompt):
+            raise RuntimeError("boom")
+
+    clock = FakeClock()
+    limiter = RateLimiter(tpm=10_000, clock=clock, sleep=clock.sleep)
+    recorded = []
+    limiter.record_usage = lambda estimated, actual: recorded.append((estimated, actual))
+    service = RateLimitedLLMService(Failing(), limiter, expected_output_tokens=100)
+    with pytest.raises(RuntimeError):
+        service.create_completion("prompt")
+    assert len(recorded) == 1 and recorded[0][0] == recorded[0][1]
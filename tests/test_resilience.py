@@ -0,0 +1,100 @@
+"""Tests for retries, error classification and the circuit breaker."""
+from autodoc_ai.llm_services import OpenAIAdapter
+from autodoc_ai.resilience import CircuitBreaker, ResilientLLMService, RetryPolicy, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyAdapter(OpenAIAdapter):
+    """Raises the queued errors in order, then answers."""
+    provider = "fake"
+
+    def __init__(self, errors):
+        self.model = "fake-model"
+        self.errors = list(errors)
+        self.calls = 0
+
+    def create_completion(self, prompt: str) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def _service(adapter, **breaker):
+    return ResilientLLMService(adapter, policy=RetryPolicy(max_attempts=3), breaker=CircuitBreaker(**breaker),
+                               sleep=lambda seconds: None)
+
+
+def test_error_classification():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(StatusError(401))
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_transient_errors_are_retried():
+    adapter = FlakyAdapter([StatusError(429), StatusError(500)])
+    service = _service(adapter)
+    assert service.create_completion("hi") == "ok"
+    assert adapter.calls == 3
+    assert service.stats()["llm_retries"] == 2
+
+
+def test_fatal_errors_are_not_retried():
+    adapter = FlakyAdapter([StatusError(401)])
+    service = _service(adapter)
+    assert service.create_completion("hi") == ""
+    assert adapter.calls == 1
+    assert service.stats()["llm_failures"] == 1
+
+
+def test_breaker_opens_and_fails_fast():
+    adapter = FlakyAdapter([StatusError(503)] * 10)
+    service = _service(adapter, failure_threshold=3, reset_timeout=60)
+    assert service.create_completion("hi") == ""
+    assert adapter.calls == 3
+    assert service.create_completion("hi") == ""
+    assert adapter.calls == 3
+    stats = service.stats()
+    assert stats["circuit_breaker_trips"] == 1
+    assert stats["circuit_breaker_rejections"] == 1
+
+
+def test_breaker_half_open_trial_closes_on_success():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    assert breaker.record_failure()
+    assert not breaker.allow()
+    now[0] = 11
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and not breaker.is_open
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    assert all(0 <= policy.delay(attempt) <= 5 for attempt in range(1, 20))
+
+
+def test_unknown_config_keys_are_reported_not_fatal(monkeypatch, capsys):
+    from autodoc_ai.generators import GeneratorFactory
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    generator = GeneratorFactory.create_generator(
+        "llm", provider="groq",
+        settings={"retry": {"max_attempts": 2, "max_atempts": 9}, "circuit_breaker": {"threshold": 1}},
+    )
+    report = capsys.readouterr().out
+
+    service = generator.llm_service
+    assert isinstance(service, ResilientLLMService)
+    assert service.policy.max_attempts == 2 and service.breaker.failure_threshold == 5
+    assert "unknown key 'max_atempts' in [tool.zenco.retry]" in report
+    assert "unknown key 'threshold' in [tool.zenco.circuit_breaker]" in report
@@ -0,0 +1,29 @@
+"""Tests for the shared source buffer and byte-accurate edits on non-ASCII files."""
+from autodoc_ai.generators import MockGenerator
+from autodoc_ai.parser import get_language_parser
+from autodoc_ai.processors import DocstringProcessor, SourceBuffer
+from autodoc_ai.transformers import CodeTransformer
+
+SOURCE = "# Café ☕ configuration\nNAME = 'naïve'\n\n\ndef brew(cups):\n    return cups\n".encode("utf8")
+
+
+def test_line_offsets_are_bytes_and_chars_stay_exact():
+    buffer = SourceBuffer(SOURCE)
+    def_line = 4
+
+    assert buffer.line(def_line) == "def brew(cups):"
+    assert SOURCE[buffer.line_start(def_line):].startswith(b"def brew")
+    assert buffer.line_of(buffer.line_start(def_line) + 3) == def_line
+    assert buffer.line_end(buffer.line_count) == len(SOURCE)
+    assert buffer.text[buffer.char_offset(buffer.line_start(def_line)):].startswith("def brew")
+    assert buffer.indentation(def_line + 1) == 4
+
+
+def test_docstring_is_inserted_at_the_right_place_after_non_ascii_text():
+    tree = get_language_parser("python").parse(SOURCE)
+    transformer = CodeTransformer(SOURCE)
+    DocstringProcessor("python", tree, SOURCE, transformer).process(MockGenerator())
+
+    result = transformer.apply_changes().decode("utf8")
+    assert result.startswith("# Café ☕ configuration\nNAME = 'naïve'\n\n\ndef brew(cups):\n    \"\"\"")
+    assert result.endswith("\n    return cups\n")
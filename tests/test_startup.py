@@ -0,0 +1,20 @@
+"""Importing the CLI must not load provider SDKs, git tooling or unused grammars."""
+import subprocess
+import sys
+
+DEFERRED = ("groq", "openai", "anthropic", "git", "rich", "colorama", "pathspec",
+            "tree_sitter_python", "tree_sitter_java", "tree_sitter_cpp")
+
+
+def _loaded_after(code):
+    probe = f"import sys; {code}; print(' '.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout.split()
+
+
+def test_cli_import_defers_heavy_modules():
+    assert _loaded_after("import autodoc_ai.cli") == []
+
+
+def test_only_the_grammar_in_use_is_loaded():
+    loaded = _loaded_after("from autodoc_ai.parser import get_language_parser; get_language_parser('python')")
+    assert loaded == ["tree_sitter_python"]